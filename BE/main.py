@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from BE.core.config import settings
 from BE.db.session import Base, engine
 from BE.controllers import auth as auth_controller
@@ -36,35 +37,20 @@ def startup():
         app.state.db_ready = False
         logging.exception("❌ DB initialization failed on startup")
 
-    # CRITICAL: Pre-load embedding model at startup and STORE IN app.state
-    # This ensures the model is loaded once and reused for all requests
+    # Load RAG services in the background and STORE IN app.state
+    # Startup returns immediately; /ready flips once the model is loaded and warmed up
     # Using app.state instead of module globals to survive uvicorn reloads
-    try:
-        logging.info("🔄 Pre-loading RAG services at startup...")
-        print("🔄 Pre-loading RAG services at startup...")
-
-        from Chatbot.services.VectorizerService import VectorizerService
-        from Chatbot.services.GeneratorService import GeneratorService
-
-        # Create and store in app.state (NOT module globals)
-        app.state.vectorizer = VectorizerService()
-        app.state.generator = GeneratorService()
-
-        logging.info(f"✅ VectorizerService loaded: model={app.state.vectorizer.model is not None}")
-        logging.info(f"✅ GeneratorService loaded")
-        print(f"✅ VectorizerService loaded: model={app.state.vectorizer.model is not None}")
-        print(f"✅ GeneratorService loaded")
-
-        app.state.rag_ready = True
-    except Exception as e:
-        app.state.rag_ready = False
-        app.state.vectorizer = None
-        app.state.generator = None
-        logging.exception(f"❌ RAG services initialization failed: {e}")
-        print(f"❌ RAG services initialization failed: {e}")
-        import traceback
-        traceback.print_exc()
+    from Chatbot.bootstrap import start_rag_services
+    start_rag_services(app)
 
 @app.get("/health")
 def health():
+    """Liveness: answers as soon as the process is up"""
     return {"ok": True, "db_available": getattr(app.state, "db_ready", False)}
+
+@app.get("/ready")
+def ready():
+    """Readiness: 200 only once RAG services are loaded and warmed up"""
+    from Chatbot.bootstrap import readiness
+    status = readiness(app)
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
@@ -9,6 +9,12 @@ import os
 
 # Chatbot service URL (có thể chạy trên port khác hoặc server khác)
 CHATBOT_SERVICE_URL = os.getenv("CHATBOT_SERVICE_URL", "http://127.0.0.1:8000")
+# HTTP timeout khi gọi Chatbot; Chatbot nhận deadline ngắn hơn một chút để kịp trả lời
+# (dùng model fallback nếu model chính chậm) trước khi BE bỏ cuộc
+CHATBOT_TIMEOUT = float(os.getenv("CHATBOT_TIMEOUT", "30"))
+CHATBOT_DEADLINE_MARGIN = 2.0  # Seconds for network + serialization
+# Kẹp vào khoảng AnswerRequest.deadline_ms chấp nhận (1s - 300s), nếu không Chatbot trả 422
+CHATBOT_DEADLINE_MS = min(max(int((CHATBOT_TIMEOUT - CHATBOT_DEADLINE_MARGIN) * 1000), 1000), 300000)
 
 # Cache for models (refresh every 5 minutes)
 _models_cache = None
@@ -112,6 +118,13 @@ class ChatService:
                 print(f"Error mapping model name: {e}")
                 # Use default
 
+        # Lịch sử hội thoại trước message này: Chatbot giữ nguyên văn các lượt gần nhất,
+        # các lượt cũ hơn được gộp vào bản tóm tắt cache theo chat_id
+        conversation_history = [
+            {"role": msg.type.value, "content": msg.content}
+            for msg in MessageDAO.find_by_chat(db, chat_id)
+        ]
+
         # Lưu user message vào DB
         user_msg = MessageDAO.create(db, chat_id, MessageType.user, content)
 
@@ -126,9 +139,12 @@ class ChatService:
                     "question": content,
                     "top_k": 5,
                     "token_budget": 2000,
-                    "model": llm_model  # Pass model from DB
+                    "model": llm_model,  # Pass model from DB
+                    "chat_id": str(chat_id),
+                    "conversation_history": conversation_history,
+                    "deadline_ms": CHATBOT_DEADLINE_MS
                 },
-                timeout=30  # 30 seconds timeout
+                timeout=CHATBOT_TIMEOUT
             )
             response.raise_for_status()
             rag_result = response.json()
@@ -144,10 +160,17 @@ class ChatService:
         except requests.exceptions.RequestException as e:
             # Fallback nếu Chatbot service không available
             print(f"Chatbot service error: {e}")
-            bot_response = (
-                "Xin lỗi, hệ thống chatbot đang bảo trì. "
-                "Vui lòng thử lại sau hoặc liên hệ admin."
-            )
+            if getattr(e.response, "status_code", None) == 504:
+                # Chatbot chạy nhưng LLM không trả lời kịp deadline
+                bot_response = (
+                    "Xin lỗi, hệ thống đang quá tải nên chưa trả lời kịp. "
+                    "Vui lòng gửi lại câu hỏi sau ít phút."
+                )
+            else:
+                bot_response = (
+                    "Xin lỗi, hệ thống chatbot đang bảo trì. "
+                    "Vui lòng thử lại sau hoặc liên hệ admin."
+                )
             citations_count = 0
             domain_name = "Error"
             namespace = "Error"
@@ -0,0 +1,137 @@
+"""
+RAG service bootstrap - non-blocking startup with background warm-up
+
+Startup hook chỉ khởi chạy một background thread rồi trả về ngay, nên
+server nhận traffic (liveness) trong khi model đang load. Khi
+VectorizerService/GeneratorService đã sẵn sàng và chạy xong warm-up encode,
+app.state.rag_ready chuyển sang True (readiness).
+"""
+import logging
+import threading
+import time
+
+from Chatbot.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def start_rag_services(app) -> threading.Thread:
+    """
+    Load RAG services in a background thread and store them in app.state
+
+    app.state fields:
+        rag_loading: True while the thread is running
+        rag_ready:   True once services are loaded and warmed up
+        vectorizer / generator: the loaded singletons (None until ready)
+
+    Args:
+        app: FastAPI application
+
+    Returns:
+        The started loader thread
+    """
+    app.state.rag_ready = False
+    app.state.rag_loading = True
+    app.state.vectorizer = None
+    app.state.generator = None
+
+    thread = threading.Thread(
+        target=_load_rag_services,
+        args=(app, time.perf_counter()),
+        name="rag-warmup",
+        daemon=True
+    )
+    thread.start()
+    logging.info("🔄 RAG services loading in background (readiness pending)")
+    return thread
+
+
+def _load_rag_services(app, started_at: float):
+    """Background loader: build services → warm-up encode → flip readiness"""
+    metrics = get_metrics()
+    try:
+        from Chatbot.services.VectorizerService import create_vectorizer_service
+        from Chatbot.services.ModelClientPool import get_model_client_pool
+        from Chatbot.config.rag_config import get_rag_config
+        config = get_rag_config()
+
+        load_start = time.perf_counter()
+        vectorizer = create_vectorizer_service()
+        generator = get_model_client_pool().get_generator()  # Default model, pinned in the pool
+        metrics.gauge("rag_model_load_seconds", "Time to load vectorizer and generator").set(
+            time.perf_counter() - load_start
+        )
+
+        # Pay the first-call cost (graph init, allocator warm-up) before real traffic
+        warmup_start = time.perf_counter()
+        vectorizer.warm_up()
+        metrics.gauge("rag_warmup_seconds", "Time of the warm-up encode").set(
+            time.perf_counter() - warmup_start
+        )
+
+        # BM25 index for lexical/hybrid retrieval (built from the chunks table)
+        if config.retrieval_mode != "vector":
+            _build_lexical_index(metrics)
+
+        # Local vector index: replay its log now rather than on the first query
+        if config.vector_store_type == "local" or config.vector_failover:
+            from Chatbot.dao.VectorIndexDAO import create_vector_index
+            create_vector_index()
+
+        # Cross-encoder reranker (loaded + warmed here so requests don't pay for it)
+        if config.enable_reranking:
+            from Chatbot.services.RerankerService import get_reranker
+            get_reranker().warm_up()
+
+        # Router + domain services + pooled Qdrant client, shared by every request
+        from Chatbot.services.DomainServiceRegistry import init_domain_registry
+        init_domain_registry(vectorizer, generator)
+
+        app.state.vectorizer = vectorizer
+        app.state.generator = generator
+        app.state.rag_ready = True
+
+        startup_seconds = time.perf_counter() - started_at
+        metrics.gauge("rag_startup_seconds", "Time from startup hook to readiness").set(startup_seconds)
+        logging.info(
+            f"✅ RAG services ready in {startup_seconds:.1f}s "
+            f"(model loaded={vectorizer.model is not None})"
+        )
+        print(f"✅ RAG services ready in {startup_seconds:.1f}s")
+    except Exception as e:
+        app.state.rag_ready = False
+        app.state.vectorizer = None
+        app.state.generator = None
+        logging.exception(f"❌ RAG services initialization failed: {e}")
+        print(f"❌ RAG services initialization failed: {e}")
+    finally:
+        app.state.rag_loading = False
+
+
+def _build_lexical_index(metrics):
+    """Build the BM25 index; on failure retrieval falls back to vector-only"""
+    from Chatbot.services.LexicalIndexService import get_lexical_index
+    start = time.perf_counter()
+    try:
+        get_lexical_index().build_from_db()
+    except Exception as e:
+        logging.error(f"⚠️  Lexical index build failed, using vector-only retrieval: {e}")
+        return
+    metrics.gauge("rag_lexical_index_build_seconds", "Time to build the BM25 index").set(
+        time.perf_counter() - start
+    )
+
+
+def readiness(app) -> dict:
+    """
+    Readiness payload shared by /ready endpoints
+
+    Returns:
+        Dict with ready flag and component states
+    """
+    return {
+        "ready": bool(getattr(app.state, "rag_ready", False)) and bool(getattr(app.state, "db_ready", False)),
+        "rag_ready": getattr(app.state, "rag_ready", False),
+        "rag_loading": getattr(app.state, "rag_loading", False),
+        "db_available": getattr(app.state, "db_ready", False),
+    }
@@ -0,0 +1,142 @@
+"""
+Rolling conversation summaries, cached per chat
+Các lượt hội thoại cũ được HistoryCompactor gộp vào một bản tóm tắt; bản tóm
+tắt được lưu theo chat để lượt sau chỉ cần gộp thêm các lượt mới (không tóm
+tắt lại từ đầu).
+
+- Tier 1: in-process LRU với TTL
+- Tier 2 (optional): Redis, dùng chung giữa các worker (request kế tiếp của
+  cùng một chat có thể tới worker khác)
+
+Entry: {"covered": số message đầu đã gộp, "digest": hash của các message đó,
+"summary": text}. Digest không khớp (chat bị sửa/xóa tin nhắn) → bỏ entry.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from Chatbot.utils.metrics import get_metrics
+
+
+class ConversationSummaryCache:
+    """
+    chat key → rolling summary entry
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: int = 86400, redis_cache=None):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Max chats held in process (LRU beyond that)
+            ttl: Entry time-to-live in seconds
+            redis_cache: Optional RedisCache instance (None = in-process only)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis = redis_cache
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # chat_key → (entry, expires_at)
+        self._lock = threading.Lock()
+
+        metrics = get_metrics()
+        self._hit_counter = metrics.counter("rag_history_summary_cache_hits_total", "Rolling summaries reused from cache")
+        self._miss_counter = metrics.counter("rag_history_summary_cache_misses_total", "Chats without a cached rolling summary")
+
+    def get(self, chat_key: str) -> Optional[Dict]:
+        """
+        Cached summary entry of a chat
+
+        Args:
+            chat_key: Chat identifier
+
+        Returns:
+            {"covered", "digest", "summary"} or None
+        """
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(chat_key)
+            if item is not None and item[1] < now:
+                del self._entries[chat_key]
+                item = None
+            if item is not None:
+                self._entries.move_to_end(chat_key)
+
+        entry = item[0] if item is not None else None
+        if entry is None and self.redis is not None:
+            entry = self.redis.get(self._redis_key(chat_key))
+            if entry:
+                self._put_local(chat_key, entry)
+
+        if entry:
+            self._hit_counter.inc()
+        else:
+            self._miss_counter.inc()
+        return entry or None
+
+    def put(self, chat_key: str, entry: Dict):
+        """
+        Store the summary entry of a chat (JSON-serializable)
+
+        Args:
+            chat_key: Chat identifier
+            entry: {"covered", "digest", "summary"}
+        """
+        self._put_local(chat_key, entry)
+        if self.redis is not None:
+            self.redis.set(self._redis_key(chat_key), entry, ttl=self.ttl)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "redis": self.redis is not None,
+            }
+
+    def _put_local(self, chat_key: str, entry: Dict):
+        with self._lock:
+            self._entries[chat_key] = (entry, time.time() + self.ttl)
+            self._entries.move_to_end(chat_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _redis_key(chat_key: str) -> str:
+        return f"histsum:{chat_key}"
+
+
+# Process-wide singleton
+_cache: Optional[ConversationSummaryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> ConversationSummaryCache:
+    """
+    Get the process-wide conversation summary cache (configured from RAGConfig)
+
+    Returns:
+        ConversationSummaryCache instance
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from Chatbot.config.rag_config import get_rag_config
+                config = get_rag_config()
+
+                redis_cache = None
+                if config.enable_cache:
+                    from Chatbot.cache.RedisCache import RedisCache
+                    redis_cache = RedisCache(db=config.redis_db)
+                    if not redis_cache.is_available():
+                        redis_cache = None
+
+                _cache = ConversationSummaryCache(
+                    max_entries=config.history_summary_cache_size,
+                    ttl=config.history_summary_ttl,
+                    redis_cache=redis_cache
+                )
+    return _cache
@@ -0,0 +1,171 @@
+"""
+Corpus generation tracker - coordinated cache invalidation
+Mỗi namespace (và toàn corpus, namespace "*") có một generation counter lưu
+trong DB (bảng corpus_generations), mirror sang Redis hash corpus:generations.
+Ingest/delete chỉ cần bump() → mọi cache key có chứa generation (RedisCache
+.corpus_key, semantic answer cache, hydration cache) tự động bị bỏ qua ở tất
+cả các worker: invalidation O(1), không cần KEYS/DEL quét keyspace.
+
+Workers đọc generation từ Redis (1 HGETALL) tối đa mỗi poll_interval giây;
+không có Redis thì đọc thẳng từ DB.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from Chatbot.dao.CorpusGenerationDAO import CorpusGenerationDAO, GLOBAL_NAMESPACE
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusGenerationTracker:
+    """
+    Process-local view of the corpus generations
+
+    get() is called on every cache lookup, so it serves a snapshot refreshed
+    at most once per poll_interval; bump() in this process updates the
+    snapshot immediately.
+    """
+
+    def __init__(self, poll_interval: float = 1.0, redis_cache=None, session_factory=None):
+        """
+        Initialize tracker
+
+        Args:
+            poll_interval: Seconds between refreshes of the snapshot
+            redis_cache: Optional RedisCache holding the mirror (None = DB only)
+            session_factory: Callable returning a DB session (default BE SessionLocal)
+        """
+        self.poll_interval = poll_interval
+        self.redis = redis_cache
+        self._session_factory = session_factory
+
+        self._generations: Dict[str, int] = {}
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, namespace: Optional[str] = None) -> int:
+        """
+        Current generation of a namespace
+
+        Args:
+            namespace: Namespace (None = whole corpus)
+
+        Returns:
+            Generation (0 if never bumped)
+        """
+        self._maybe_refresh()
+        return self._generations.get(namespace or GLOBAL_NAMESPACE, 0)
+
+    def get_all(self) -> Dict[str, int]:
+        """
+        Current generations of every namespace that was ever bumped
+
+        Returns:
+            Dict namespace → generation (the whole corpus under GLOBAL_NAMESPACE)
+        """
+        self._maybe_refresh()
+        with self._lock:
+            return dict(self._generations)
+
+    def bump(self, db: Session, namespaces: Iterable[str]) -> Dict[str, int]:
+        """
+        Record a corpus change (call after ingest/delete is committed)
+
+        Args:
+            db: Database session
+            namespaces: Namespaces whose content changed (global is always bumped)
+
+        Returns:
+            Dict namespace → new generation
+        """
+        generations = CorpusGenerationDAO(db).bump(namespaces)
+        if self.redis is not None:
+            self.redis.mirror_generations(generations)
+        with self._lock:
+            for namespace, generation in generations.items():
+                if generation > self._generations.get(namespace, 0):
+                    self._generations[namespace] = generation
+        logger.info(f"Corpus generation bumped: {generations}")
+        return generations
+
+    def get_stats(self) -> dict:
+        self._maybe_refresh()
+        return {
+            "global": self._generations.get(GLOBAL_NAMESPACE, 0),
+            "namespaces": len(self._generations) - (GLOBAL_NAMESPACE in self._generations),
+            "redis": self.redis is not None,
+        }
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if now - self._refreshed_at < self.poll_interval:
+            return
+        with self._lock:
+            if now - self._refreshed_at < self.poll_interval:
+                return
+            self._refreshed_at = now
+
+        generations = self.redis.get_generations() if self.redis is not None else None
+        if not generations:
+            # Redis unavailable or mirror empty (flushed/restarted): DB is the source of truth
+            generations = self._load_from_db()
+            if generations and self.redis is not None:
+                self.redis.mirror_generations(generations)
+        if generations is None:
+            return
+
+        with self._lock:
+            for namespace, generation in generations.items():
+                if generation > self._generations.get(namespace, 0):
+                    self._generations[namespace] = generation
+
+    def _load_from_db(self) -> Optional[Dict[str, int]]:
+        try:
+            if self._session_factory is None:
+                from BE.db.session import SessionLocal
+                self._session_factory = SessionLocal
+            db = self._session_factory()
+            try:
+                return CorpusGenerationDAO(db).get_all()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Failed to load corpus generations: {e}")
+            return None
+
+
+# Process-wide singleton
+_tracker: Optional[CorpusGenerationTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_corpus_generation() -> CorpusGenerationTracker:
+    """
+    Get the process-wide corpus generation tracker (configured from RAGConfig)
+
+    Returns:
+        CorpusGenerationTracker instance
+    """
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                from Chatbot.config.rag_config import get_rag_config
+                config = get_rag_config()
+
+                redis_cache = None
+                if config.enable_cache:
+                    from Chatbot.cache.RedisCache import RedisCache
+                    redis_cache = RedisCache(db=config.redis_db)
+                    if not redis_cache.is_available():
+                        redis_cache = None
+
+                _tracker = CorpusGenerationTracker(
+                    poll_interval=config.corpus_generation_poll_interval,
+                    redis_cache=redis_cache
+                )
+    return _tracker
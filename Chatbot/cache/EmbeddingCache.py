@@ -0,0 +1,195 @@
+"""
+Two-tier embedding cache for the RAG system
+Tier 1: bounded in-process LRU (no network)
+Tier 2: Redis with raw float32 values (shared by all workers)
+"""
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Embedding cache keyed by (model, normalized text)
+
+    Lookup order: LRU → Redis (MGET) → miss
+    Redis hits are promoted into the LRU so repeated questions stay in-process
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 4096,
+        redis_cache=None,
+        ttl: int = 7 * 24 * 3600,
+        provider: str = "huggingface"
+    ):
+        """
+        Initialize embedding cache
+
+        Args:
+            model_name: Embedding model name (part of every key)
+            max_entries: Max vectors kept in the in-process LRU (0 = disable tier 1)
+            redis_cache: Optional RedisCache instance (None = disable tier 2)
+            ttl: Redis time-to-live in seconds
+            provider: Embedding provider (part of the Redis key)
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.redis = redis_cache
+        self.ttl = ttl
+        self.provider = provider
+
+        self._lru: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._lru_hits = 0
+        self._lru_misses = 0
+        self._redis_hits = 0
+        self._redis_misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize text before keying (NFC, collapsed whitespace)
+        So "Học phí  " and "Học phí" share one cache entry
+        """
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    # ===== Tier 1: LRU =====
+
+    def _lru_get(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: Tuple[str, str], vector: np.ndarray):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    # ===== Public API =====
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Get cached vector for one text (None on miss)"""
+        return self.get_many([text])[0]
+
+    def put(self, text: str, vector: np.ndarray):
+        """Cache vector for one text in both tiers"""
+        self.put_many([text], [vector])
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up many texts; only LRU misses go to Redis (one MGET)
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List aligned with texts: vector on hit, None on miss
+        """
+        normalized = [self.normalize(text) for text in texts]
+        results: List[Optional[np.ndarray]] = []
+        lru_missing: List[int] = []
+
+        for i, norm in enumerate(normalized):
+            vector = self._lru_get((self.model_name, norm))
+            results.append(vector)
+            if vector is None:
+                lru_missing.append(i)
+
+        lru_hits = len(texts) - len(lru_missing)
+        redis_hits = 0
+
+        if lru_missing and self.redis is not None:
+            fetched = self.redis.get_cached_embeddings(
+                [normalized[i] for i in lru_missing],
+                provider=self.provider,
+                model=self.model_name
+            )
+            for i, vector in zip(lru_missing, fetched):
+                if vector is not None:
+                    results[i] = vector
+                    redis_hits += 1
+                    self._lru_put((self.model_name, normalized[i]), vector)
+
+        with self._lock:
+            self._lru_hits += lru_hits
+            self._lru_misses += len(lru_missing)
+            if self.redis is not None:
+                self._redis_hits += redis_hits
+                self._redis_misses += len(lru_missing) - redis_hits
+
+        return results
+
+    def put_many(self, texts: List[str], vectors: List[np.ndarray]):
+        """
+        Store many vectors; Redis writes are pipelined in one round trip
+
+        Args:
+            texts: Input texts
+            vectors: Vectors aligned with texts
+        """
+        if not texts:
+            return
+
+        normalized = [self.normalize(text) for text in texts]
+        vectors = [np.asarray(v, dtype=np.float32) for v in vectors]
+
+        for norm, vector in zip(normalized, vectors):
+            self._lru_put((self.model_name, norm), vector)
+
+        if self.redis is not None:
+            self.redis.cache_embeddings(
+                normalized,
+                vectors,
+                provider=self.provider,
+                model=self.model_name,
+                ttl=self.ttl
+            )
+
+    def clear(self):
+        """Drop the in-process tier (Redis entries expire by TTL)"""
+        with self._lock:
+            self._lru.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Hit ratios per tier (for /api/rag/health)
+
+        Returns:
+            Dict with LRU and Redis hit/miss counters
+        """
+        def ratio(hits: int, misses: int) -> Optional[float]:
+            total = hits + misses
+            return round(hits / total, 4) if total else None
+
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "lru": {
+                    "size": len(self._lru),
+                    "max_entries": self.max_entries,
+                    "hits": self._lru_hits,
+                    "misses": self._lru_misses,
+                    "hit_ratio": ratio(self._lru_hits, self._lru_misses),
+                },
+                "redis": {
+                    "enabled": self.redis is not None,
+                    "hits": self._redis_hits,
+                    "misses": self._redis_misses,
+                    "hit_ratio": ratio(self._redis_hits, self._redis_misses),
+                },
+            }
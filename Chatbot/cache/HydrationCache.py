@@ -0,0 +1,204 @@
+"""
+Hot-chunk cache for retrieval hydration
+Bounded in-process LRU of chunk / document projections (plain dicts), sized
+in bytes. Các chunk hay xuất hiện (địa chỉ cơ sở, bảng học phí, chỉ tiêu
+tuyển sinh) không phải đọc lại từ SQL ở mỗi request.
+
+Entries are invalidated by the DAO write paths (ingest, document delete) and
+dropped wholesale when the corpus generation moves (writes in other workers).
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Chatbot.utils.metrics import get_metrics
+
+
+def estimate_size(value) -> int:
+    """Approximate deep memory size of a projection (dict/list/str/scalars)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+class HydrationCache:
+    """
+    Memory-accounted LRU keyed by (kind, id), kind = "chunk" | "doc"
+
+    Evicts least recently used entries until the total estimated size is
+    under max_bytes. Counts hits/misses and SQL queries avoided (a lookup
+    fully served from cache skips its SELECT).
+    """
+
+    def __init__(self, max_bytes: int, generations=None):
+        """
+        Initialize cache
+
+        Args:
+            max_bytes: Memory budget in bytes (0 = disabled)
+            generations: Optional CorpusGenerationTracker (None = DAO invalidation only)
+        """
+        self.max_bytes = max_bytes
+        self.generations = generations
+        self._generation = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._queries_saved = 0
+
+        metrics = get_metrics()
+        self._hit_counter = metrics.counter("rag_hydration_cache_hits_total", "Chunk/document projections served from cache")
+        self._miss_counter = metrics.counter("rag_hydration_cache_misses_total", "Chunk/document projections loaded from SQL")
+        self._saved_counter = metrics.counter("rag_hydration_sql_queries_saved_total", "SQL lookups skipped thanks to the cache")
+        self._bytes_gauge = metrics.gauge("rag_hydration_cache_bytes", "Estimated memory held by the hydration cache")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get_many(self, kind: str, ids: Iterable[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Look up projections
+
+        Args:
+            kind: "chunk" or "doc"
+            ids: IDs to look up
+
+        Returns:
+            (found id → projection, missing ids)
+        """
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        if not self.enabled:
+            return found, list(ids)
+
+        self._sync_generation()
+        with self._lock:
+            for item_id in ids:
+                entry = self._entries.get((kind, item_id))
+                if entry is None:
+                    missing.append(item_id)
+                else:
+                    self._entries.move_to_end((kind, item_id))
+                    found[item_id] = entry[0]
+            self._hits += len(found)
+            self._misses += len(missing)
+            if found and not missing:
+                self._queries_saved += 1
+                self._saved_counter.inc()
+
+        self._hit_counter.inc(len(found))
+        self._miss_counter.inc(len(missing))
+        return found, missing
+
+    def put_many(self, kind: str, projections: Dict[str, Dict]):
+        """
+        Store projections (callers must not mutate them afterwards)
+
+        Args:
+            kind: "chunk" or "doc"
+            projections: id → projection dict
+        """
+        if not self.enabled or not projections:
+            return
+
+        self._sync_generation()
+        with self._lock:
+            for item_id, projection in projections.items():
+                size = estimate_size(projection)
+                if size > self.max_bytes:
+                    continue
+                old = self._entries.pop((kind, item_id), None)
+                if old is not None:
+                    self._bytes -= old[1]
+                self._entries[(kind, item_id)] = (projection, size)
+                self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                self._evictions += 1
+            self._bytes_gauge.set(self._bytes)
+
+    def invalidate(self, kind: str, ids: Iterable[str]):
+        """
+        Drop projections whose rows changed
+
+        Args:
+            kind: "chunk" or "doc"
+            ids: IDs to drop
+        """
+        with self._lock:
+            for item_id in ids:
+                entry = self._entries.pop((kind, item_id), None)
+                if entry is not None:
+                    self._bytes -= entry[1]
+            self._bytes_gauge.set(self._bytes)
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def _sync_generation(self):
+        """Drop everything when another worker changed the corpus"""
+        if self.generations is None:
+            return
+        generation = self.generations.get()
+        with self._lock:
+            if generation != self._generation:
+                self._clear_locked()
+                self._generation = generation
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._bytes_gauge.set(0)
+
+    def get_stats(self) -> dict:
+        """Hit ratio, memory use and SQL queries saved"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "evictions": self._evictions,
+                "sql_queries_saved": self._queries_saved,
+            }
+
+
+# Process-wide singleton
+_cache: Optional[HydrationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_hydration_cache() -> HydrationCache:
+    """
+    Get the process-wide hydration cache (sized by config.hydration_cache_mb)
+
+    Returns:
+        HydrationCache instance
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from Chatbot.cache.CorpusGenerationTracker import get_corpus_generation
+                from Chatbot.config.rag_config import get_rag_config
+                _cache = HydrationCache(
+                    int(get_rag_config().hydration_cache_mb * 1024 * 1024),
+                    generations=get_corpus_generation()
+                )
+    return _cache
@@ -6,12 +6,26 @@ Following reference implementation pattern
 import json
 import hashlib
 import logging
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
+import numpy as np
 import redis
 from Chatbot.config.rag_config import get_rag_config
 
 logger = logging.getLogger(__name__)
 
+GENERATIONS_KEY = "corpus:generations"
+
+# HSET only if the new generation is higher (mirrors never move backwards)
+_HSET_MAX_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    local current = tonumber(redis.call('HGET', KEYS[1], ARGV[i]) or '0')
+    if tonumber(ARGV[i + 1]) > current then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+return 1
+"""
+
 
 class RedisCache:
     """
@@ -85,14 +99,77 @@ class RedisCache:
         hash_obj = hashlib.sha256(data.encode('utf-8'))
         return f"{prefix}:{hash_obj.hexdigest()[:16]}"
 
+    def corpus_key(self, prefix: str, data: str, namespace: Optional[str] = None) -> str:
+        """
+        Cache key for values derived from the corpus (answers, retrieval results)
+        The corpus generation is part of the key: after an ingest/delete the old
+        entries are simply never read again and expire by TTL (no KEYS/DEL sweep)
+
+        Args:
+            prefix: Key prefix (e.g., "semans")
+            data: Data to hash
+            namespace: Namespace the value depends on (None = whole corpus)
+
+        Returns:
+            Cache key
+        """
+        from Chatbot.cache.CorpusGenerationTracker import get_corpus_generation
+        generation = get_corpus_generation().get(namespace)
+        return self._generate_key(f"{prefix}:g{generation}", data)
+
+    # ===== Corpus generation mirror =====
+
+    def get_generations(self) -> Optional[Dict[str, int]]:
+        """
+        Mirrored corpus generations (one HGETALL)
+
+        Returns:
+            Dict namespace → generation, or None if Redis is unavailable
+        """
+        if self._client is None:
+            return None
+        try:
+            return {
+                field.decode('utf-8'): int(value)
+                for field, value in self._client.hgetall(GENERATIONS_KEY).items()
+            }
+        except Exception as e:
+            logger.warning(f"Failed to read corpus generations: {e}")
+            return None
+
+    def mirror_generations(self, generations: Dict[str, int]) -> bool:
+        """
+        Publish generations from the database (monotonic: lower values are ignored)
+
+        Args:
+            generations: Dict namespace → generation
+
+        Returns:
+            True if mirrored
+        """
+        if self._client is None or not generations:
+            return False
+        try:
+            args = [item for namespace, generation in generations.items() for item in (namespace, generation)]
+            self._client.eval(_HSET_MAX_SCRIPT, 1, GENERATIONS_KEY, *args)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to mirror corpus generations: {e}")
+            return False
+
     # ===== Embedding Cache =====
+    # Vectors are stored as raw float32 bytes (4 bytes/dim) instead of JSON floats
+
+    def _embedding_key(self, text: str, provider: str, model: str) -> str:
+        """Cache key for an embedding (f32 prefix keeps it apart from legacy JSON entries)"""
+        return self._generate_key(f"emb:f32:{provider}:{model}", text)
 
     def get_cached_embedding(
         self,
         text: str,
         provider: str = "huggingface",
         model: str = "all-MiniLM-L6-v2"
-    ) -> Optional[List[float]]:
+    ) -> Optional[np.ndarray]:
         """
         Get cached embedding for text
 
@@ -102,30 +179,45 @@ class RedisCache:
             model: Model name
 
         Returns:
-            Cached embedding or None
+            Cached embedding (float32 array) or None
         """
-        if not self.is_available():
-            return None
+        return self.get_cached_embeddings([text], provider=provider, model=model)[0]
+
+    def get_cached_embeddings(
+        self,
+        texts: List[str],
+        provider: str = "huggingface",
+        model: str = "all-MiniLM-L6-v2"
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Get cached embeddings for many texts with a single MGET round trip
+
+        Args:
+            texts: Input texts
+            provider: Embedding provider
+            model: Model name
+
+        Returns:
+            List aligned with texts: float32 array on hit, None on miss
+        """
+        if self._client is None or not texts:
+            return [None] * len(texts)
 
         try:
-            cache_key = self._generate_key(
-                f"emb:{provider}:{model}",
-                text
-            )
-            cached = self._client.get(cache_key)
-            if cached:
-                embedding = json.loads(cached.decode('utf-8'))
-                logger.debug(f"Embedding cache HIT for text: {text[:50]}...")
-                return embedding
-            return None
+            keys = [self._embedding_key(text, provider, model) for text in texts]
+            values = self._client.mget(keys)
+            return [
+                np.frombuffer(value, dtype=np.float32) if value else None
+                for value in values
+            ]
         except Exception as e:
-            logger.warning(f"Failed to get cached embedding: {e}")
-            return None
+            logger.warning(f"Failed to get cached embeddings: {e}")
+            return [None] * len(texts)
 
     def cache_embedding(
         self,
         text: str,
-        embedding: List[float],
+        embedding: np.ndarray,
         provider: str = "huggingface",
         model: str = "all-MiniLM-L6-v2",
         ttl: int = 7 * 24 * 3600  # 7 days default
@@ -143,20 +235,41 @@ class RedisCache:
         Returns:
             True if cached successfully
         """
-        if not self.is_available():
+        return self.cache_embeddings([text], [embedding], provider=provider, model=model, ttl=ttl)
+
+    def cache_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[np.ndarray],
+        provider: str = "huggingface",
+        model: str = "all-MiniLM-L6-v2",
+        ttl: int = 7 * 24 * 3600
+    ) -> bool:
+        """
+        Cache many embeddings in one pipelined round trip
+
+        Args:
+            texts: Input texts
+            embeddings: Embedding vectors aligned with texts
+            provider: Embedding provider
+            model: Model name
+            ttl: Time-to-live in seconds
+
+        Returns:
+            True if cached successfully
+        """
+        if self._client is None or not texts:
             return False
 
         try:
-            cache_key = self._generate_key(
-                f"emb:{provider}:{model}",
-                text
-            )
-            value = json.dumps(embedding)
-            self._client.setex(cache_key, ttl, value)
-            logger.debug(f"Cached embedding for text: {text[:50]}...")
+            pipe = self._client.pipeline(transaction=False)
+            for text, embedding in zip(texts, embeddings):
+                value = np.asarray(embedding, dtype=np.float32).tobytes()
+                pipe.setex(self._embedding_key(text, provider, model), ttl, value)
+            pipe.execute()
             return True
         except Exception as e:
-            logger.warning(f"Failed to cache embedding: {e}")
+            logger.warning(f"Failed to cache embeddings: {e}")
             return False
 
     # ===== Query Result Cache =====
@@ -226,12 +339,16 @@ class RedisCache:
             logger.warning(f"Failed to delete cache: {e}")
             return False
 
-    def clear_pattern(self, pattern: str) -> int:
+    def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
         """
         Clear all keys matching pattern
+        Maintenance only: corpus-derived keys are invalidated by the generation in
+        corpus_key(). Walks the keyspace with SCAN + UNLINK in batches instead of
+        the blocking KEYS command.
 
         Args:
             pattern: Key pattern (e.g., "emb:*")
+            batch_size: Keys per SCAN page / UNLINK call
 
         Returns:
             Number of keys deleted
@@ -240,10 +357,16 @@ class RedisCache:
             return 0
 
         try:
-            keys = self._client.keys(pattern)
-            if keys:
-                return self._client.delete(*keys)
-            return 0
+            deleted = 0
+            batch = []
+            for key in self._client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += self._client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += self._client.unlink(*batch)
+            return deleted
         except Exception as e:
             logger.warning(f"Failed to clear pattern: {e}")
             return 0
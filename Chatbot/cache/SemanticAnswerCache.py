@@ -0,0 +1,238 @@
+"""
+Semantic answer cache for near-duplicate questions
+Sinh viên hỏi lặp lại cùng một ý với cách diễn đạt khác nhau ("địa chỉ cơ sở
+Hà Nội", "cơ sở HN ở đâu"): câu trả lời đã generate được dùng lại khi embedding
+của câu hỏi đủ gần, bỏ qua retrieval + LLM.
+
+- Tier 1: in-process vector index nhỏ (NumPy matmul) với TTL + LRU eviction
+- Tier 2 (optional): Redis, key theo câu hỏi đã normalize (RedisCache
+  .corpus_key), dùng chung giữa các worker; hit từ Redis được đưa vào tier 1
+- Mọi entry gắn với corpus generation (CorpusGenerationTracker): ingest/delete
+  bump generation → mọi worker bỏ entries cũ, Redis keys cũ không còn được đọc
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from Chatbot.cache.CorpusGenerationTracker import get_corpus_generation
+from Chatbot.cache.EmbeddingCache import EmbeddingCache
+from Chatbot.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """
+    Cosine-similarity cache of answers, scoped by (domain, model, top_k)
+
+    Entries are (normalized question vector, scope, answer payload, expiry).
+    A lookup returns the most similar live entry of the same scope if its
+    similarity is at least `threshold`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl: int = 3600,
+        threshold: float = 0.92,
+        redis_cache=None,
+        generations=None
+    ):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Max entries in the in-process index (LRU beyond that)
+            ttl: Entry time-to-live in seconds
+            threshold: Minimum cosine similarity for a hit (0-1)
+            redis_cache: Optional RedisCache instance (None = in-process only)
+            generations: CorpusGenerationTracker (default process-wide tracker)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.redis = redis_cache
+
+        self._entries: "OrderedDict[int, Tuple[Tuple, np.ndarray, Dict, float]]" = OrderedDict()
+        self._next_id = 0
+        self._matrix: Optional[np.ndarray] = None  # Rebuilt lazily after writes
+        self._matrix_ids: list = []
+        self._lock = threading.Lock()
+
+        self.generations = generations or get_corpus_generation()
+        self._generation = 0  # Corpus generation of the in-process entries
+
+        metrics = get_metrics()
+        self._hit_counter = metrics.counter("rag_semantic_cache_hits_total", "Answers served from the semantic cache")
+        self._miss_counter = metrics.counter("rag_semantic_cache_misses_total", "Semantic cache lookups that ran the full pipeline")
+
+    # ===== Lookup / store =====
+
+    def lookup(self, question: str, vector: np.ndarray, scope: Tuple) -> Optional[Tuple[Dict, float]]:
+        """
+        Find a cached answer for a near-duplicate question
+
+        Args:
+            question: Question text (Redis tier key)
+            vector: Question embedding
+            scope: (domain, model, top_k) - entries of other scopes never match
+
+        Returns:
+            (answer payload, similarity) or None
+        """
+        self._sync_generation()
+        query = self._normalize(vector)
+
+        hit = self._lookup_local(query, scope)
+        if hit is None and self.redis is not None:
+            hit = self._lookup_redis(question, scope)
+
+        if hit is None:
+            self._miss_counter.inc()
+        else:
+            self._hit_counter.inc()
+        return hit
+
+    def put(self, question: str, vector: np.ndarray, scope: Tuple, value: Dict):
+        """
+        Store an answer (value must be JSON-serializable for the Redis tier)
+
+        Args:
+            question: Question text
+            vector: Question embedding
+            scope: (domain, model, top_k)
+            value: Answer payload (answer, citations, domain, namespace)
+        """
+        self._sync_generation()
+        vector = self._normalize(vector)
+        self._put_local(vector, scope, value)
+
+        if self.redis is not None:
+            self.redis.set(
+                self._redis_key(question, scope),
+                {"vector": vector.tolist(), "value": value},
+                ttl=self.ttl
+            )
+
+    def invalidate(self):
+        """Drop the in-process entries (corpus changes are picked up via the generation)"""
+        with self._lock:
+            self._clear_locked()
+        logger.info("Semantic answer cache cleared")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "ttl": self.ttl,
+                "generation": self._generation,
+                "redis": self.redis is not None,
+            }
+
+    # ===== Tier 1: in-process index =====
+
+    def _lookup_local(self, query: np.ndarray, scope: Tuple) -> Optional[Tuple[Dict, float]]:
+        now = time.time()
+        with self._lock:
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries)
+                self._matrix = np.stack([self._entries[i][1] for i in self._matrix_ids])
+
+            scores = self._matrix @ query
+            for row in np.argsort(-scores):
+                if scores[row] < self.threshold:
+                    return None
+                entry_id = self._matrix_ids[row]
+                entry = self._entries.get(entry_id)
+                if entry is None or entry[0] != scope:
+                    continue
+                if entry[3] < now:
+                    del self._entries[entry_id]
+                    self._matrix = None
+                    continue
+                self._entries.move_to_end(entry_id)
+                return entry[2], float(scores[row])
+        return None
+
+    def _put_local(self, vector: np.ndarray, scope: Tuple, value: Dict):
+        with self._lock:
+            self._entries[self._next_id] = (scope, vector, value, time.time() + self.ttl)
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._matrix = None
+
+    # ===== Tier 2: Redis =====
+
+    def _redis_key(self, question: str, scope: Tuple) -> str:
+        # Answers may cite any namespace (multi-domain): keyed on the whole-corpus generation
+        text = EmbeddingCache.normalize(question).lower()
+        return self.redis.corpus_key("semans", f"{scope}|{text}")
+
+    def _lookup_redis(self, question: str, scope: Tuple) -> Optional[Tuple[Dict, float]]:
+        cached = self.redis.get(self._redis_key(question, scope))
+        if not cached:
+            return None
+        # Same normalized question: promote into the in-process index
+        self._put_local(np.asarray(cached["vector"], dtype=np.float32), scope, cached["value"])
+        return cached["value"], 1.0
+
+    def _sync_generation(self):
+        """Drop entries answered from an older corpus (ingest/delete in any worker)"""
+        generation = self.generations.get()
+        with self._lock:
+            if generation != self._generation:
+                self._clear_locked()
+                self._generation = generation
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+# Process-wide singleton
+_cache: Optional[SemanticAnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticAnswerCache:
+    """
+    Get the process-wide semantic answer cache (configured from RAGConfig)
+
+    Returns:
+        SemanticAnswerCache instance
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from Chatbot.config.rag_config import get_rag_config
+                config = get_rag_config()
+
+                redis_cache = None
+                if config.enable_cache:
+                    from Chatbot.cache.RedisCache import RedisCache
+                    redis_cache = RedisCache(db=config.redis_db)
+                    if not redis_cache.is_available():
+                        redis_cache = None
+
+                _cache = SemanticAnswerCache(
+                    max_entries=config.semantic_cache_max_entries,
+                    ttl=config.semantic_cache_ttl,
+                    threshold=config.semantic_cache_threshold,
+                    redis_cache=redis_cache
+                )
+    return _cache
@@ -1,3 +1,19 @@
 from .RedisCache import RedisCache
+from .EmbeddingCache import EmbeddingCache
+from .CorpusGenerationTracker import CorpusGenerationTracker, get_corpus_generation
+from .HydrationCache import HydrationCache, get_hydration_cache
+from .SemanticAnswerCache import SemanticAnswerCache, get_semantic_cache
+from .ConversationSummaryCache import ConversationSummaryCache, get_summary_cache
 
-__all__ = ["RedisCache"]
+__all__ = [
+    "RedisCache",
+    "EmbeddingCache",
+    "CorpusGenerationTracker",
+    "get_corpus_generation",
+    "HydrationCache",
+    "get_hydration_cache",
+    "SemanticAnswerCache",
+    "get_semantic_cache",
+    "ConversationSummaryCache",
+    "get_summary_cache",
+]
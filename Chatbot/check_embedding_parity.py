@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Embedding backend parity check
+
+So sánh backend ONNX (fp32/int8) với backend torch trên corpus Chatbot/assets/raw:
+- Cosine drift giữa vector torch và vector ONNX của cùng một chunk
+- Độ trùng top-k láng giềng (retrieval có giữ nguyên hay không)
+- Throughput (chunks/giây) của từng backend
+
+Usage:
+  python3 Chatbot/check_embedding_parity.py                     # onnx-int8 vs torch
+  python3 Chatbot/check_embedding_parity.py --backend onnx      # onnx fp32 vs torch
+  python3 Chatbot/check_embedding_parity.py --limit 200 -k 5    # 200 chunks, top-5 overlap
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.utils.chunker import chunk_text
+
+RAW_DIR = Path(__file__).resolve().parent / "assets" / "raw"
+
+
+def load_corpus_chunks(limit: int) -> list:
+    """Chunk every markdown file in assets/raw (same settings as ingest)"""
+    config = get_rag_config()
+    chunks = []
+    for file_path in sorted(RAW_DIR.glob("*.md")):
+        content = file_path.read_text(encoding="utf-8")
+        chunks.extend(chunk_text(content, chunk_size=config.chunk_size, chunk_overlap=config.chunk_overlap))
+        if limit and len(chunks) >= limit:
+            return chunks[:limit]
+    return chunks
+
+
+def encode_timed(model, texts: list, batch_size: int):
+    """Encode texts and return (L2-normalized matrix, chunks/second)"""
+    start = time.perf_counter()
+    matrix = np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+    elapsed = time.perf_counter() - start
+    matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+    return matrix, len(texts) / elapsed
+
+
+def topk_overlap(reference: np.ndarray, candidate: np.ndarray, k: int) -> float:
+    """
+    Mean fraction of shared top-k neighbours when every chunk is used as a query
+    1.0 = retrieval results identical
+    """
+    k = min(k, len(reference) - 1)
+    ref_top = np.argsort(-(reference @ reference.T), axis=1)[:, 1:k + 1]
+    cand_top = np.argsort(-(candidate @ candidate.T), axis=1)[:, 1:k + 1]
+    shared = [len(set(r) & set(c)) / k for r, c in zip(ref_top, cand_top)]
+    return float(np.mean(shared))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ONNX embedding backend with torch")
+    parser.add_argument("--backend", choices=["onnx", "onnx-int8"], default="onnx-int8")
+    parser.add_argument("--limit", type=int, default=500, help="Max chunks to compare (0 = all)")
+    parser.add_argument("-k", type=int, default=10, help="Top-k for neighbour overlap")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    config = get_rag_config()
+    texts = load_corpus_chunks(args.limit)
+    print(f"📚 {len(texts)} chunks from {RAW_DIR}")
+
+    from sentence_transformers import SentenceTransformer
+    from Chatbot.services.OnnxEmbeddingModel import OnnxEmbeddingModel
+
+    torch_model = SentenceTransformer(config.embedding_model, trust_remote_code=True, device="cpu")
+    onnx_model = OnnxEmbeddingModel(
+        config.embedding_model,
+        quantize=(args.backend == "onnx-int8"),
+        cache_dir=config.embedding_onnx_cache_dir,
+        num_threads=config.embedding_num_threads
+    )
+
+    ref, torch_rate = encode_timed(torch_model, texts, args.batch_size)
+    cand, onnx_rate = encode_timed(onnx_model, texts, args.batch_size)
+
+    cosine = np.sum(ref * cand, axis=1)
+    drift = 1.0 - cosine
+    overlap = topk_overlap(ref, cand, args.k)
+
+    print(f"\n{'='*60}")
+    print(f"Model:            {config.embedding_model}")
+    print(f"Backend:          {args.backend} vs torch")
+    print(f"Cosine drift:     mean={drift.mean():.6f}  p99={np.percentile(drift, 99):.6f}  max={drift.max():.6f}")
+    print(f"Top-{args.k} overlap:   {overlap:.4f}")
+    print(f"Throughput torch: {torch_rate:.1f} chunks/s")
+    print(f"Throughput {args.backend}: {onnx_rate:.1f} chunks/s  (x{onnx_rate / torch_rate:.2f})")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Qdrant payload consistency check (vector_payload_mode = "full")
+
+Bảng chunks/documents trong SQL là nguồn sự thật. Script duyệt toàn bộ point
+trong collection và so payload denormalized với SQL:
+- orphan:   point có chunk_id không còn trong SQL (document đã bị xóa)
+- ids-only: point chưa có payload đầy đủ (ingest trước khi bật payload mode)
+- drift:    text/idx/tokens/title/source_uri/category/year/academic_year khác với SQL
+- missing:  chunk trong SQL nhưng không có point nào
+
+Usage:
+  python -m Chatbot.check_payload_consistency                # chỉ báo cáo
+  python -m Chatbot.check_payload_consistency --repair       # ghi lại payload, xóa orphan
+  python -m Chatbot.check_payload_consistency --batch-size 256 --show 20
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from BE.db.session import SessionLocal
+from Chatbot.dao.ChunkDAO import ChunkDAO
+from Chatbot.dao.DocumentDAO import DocumentDAO
+from Chatbot.dao.VectorIndexDAO import VectorIndexDAO
+from Chatbot.models.Chunk import Chunk
+
+PAYLOAD_FIELDS = ("text", "idx", "tokens", "document_id", "title", "source_uri", "category", "year", "academic_year")
+
+
+def diff_payload(payload: dict, expected: dict) -> list:
+    """Field names whose payload value differs from the SQL value"""
+    return [field for field in PAYLOAD_FIELDS if payload.get(field) != expected.get(field)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find drift between Qdrant payloads and SQL")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--repair", action="store_true", help="Rewrite stale payloads and delete orphan points")
+    parser.add_argument("--show", type=int, default=10, help="Number of drifted chunks to print")
+    args = parser.parse_args()
+
+    vidx = VectorIndexDAO()
+    client = vidx._client
+    if client is None:
+        print("❌ Qdrant not available")
+        sys.exit(1)
+
+    db = SessionLocal()
+    chunk_dao = ChunkDAO(db)
+    doc_dao = DocumentDAO(db)
+
+    counts = {"points": 0, "ok": 0, "orphan": 0, "ids_only": 0, "drift": 0, "repaired": 0}
+    seen_chunk_ids = set()
+    shown = 0
+    offset = None
+
+    print(f"Checking collection {vidx.collection_name} ...")
+    try:
+        while True:
+            points, offset = client.scroll(
+                collection_name=vidx.collection_name,
+                limit=args.batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            if not points:
+                break
+
+            chunk_ids = [p.payload.get("chunk_id") for p in points if p.payload]
+            chunks = {c.id: c for c in chunk_dao.find_by_ids([cid for cid in chunk_ids if cid])}
+            docs = doc_dao.find_by_ids(list({c.document_id for c in chunks.values()}))
+
+            orphans = []
+            for point in points:
+                counts["points"] += 1
+                payload = point.payload or {}
+                chunk = chunks.get(payload.get("chunk_id"))
+                if chunk is None:
+                    counts["orphan"] += 1
+                    orphans.append(point.id)
+                    continue
+                seen_chunk_ids.add(chunk.id)
+
+                expected = VectorIndexDAO.chunk_payload(chunk, docs.get(chunk.document_id))
+                if "text" not in payload:
+                    counts["ids_only"] += 1
+                else:
+                    fields = diff_payload(payload, expected)
+                    if not fields:
+                        counts["ok"] += 1
+                        continue
+                    counts["drift"] += 1
+                    if shown < args.show:
+                        print(f"   drift chunk={chunk.id} fields={fields}")
+                        shown += 1
+
+                if args.repair:
+                    client.set_payload(
+                        collection_name=vidx.collection_name,
+                        payload=expected,
+                        points=[point.id],
+                        wait=False
+                    )
+                    counts["repaired"] += 1
+
+            if args.repair and orphans:
+                client.delete(collection_name=vidx.collection_name, points_selector=orphans, wait=True)
+
+            if offset is None:
+                break
+
+        sql_total = db.query(Chunk).count()
+    finally:
+        db.close()
+
+    missing = max(sql_total - len(seen_chunk_ids), 0)
+    print()
+    print(f"Points checked:  {counts['points']}")
+    print(f"  consistent:    {counts['ok']}")
+    print(f"  drift:         {counts['drift']}")
+    print(f"  ids-only:      {counts['ids_only']}")
+    print(f"  orphan:        {counts['orphan']}" + (" (deleted)" if args.repair and counts["orphan"] else ""))
+    print(f"SQL chunks without a point: {missing}" + (" → re-ingest the affected documents" if missing else ""))
+    if args.repair:
+        print(f"✅ Repaired {counts['repaired']} payloads")
+    elif counts["drift"] or counts["ids_only"] or counts["orphan"]:
+        print("ℹ️  Run with --repair to fix payloads")
+
+    if missing or (not args.repair and (counts["drift"] or counts["ids_only"] or counts["orphan"])):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
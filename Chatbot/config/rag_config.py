@@ -23,31 +23,105 @@ class RAGConfig(BaseModel):
     # - "BAAI/bge-small-en-v1.5" (384 dim, state-of-the-art)
     # - "intfloat/multilingual-e5-base" (768 dim, multilingual)
 
+    # Inference backend: "torch" (SentenceTransformer), "onnx" (ONNX Runtime fp32),
+    # "onnx-int8" (ONNX Runtime, dynamic int8 quantization - fastest on CPU)
+    embedding_backend: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    embedding_onnx_cache_dir: str = "./data/onnx"  # Exported ONNX graphs are cached here
+    embedding_num_threads: Optional[int] = None  # ONNX Runtime intra-op threads (None = auto)
+
+    # Batch embedding (ingest): misses are length-sorted into batches of embed_batch_size
+    embed_batch_size: int = 32  # Texts per model.encode call
+    embed_stream_window: int = 256  # Texts buffered per streamed matrix (bounds ingest memory)
+
+    # Embedding worker pool: "inprocess" loads the model in every server process,
+    # "remote" talks to `python -m Chatbot.embedding_worker` over unix sockets
+    embedding_worker_mode: str = os.getenv("EMBEDDING_WORKER_MODE", "inprocess")
+    embedding_worker_socket: str = os.getenv("EMBEDDING_WORKER_SOCKET", "/tmp/ptit_embedding.sock")
+    embedding_worker_count: int = int(os.getenv("EMBEDDING_WORKER_COUNT", "1"))
+
+    # Micro-batching: concurrent embed() calls are flushed as one encode batch
+    enable_embed_batching: bool = True
+    embed_batch_max_size: int = 32  # Flush when this many questions are queued
+    embed_batch_max_wait_ms: float = 5.0  # Max wait for the first queued question (ms)
+    embed_batch_timeout: float = 30.0  # Max seconds embed() waits for its batch before giving up
+
     # ===== LLM Settings =====
     llm_backend: str = "openai"  # "openai", "anthropic", "local"
     llm_model: str = "gpt-3.5-turbo"
     llm_max_tokens: int = 800  # Increased for more detailed answers
     llm_temperature: float = 0.7
+    # OpenAI-compatible endpoint (None = api.openai.com); load tests point it at
+    # `python -m Chatbot.fake_llm_server` instead of paying for real completions
+    llm_base_url: Optional[str] = os.getenv("LLM_BASE_URL")
     openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
     anthropic_api_key: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
 
+    # Async answer pipeline: blocking stages (embedding, Qdrant/SQL retrieval) run on a
+    # shared thread pool, LLM calls use AsyncOpenAI/AsyncAnthropic on one HTTP pool
+    async_executor_workers: int = int(os.getenv("ASYNC_EXECUTOR_WORKERS", "32"))
+    async_embed_concurrency: int = int(os.getenv("ASYNC_EMBED_CONCURRENCY", "8"))  # Concurrent embed calls per worker
+    async_retrieval_concurrency: int = int(os.getenv("ASYNC_RETRIEVAL_CONCURRENCY", "16"))  # Concurrent search + hydration
+    async_llm_concurrency: int = int(os.getenv("ASYNC_LLM_CONCURRENCY", "64"))  # In-flight LLM requests per worker
+    llm_http_max_connections: int = 100  # Shared async HTTP pool to the LLM providers
+    llm_http_max_keepalive: int = 20
+    llm_http_keepalive_expiry: float = 60.0  # Seconds an idle provider connection stays open
+    llm_request_timeout: float = 60.0  # Seconds
+
+    # LLM tail latency: every answer has a deadline (AnswerRequest.deadline_ms from the caller,
+    # or llm_default_deadline); slow/failed calls are hedged and retried on a cheaper model
+    llm_default_deadline: float = float(os.getenv("LLM_DEFAULT_DEADLINE", "25"))  # Seconds, when the caller sends none
+    llm_fallback_model: Optional[str] = os.getenv("LLM_FALLBACK_MODEL")  # e.g. "gpt-4o-mini" (None = no fallback)
+    llm_fallback_reserve: float = 5.0  # Seconds of the deadline kept for the fallback model
+    enable_llm_hedging: bool = os.getenv("ENABLE_LLM_HEDGING", "false").lower() == "true"
+    llm_hedge_quantile: float = 0.95  # Hedge after this quantile of the model's recent latencies
+    llm_hedge_min_samples: int = 20  # Latency samples needed before hedging starts
+    llm_hedge_min_delay: float = 0.2  # Never hedge earlier than this (seconds)
+
+    # Warm LLM clients per (backend, model): switching models in the UI reuses them
+    llm_client_pool_size: int = 8  # Max pooled clients (LRU beyond that, default model pinned)
+    llm_client_idle_seconds: float = 900  # Evict clients unused for this long
+
+    # Conversation history compaction: recent messages verbatim, older ones folded into a
+    # rolling summary cached per chat. History has its own budget, separate from token_budget
+    history_token_budget: int = int(os.getenv("HISTORY_TOKEN_BUDGET", "1200"))  # Summary + recent messages
+    history_recent_messages: int = 6  # Messages kept verbatim (3 turns)
+    history_summary_max_tokens: int = 300
+    history_summary_batch: int = 4  # Fold older messages only once this many are pending (fewer LLM calls)
+    history_summary_model: Optional[str] = os.getenv("HISTORY_SUMMARY_MODEL")  # None = llm_model
+    history_summary_timeout: float = 5.0  # Seconds; slower summaries fall back to the extractive one
+    history_summary_cache_size: int = 4096  # Chats whose summary is held in process
+    history_summary_ttl: int = 24 * 3600  # Seconds
+
     # LLM model options:
     # OpenAI: "gpt-3.5-turbo", "gpt-4", "gpt-4-turbo"
     # Anthropic: "claude-3-sonnet-20240229", "claude-3-opus-20240229"
     # Local: Path to local model or HuggingFace model ID
 
     # ===== Vector Store Settings =====
-    vector_store_type: str = "qdrant"  # "database", "qdrant", "faiss", "chromadb", "pinecone"
+    vector_store_type: str = os.getenv("VECTOR_STORE_TYPE", "qdrant")  # "qdrant" or "local" (in-process NumPy index)
     use_faiss: bool = False  # Enable FAISS for faster search (legacy)
     vector_store_path: Optional[str] = "./data/vector_store"  # Path for file-based stores
 
+    # Local vector index (vector_store_type = "local", or failover for Qdrant)
+    vector_failover: bool = os.getenv("VECTOR_FAILOVER", "false").lower() == "true"  # Answer from local index when Qdrant is down
+    local_vector_mmap_threshold_mb: float = 256  # Memory-map vectors.f32 above this size instead of loading it
+    local_vector_hnsw: bool = False  # Approximate search with hnswlib (exact NumPy top-k otherwise)
+    hnsw_m: int = 16  # HNSW graph degree
+    hnsw_ef_search: int = 64  # HNSW search breadth (recall vs latency)
+    hnsw_min_points: int = 20000  # Below this, exact search is fast enough - no graph is built
+
     # Qdrant Configuration
-    qdrant_host: str = os.getenv("QDRANT_HOST", "localhost")
+    qdrant_host: str = os.getenv("QDRANT_HOST", "localhost")  # ":memory:" = in-process Qdrant (load tests, no server)
     qdrant_port: int = int(os.getenv("QDRANT_PORT", "6333"))
     qdrant_api_key: Optional[str] = os.getenv("QDRANT_API_KEY")
     qdrant_collection_name: str = os.getenv("QDRANT_COLLECTION", "ptit_documents")
     qdrant_timeout: int = 30  # Connection timeout in seconds
 
+    # Point payload: "ids" (chunk_id only, hits hydrated from SQL) or
+    # "full" (chunk text + document fields denormalized, no SQL on the query path).
+    # Backfill existing points with: python -m Chatbot.check_payload_consistency --repair
+    vector_payload_mode: str = os.getenv("VECTOR_PAYLOAD_MODE", "ids")
+
     # ===== Chunking Settings =====
     chunk_size: int = 512  # Characters per chunk
     chunk_overlap: int = 50  # Overlapping characters
@@ -57,8 +131,28 @@ class RAGConfig(BaseModel):
     # ===== Retrieval Settings =====
     default_top_k: int = 10  # Number of chunks to retrieve (increased for better coverage)
     default_token_budget: int = 2000  # Max tokens for context
+    # Token counting: real tokenizer of the LLM family (tiktoken), counts stored per chunk at ingest
+    token_count_models: str = os.getenv("TOKEN_COUNT_MODELS", "")  # Extra models (comma-separated) whose tokenizer counts are stored at ingest
     similarity_threshold: float = 0.3  # Minimum similarity score (0-1, lowered for broader matching)
-    enable_reranking: bool = False  # Enable cross-encoder re-ranking
+    enable_reranking: bool = os.getenv("ENABLE_RERANKING", "false").lower() == "true"  # Enable cross-encoder re-ranking
+    reranker_model: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # Multilingual, CPU-friendly
+    rerank_candidates: int = 30  # Chunks retrieved for the reranker to score
+    rerank_top_n: int = 4  # Chunks kept after reranking (capped by request top_k)
+    rerank_max_length: int = 512  # Max tokens per (question, chunk) pair
+    rerank_cache_size: int = 8192  # (query hash, chunk_id) → score LRU entries
+
+    # Hybrid retrieval: "vector" (Qdrant only), "lexical" (BM25 only),
+    # "hybrid" (both, merged with reciprocal rank fusion)
+    retrieval_mode: str = os.getenv("RETRIEVAL_MODE", "hybrid")
+    hybrid_candidate_multiplier: int = 4  # Each retriever returns top_k * multiplier candidates before fusion
+    rrf_k: int = 60  # Reciprocal rank fusion constant
+    bm25_k1: float = 1.5  # BM25 term frequency saturation
+    bm25_b: float = 0.75  # BM25 length normalization
+
+    # Multi-domain questions (e.g. học phí + tuyển sinh): retrieve every matched domain
+    # in one batch, fuse hits, single LLM call with combined domain instructions
+    enable_multi_domain: bool = os.getenv("ENABLE_MULTI_DOMAIN", "true").lower() == "true"
+    multi_domain_max_domains: int = 2  # Top domains queried per question
 
     # ===== Caching Settings (Redis) =====
     enable_cache: bool = os.getenv("ENABLE_CACHE", "false").lower() == "true"  # Enable Redis caching
@@ -66,6 +160,20 @@ class RAGConfig(BaseModel):
     redis_host: str = os.getenv("REDIS_HOST", "localhost")
     redis_port: int = int(os.getenv("REDIS_PORT", "6379"))
     redis_db: int = int(os.getenv("REDIS_DB", "0"))
+    embedding_lru_size: int = 4096  # In-process embedding LRU entries (0 = disable)
+    embedding_cache_ttl: int = 7 * 24 * 3600  # Redis TTL for embeddings (7 days)
+    hydration_cache_mb: float = 64  # In-process chunk/document projection cache budget in MB (0 = disable)
+
+    # Semantic answer cache: reuse answers of near-duplicate questions (same domain + model),
+    # skipped when conversation_history is present, cleared on ingest/delete
+    enable_semantic_cache: bool = os.getenv("ENABLE_SEMANTIC_CACHE", "false").lower() == "true"
+    semantic_cache_threshold: float = 0.92  # Min cosine similarity between questions
+    semantic_cache_ttl: int = 3600  # Seconds
+    semantic_cache_max_entries: int = 2048  # In-process entries (LRU beyond that)
+
+    # Corpus generation (DB counter mirrored in Redis): ingest/delete bump it and
+    # corpus-derived cache keys embed it, so stale entries are never read again
+    corpus_generation_poll_interval: float = 1.0  # Seconds between generation refreshes per worker
 
     # ===== Database Settings =====
     # Inherits from BE.core.config, but can override here
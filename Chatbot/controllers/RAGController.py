@@ -4,7 +4,12 @@ RAGController - HTTP endpoints for RAG operations
 TOÀN BỘ LOGIC RAG Ở ĐÂY - Controller là nơi xử lý chính
 Không cần RAGService trung gian, logic trực tiếp trong controller
 """
+import asyncio
+import time
+from typing import Dict, List, Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from BE.db.session import get_db
@@ -13,18 +18,31 @@ from Chatbot.entities.AnswerRequest import AnswerRequest
 from Chatbot.entities.AnswerResult import AnswerResult
 from Chatbot.entities.IngestRequest import IngestRequest
 from Chatbot.entities.IngestResult import IngestResult
-from Chatbot.entities.RetrievalHit import RetrievalHit
-from Chatbot.services.VectorizerService import VectorizerService
+from Chatbot.services.VectorizerService import create_vectorizer_service
 from Chatbot.services.RetrieverService import RetrieverService
-from Chatbot.services.GeneratorService import GeneratorService
+from Chatbot.services.ModelClientPool import get_model_client_pool
+from Chatbot.services.HistoryCompactor import get_history_compactor
+from Chatbot.services.GeneratorService import get_tail_stats
 from Chatbot.services.DomainRouterService import DomainRouterService
+from Chatbot.services.DomainServiceRegistry import get_domain_registry
+from Chatbot.services.LexicalIndexService import get_lexical_index
+from Chatbot.cache.HydrationCache import get_hydration_cache
+from Chatbot.cache.CorpusGenerationTracker import get_corpus_generation
+from Chatbot.cache.ConversationSummaryCache import get_summary_cache
+from Chatbot.cache.SemanticAnswerCache import get_semantic_cache
 from Chatbot.dao.DocumentDAO import DocumentDAO
 from Chatbot.dao.ChunkDAO import ChunkDAO
-from Chatbot.dao.VectorIndexDAO import VectorIndexDAO
+from Chatbot.dao.VectorIndexDAO import VectorIndexDAO, create_vector_index
 from Chatbot.models.Document import Document
 from Chatbot.models.Chunk import Chunk
-from Chatbot.utils.chunker import chunk_text
-from Chatbot.utils.token_counter import estimate_tokens, fit_within_budget
+from Chatbot.models.ChunkTokenCount import ChunkTokenCount
+from Chatbot.utils.chunker import iter_chunks
+from Chatbot.utils.token_counter import fit_within_budget, stored_token_counts
+from Chatbot.utils.tokenizers import get_ingest_tokenizers
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.utils.answer_stream import format_sse
+from Chatbot.utils.async_stages import run_in_stage
+from Chatbot.utils.deadline import Deadline, DeadlineExceeded
 
 # Create FastAPI router
 router = APIRouter(prefix="/api/rag", tags=["RAG"])
@@ -37,15 +55,19 @@ def get_vectorizer_service(request: Request = None):
     """
     if request and hasattr(request.app.state, 'vectorizer') and request.app.state.vectorizer:
         return request.app.state.vectorizer
+    if request and getattr(request.app.state, 'rag_loading', False):
+        # Background warm-up still running: don't load a second model copy
+        raise HTTPException(status_code=503, detail="RAG services are warming up, retry shortly")
     # Fallback: create new (shouldn't happen if startup ran correctly)
     print("⚠️  WARNING: Creating new VectorizerService (app.state not available)")
-    return VectorizerService()
+    return create_vectorizer_service()
 
 
 def get_generator_service(request: Request = None, model_name: str = None):
     """
-    Get GeneratorService from app.state
-    Falls back to creating new instance if not in app.state
+    Get GeneratorService for the requested model
+    Default model: app.state.generator; other models: warm client from the
+    ModelClientPool (created once per (backend, model), then reused)
     """
     if request and hasattr(request.app.state, 'generator') and request.app.state.generator:
         # Check if model matches
@@ -53,9 +75,7 @@ def get_generator_service(request: Request = None, model_name: str = None):
         model_to_use = model_name or config.llm_model
         if request.app.state.generator.client.model_name == model_to_use:
             return request.app.state.generator
-    # Fallback or different model requested
-    print(f"⚠️  WARNING: Creating new GeneratorService (app.state not available or model mismatch)")
-    return GeneratorService(model_name=model_name)
+    return get_model_client_pool().get_generator(model_name)
 
 
 @router.post("/answer", response_model=AnswerResult)
@@ -75,6 +95,9 @@ async def answer(answer_request: AnswerRequest, request: Request, db: Session =
     - Fallback to general service for unclassified questions
     - Legacy mode: If namespace_id is provided, use it directly (backward compatible)
 
+    Never blocks the event loop: embedding and retrieval (Qdrant + SQL hydration)
+    run on the stage thread pool, the LLM call uses the async client.
+
     Args:
         answer_request: AnswerRequest with question and parameters
         request: FastAPI Request (for accessing app.state)
@@ -83,6 +106,8 @@ async def answer(answer_request: AnswerRequest, request: Request, db: Session =
     Returns:
         AnswerResult with generated answer and citations
     """
+    # Deadline starts when the request arrives: retrieval time counts against the LLM budget
+    deadline = Deadline.from_ms(answer_request.deadline_ms, get_rag_config().llm_default_deadline)
     try:
         # Get singleton services
         vectorizer = get_vectorizer_service(request)
@@ -92,14 +117,9 @@ async def answer(answer_request: AnswerRequest, request: Request, db: Session =
         # If namespace_id is explicitly provided, skip routing (legacy mode)
         if answer_request.namespace_id and answer_request.namespace_id != "ptit_docs":
             # Legacy mode: Use traditional pipeline with specified namespace
-            retriever = RetrieverService(db)
-            query_vector = vectorizer.embed(answer_request.question)
-
-            hits = retriever.search(
-                namespace=answer_request.namespace_id,
-                query_vector=query_vector,
-                top_k=answer_request.top_k,
-                filters=None
+            (hits, timings), history = await asyncio.gather(
+                run_in_stage("retrieval", _legacy_retrieve, answer_request, db, vectorizer),
+                _compact_history(answer_request, generator, deadline)
             )
 
             if not hits:
@@ -109,52 +129,264 @@ async def answer(answer_request: AnswerRequest, request: Request, db: Session =
                     citations=[]
                 )
 
-            context_texts = [hit.chunk["text"] for hit in hits if hit.chunk]
-            contexts = fit_within_budget(context_texts, token_budget=answer_request.token_budget)
+            chunks = [hit.chunk for hit in hits if hit.chunk]
+            contexts = fit_within_budget(
+                [chunk["text"] for chunk in chunks],
+                token_budget=answer_request.token_budget,
+                tokenizer=generator.tokenizer,
+                token_counts=stored_token_counts(chunks, generator.tokenizer)
+            )
 
-            answer_text = generator.generate(
+            llm_start = time.perf_counter()
+            answer_text = await generator.agenerate(
                 question=answer_request.question,
                 contexts=contexts,
                 language="vi",
-                conversation_history=answer_request.conversation_history
+                conversation_history=history,
+                deadline=deadline
             )
+            timings["llm_ms"] = round((time.perf_counter() - llm_start) * 1000, 2)
 
             return AnswerResult(
                 answer=answer_text,
-                citations=hits
+                citations=hits,
+                timings=timings or None
             )
 
         # ===== ENHANCED MODE: Use Domain Router =====
-        router_service = DomainRouterService()
-
-        # Route to appropriate domain service
-        rag_service = router_service.route(
-            question=answer_request.question,
-            db=db,
-            vectorizer=vectorizer,
-            generator=generator
+        # History compaction (may call the LLM for the rolling summary) overlaps routing
+        (rag_service, cache_entry, cached), history = await asyncio.gather(
+            run_in_stage("embed", _route_answer, answer_request, request, db, vectorizer, generator),
+            _compact_history(answer_request, generator, deadline)
         )
+        if cached is not None:
+            value, similarity = cached
+            return AnswerResult(**value, cache_similarity=round(similarity, 4))
 
         # Execute domain-specific RAG pipeline
-        result = rag_service.answer(
+        result = await rag_service.aanswer(
             question=answer_request.question,
             top_k=answer_request.top_k,
             token_budget=answer_request.token_budget,
-            conversation_history=answer_request.conversation_history
+            conversation_history=history,
+            deadline=deadline
         )
 
+        if cache_entry is not None and result["citations"]:
+            await run_in_stage(
+                "retrieval",
+                cache_entry,
+                result["answer"],
+                [hit.model_dump() for hit in result["citations"]],
+                result.get("domain"),
+                result.get("namespace")
+            )
+
         # Return result with domain information for debugging
         return AnswerResult(
             answer=result["answer"],
             citations=result["citations"],
             domain=result.get("domain"),  # Domain name for debug
-            namespace=result.get("namespace")  # Namespace for debug
+            namespace=result.get("namespace"),  # Namespace for debug
+            timings=result.get("timings")  # Per-stage latency (embed/retrieval/rerank/llm ms) for debug and load tests
         )
 
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Answer not ready within the deadline: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing answer request: {str(e)}")
 
 
+def _legacy_retrieve(answer_request: AnswerRequest, db: Session, vectorizer):
+    """
+    Legacy namespace_id mode retrieval (blocking: runs on the stage thread pool)
+
+    Returns:
+        (hits, timings)
+    """
+    retriever = RetrieverService(db)
+    query_vector = vectorizer.embed(answer_request.question)
+
+    config = get_rag_config()
+    rerank = config.enable_reranking
+    hits = retriever.search(
+        namespace=answer_request.namespace_id,
+        query_vector=query_vector,
+        top_k=max(answer_request.top_k, config.rerank_candidates) if rerank else answer_request.top_k,
+        filters=None,
+        query_text=answer_request.question
+    )
+
+    timings = {}
+    if rerank and hits:
+        rerank_start = time.perf_counter()
+        hits = retriever.rerank(hits, answer_request.question,
+                                top_n=min(answer_request.top_k, config.rerank_top_n))
+        timings["rerank_ms"] = round((time.perf_counter() - rerank_start) * 1000, 2)
+    return hits, timings
+
+
+async def _compact_history(answer_request: AnswerRequest, generator, deadline: Deadline) -> Optional[List[Dict[str, str]]]:
+    """
+    Conversation history for the prompt: rolling summary of older turns + recent
+    turns, within the history budget (counted with the answering model's tokenizer)
+
+    Returns:
+        Compacted history, or None without history
+    """
+    if not answer_request.conversation_history:
+        return None
+    return await get_history_compactor().acompact(
+        answer_request.conversation_history,
+        generator.tokenizer,
+        chat_id=answer_request.chat_id,
+        language="vi",
+        token_budget=answer_request.history_token_budget,
+        deadline=deadline
+    )
+
+
+def _route_answer(answer_request: AnswerRequest, request: Request, db: Session, vectorizer, generator):
+    """
+    Domain routing + semantic answer cache lookup (shared by /answer and /answer/stream)
+
+    Returns:
+        (rag_service, cache_entry, cached) - cache_entry(answer, citations, domain, namespace)
+        stores a fresh answer (None when the cache is off), cached = (value, similarity) on a hit
+    """
+    # Registry built once at startup: only the request's DB session is bound here
+    config = get_rag_config()
+    registry = get_domain_registry(vectorizer, getattr(request.app.state, "generator", None) or generator)
+    rag_service = registry.route_answering_service(
+        question=answer_request.question,
+        db=db,
+        generator=generator,
+        multi_domain=config.enable_multi_domain,
+        max_domains=config.multi_domain_max_domains
+    )
+
+    # Semantic answer cache: near-duplicate question, same domain + model (no history only:
+    # the cached answer cannot depend on earlier turns, and _compact_history returns at once)
+    if not config.enable_semantic_cache or answer_request.conversation_history:
+        return rag_service, None, None
+
+    semantic_cache = get_semantic_cache()
+    # Embed the preprocessed question: answer() reuses it from the embedding LRU
+    cache_vector = vectorizer.embed(rag_service.preprocess_question(answer_request.question))
+    model_name = generator.client.model_name if generator.client else "mock"
+    cache_scope = (rag_service.get_domain_name(), model_name, answer_request.top_k)
+
+    def cache_entry(answer_text, citations, domain, namespace):
+        semantic_cache.put(answer_request.question, cache_vector, cache_scope, {
+            "answer": answer_text,
+            "citations": citations,
+            "domain": domain,
+            "namespace": namespace,
+        })
+
+    cached = semantic_cache.lookup(answer_request.question, cache_vector, cache_scope)
+    return rag_service, cache_entry, cached
+
+
+@router.post("/answer/stream")
+async def answer_stream(answer_request: AnswerRequest, request: Request, db: Session = Depends(get_db)):
+    """
+    Streaming answer endpoint - Server-Sent Events (text/event-stream)
+
+    Same domain pipeline as /answer, but the answer is sent while the LLM generates:
+    - event "citations": {"citations": [...]} as soon as retrieval is done
+    - event "delta": {"text": "..."} postprocessed answer text, in order
+    - event "done": {"answer", "prefix", "domain", "namespace", "timings"};
+      answer is the full postprocessed text (authoritative: a domain prefix such
+      as "⚠️ QUAN TRỌNG: " can only be known at the end), timings has ttft_ms
+    - event "error": {"detail": "..."} if generation fails mid-stream
+
+    Legacy namespace_id mode is only available on /answer.
+
+    Args:
+        answer_request: AnswerRequest with question and parameters
+        request: FastAPI Request (for accessing app.state)
+        db: Database session
+
+    Returns:
+        StreamingResponse of SSE events
+    """
+    start = time.perf_counter()
+    deadline = Deadline.from_ms(answer_request.deadline_ms, get_rag_config().llm_default_deadline)
+    if answer_request.namespace_id and answer_request.namespace_id != "ptit_docs":
+        raise HTTPException(status_code=400, detail="Legacy namespace_id mode is not supported for streaming, use /answer")
+
+    metrics = get_metrics()
+    ttft_hist = metrics.histogram("rag_time_to_first_token_seconds", "Request start to first streamed answer text")
+    duration_hist = metrics.histogram("rag_stream_duration_seconds", "Request start to end of the answer stream")
+
+    try:
+        vectorizer = get_vectorizer_service(request)
+        generator = get_generator_service(request, answer_request.model)
+        (rag_service, cache_entry, cached), history = await asyncio.gather(
+            run_in_stage("embed", _route_answer, answer_request, request, db, vectorizer, generator),
+            _compact_history(answer_request, generator, deadline)
+        )
+
+        if cached is not None:
+            value, similarity = cached
+            events = _aiter_events([
+                ("citations", {"citations": value["citations"]}),
+                ("delta", {"text": value["answer"]}),
+                ("done", {**value, "prefix": "", "timings": None, "cache_similarity": round(similarity, 4)}),
+            ])
+        else:
+            events = rag_service.aanswer_stream(
+                question=answer_request.question,
+                top_k=answer_request.top_k,
+                token_budget=answer_request.token_budget,
+                conversation_history=history,
+                deadline=deadline
+            )
+        # Run retrieval (the only step using the DB session) before the response starts
+        first_event = await events.__anext__()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing answer request: {str(e)}")
+
+    async def event_stream():
+        citations = first_event[1]["citations"]
+        yield format_sse(*first_event)
+        ttft = None
+        try:
+            async for event, data in events:
+                if event == "delta" and ttft is None:
+                    ttft = time.perf_counter() - start
+                    ttft_hist.observe(ttft)
+                if event == "done":
+                    data["timings"] = {
+                        **(data.get("timings") or {}),
+                        "ttft_ms": round((ttft or 0.0) * 1000, 2),
+                        "total_ms": round((time.perf_counter() - start) * 1000, 2),
+                    }
+                    if cache_entry is not None and cached is None and citations:
+                        await run_in_stage(
+                            "retrieval", cache_entry, data["answer"], citations, data.get("domain"), data.get("namespace")
+                        )
+                yield format_sse(event, data)
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Error generating answer: {str(e)}"})
+        finally:
+            duration_hist.observe(time.perf_counter() - start)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _aiter_events(events):
+    for event in events:
+        yield event
+
+
 @router.post("/ingest", response_model=IngestResult)
 async def ingest(ingest_request: IngestRequest, request: Request, db: Session = Depends(get_db)):
     """
@@ -190,48 +422,96 @@ async def ingest(ingest_request: IngestRequest, request: Request, db: Session =
         )
         doc_id = doc_dao.upsert(document)
 
-        # Step 2-3: Split content into chunks (Sequence diagram line 15-16)
+        # Step 2-3: Split content into chunks lazily (Sequence diagram line 15-16)
         config = get_rag_config()
-        chunk_texts = chunk_text(
+        chunk_iter = iter_chunks(
             ingest_request.content,
             chunk_size=config.chunk_size,
             chunk_overlap=config.chunk_overlap
         )
 
-        # Step 4-6: Create and insert chunks (Sequence diagram line 18-22)
+        # Step 4-10: Insert / embed / upsert window by window so big documents
+        # run in bounded memory (one window of chunks + one vector matrix)
         chunk_dao = ChunkDAO(db)
-        chunks = []
-        for idx, text in enumerate(chunk_texts):
-            chunk = Chunk(
-                document_id=doc_id,
-                idx=idx,
-                text=text,
-                tokens=estimate_tokens(text)
-            )
-            chunk_id = chunk_dao.insert(chunk)
-            chunk.id = chunk_id  # Update with generated ID
-            chunks.append(chunk)
-
-        # Step 7-8: Embed chunks in batch (Sequence diagram line 24-25)
-        chunk_texts_list = [chunk.text for chunk in chunks]
         vectorizer = get_vectorizer_service(request)  # Sử dụng singleton
-        vectors = vectorizer.embed_batch(chunk_texts_list)
-
-        # Step 9-10: Upsert vectors to index (Sequence diagram line 27-28)
-        vidx = VectorIndexDAO(db)
-        pairs = [(chunk.id, vector) for chunk, vector in zip(chunks, vectors)]
-        vidx.upsert(ingest_request.namespace_id, pairs)
+        vidx = create_vector_index(db)
+        chunk_count = 0
+
+        window: list = []
+        for text in chunk_iter:
+            window.append(text)
+            if len(window) >= config.embed_stream_window:
+                chunk_count += _ingest_window(window, chunk_count, document, ingest_request.namespace_id,
+                                              chunk_dao, vectorizer, vidx)
+                window = []
+        if window:
+            chunk_count += _ingest_window(window, chunk_count, document, ingest_request.namespace_id,
+                                          chunk_dao, vectorizer, vidx)
+
+        # Corpus changed: bump the generation so every worker drops derived cache entries
+        # (and refreshes its BM25 index; this one already holds the new chunks)
+        generations = get_corpus_generation().bump(db, [ingest_request.namespace_id])
+        get_lexical_index().note_bump(generations)
 
         # Step 11: Return result (Sequence diagram line 30)
         return IngestResult(
             doc_id=doc_id,
-            chunk_count=len(chunks)
+            chunk_count=chunk_count
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing ingest request: {str(e)}")
 
 
+def _ingest_window(texts, start_idx, document, namespace, chunk_dao, vectorizer, vidx) -> int:
+    """
+    Insert one window of chunks, embed them (length-bucketed), upsert vectors
+
+    Args:
+        texts: Chunk texts of this window
+        start_idx: idx of the first chunk in the document
+        document: Parent Document (already persisted)
+        namespace: Vector namespace
+        chunk_dao: ChunkDAO bound to the request session
+        vectorizer: VectorizerService singleton
+        vidx: Vector index DAO (create_vector_index)
+
+    Returns:
+        Number of chunks ingested
+    """
+    # Token counts per tokenizer, one batch per tokenizer; chunks.tokens = default LLM's count
+    tokenizers = get_ingest_tokenizers()
+    counts = {tokenizer.name: tokenizer.count_batch(texts) for tokenizer in tokenizers}
+    default_counts = counts[tokenizers[0].name]
+
+    # Insert chunks in one commit (Sequence diagram line 18-22)
+    chunks = [
+        Chunk(
+            document_id=document.id, idx=start_idx + i, text=text, tokens=default_counts[i],
+            token_counts=[ChunkTokenCount(tokenizer=name, tokens=values[i]) for name, values in counts.items()]
+        )
+        for i, text in enumerate(texts)
+    ]
+    chunk_ids = chunk_dao.insert_batch(chunks)
+
+    # Embed chunks in batch (Sequence diagram line 24-25) → contiguous float32 matrix
+    vectors = vectorizer.embed_batch(texts)
+
+    # Upsert vectors to index (Sequence diagram line 27-28)
+    # Filter fields (category, year, ...) always; payload mode "full" also denormalizes
+    # chunk + document fields so queries skip SQL
+    if get_rag_config().vector_payload_mode == "full":
+        payloads = [VectorIndexDAO.chunk_payload(chunk, document) for chunk in chunks]
+    else:
+        payloads = [VectorIndexDAO.filter_payload(chunk, document) for chunk in chunks]
+    vidx.upsert(namespace, list(zip(chunk_ids, vectors)), payloads)
+
+    # Keep the BM25 index in step with the chunks table
+    if get_rag_config().retrieval_mode != "vector":
+        get_lexical_index().add_many(zip(chunk_ids, texts), namespace)
+    return len(chunks)
+
+
 @router.get("/documents")
 async def list_documents(limit: int = 10, offset: int = 0, db: Session = Depends(get_db)):
     """
@@ -288,7 +568,7 @@ async def get_document(doc_id: str, db: Session = Depends(get_db)):
 @router.delete("/documents/{doc_id}")
 async def delete_document(doc_id: str, db: Session = Depends(get_db)):
     """
-    Delete document and its chunks/embeddings (cascade)
+    Delete document and its chunks/embeddings (cascade), plus its Qdrant points
 
     Args:
         doc_id: Document UUID
@@ -299,11 +579,19 @@ async def delete_document(doc_id: str, db: Session = Depends(get_db)):
     """
     try:
         doc_dao = DocumentDAO(db)
+        document = doc_dao.find_by_id(doc_id)
+        namespace = document.source_uri if document else None
+        chunk_ids = [chunk.id for chunk in ChunkDAO(db).find_by_document(doc_id)]
         deleted = doc_dao.delete(doc_id)
 
         if not deleted:
             raise HTTPException(status_code=404, detail="Document not found")
 
+        create_vector_index(db).delete_by_chunk_ids(chunk_ids)
+        lexical_index = get_lexical_index()
+        lexical_index.remove(chunk_ids)
+        lexical_index.note_bump(get_corpus_generation().bump(db, [namespace]))
+
         return {"message": "Document deleted successfully", "doc_id": doc_id}
     except HTTPException:
         raise
@@ -335,6 +623,23 @@ async def analyze_domain(answer_request: AnswerRequest):
         raise HTTPException(status_code=500, detail=f"Error analyzing domain: {str(e)}")
 
 
+@router.get("/metrics")
+async def metrics(format: str = "json"):
+    """
+    Export in-process metrics (batch sizes, queue waits, latencies)
+
+    Args:
+        format: "json" (default) or "prometheus" (text exposition format)
+
+    Returns:
+        Metrics snapshot
+    """
+    registry = get_metrics()
+    if format == "prometheus":
+        return PlainTextResponse(registry.render_prometheus())
+    return {"metrics": registry.snapshot()}
+
+
 @router.get("/health")
 async def health_check(request: Request):
     """
@@ -350,23 +655,24 @@ async def health_check(request: Request):
         vectorizer = get_vectorizer_service(request)
         generator = get_generator_service(request)
 
-        # Check Qdrant backend (VectorIndexDAO now uses Qdrant)
+        # Check vector backend (Qdrant, local index, or Qdrant + local failover)
         vector_backend_info = {
-            "backend": "qdrant",
+            "backend": config.vector_store_type,
             "status": "unknown"
         }
 
         try:
-            from Chatbot.dao.VectorIndexDAO import VectorIndexDAO
-            vidx = VectorIndexDAO()
+            vidx = create_vector_index()
             if vidx.health_check():
                 stats = vidx.get_stats()
                 vector_backend_info.update({
                     "status": stats.get("status", "unknown"),
-                    "host": f"{vidx.host}:{vidx.port}",
+                    "host": f"{vidx.host}:{vidx.port}" if vidx.port else vidx.host,
                     "collection": vidx.collection_name,
                     "points_count": stats.get("points_count", 0)
                 })
+                if "failover" in stats:
+                    vector_backend_info["failover"] = stats["failover"]
             else:
                 vector_backend_info["status"] = "disconnected"
         except Exception as e:
@@ -380,8 +686,8 @@ async def health_check(request: Request):
         }
         if config.enable_cache:
             try:
-                from Chatbot.infrastructure.cache import RedisCache
-                cache = RedisCache()
+                from Chatbot.cache.RedisCache import RedisCache
+                cache = RedisCache(db=config.redis_db)
                 if cache.is_available():
                     stats = cache.get_stats()
                     cache_info.update(stats)
@@ -398,14 +704,30 @@ async def health_check(request: Request):
                 "model": vectorizer.embed_model,
                 "dimension": vectorizer.get_dimension(),
                 "loaded": vectorizer.model is not None,
-                "cache_enabled": vectorizer.enable_cache
+                "cache_enabled": vectorizer.enable_cache,
+                "embedding_cache": vectorizer.get_cache_stats()
             },
             "generator": {
                 "model": generator.client.model_name if generator.client else "mock",
                 "backend": generator.client.backend if generator.client else "mock",
-                "loaded": generator.client is not None
+                "loaded": generator.client is not None,
+                "client_pool": get_model_client_pool().get_stats(),
+                "history_summaries": get_summary_cache().get_stats(),
+                "tail_control": {
+                    "fallback_model": config.llm_fallback_model,
+                    "hedging": config.enable_llm_hedging,
+                    **get_tail_stats()
+                }
             },
             "vector_store": vector_backend_info,
+            "retrieval": {
+                "mode": config.retrieval_mode,
+                "reranking": config.enable_reranking,
+                "lexical_index": get_lexical_index().get_stats(),
+                "hydration_cache": get_hydration_cache().get_stats(),
+                "semantic_cache": get_semantic_cache().get_stats() if config.enable_semantic_cache else {"enabled": False},
+                "corpus_generation": get_corpus_generation().get_stats()
+            },
             "cache": cache_info
         }
     except Exception as e:
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Backfill chunk token counts
+
+Chunks ingest trước khi có chunk_token_counts (chunks.tokens là ước lượng
+words × 1.3), hoặc khi thêm model mới vào TOKEN_COUNT_MODELS, chưa có count
+cho tokenizer tương ứng → context packing phải tokenize lại mỗi request.
+Script đọc bảng `chunks` theo batch, đếm bằng tokenizer thật và lưu lại.
+Server không cần dừng; worker đang chạy thấy count mới khi hydration cache
+của chunk đó hết hạn (payload mode "full": sau khi chạy Chatbot.reembed).
+
+Usage:
+  python -m Chatbot.count_tokens                     # tokenizers của LLM_MODEL + TOKEN_COUNT_MODELS
+  python -m Chatbot.count_tokens --model gpt-4o      # thêm tokenizer của model khác
+  python -m Chatbot.count_tokens --force             # đếm lại cả chunk đã có count
+"""
+import sys
+import time
+import argparse
+import logging
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from BE.db.session import SessionLocal
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.dao.ChunkDAO import ChunkDAO
+from Chatbot.dao.ChunkTokenCountDAO import ChunkTokenCountDAO
+from Chatbot.utils.tokenizers import get_ingest_tokenizers, get_tokenizer_for_model
+
+logger = logging.getLogger(__name__)
+
+
+def backfill(tokenizers, batch_size: int, force: bool) -> int:
+    """
+    Count and store tokens of every chunk for each tokenizer
+
+    Args:
+        tokenizers: Tokenizers to count with (the first one also sets chunks.tokens)
+        batch_size: Chunks per batch
+        force: Recount chunks that already have a count
+
+    Returns:
+        Number of counts written
+    """
+    db = SessionLocal()
+    chunk_dao = ChunkDAO(db)
+    count_dao = ChunkTokenCountDAO(db)
+    default_name = get_tokenizer_for_model(get_rag_config().llm_model).name
+    written = 0
+    seen = 0
+    start = time.perf_counter()
+    try:
+        for batch in chunk_dao.iter_batches(batch_size):
+            texts = {chunk_id: text for chunk_id, text, _ in batch}
+            for tokenizer in tokenizers:
+                existing = {} if force else count_dao.get_counts(list(texts), tokenizer.name)
+                todo = [chunk_id for chunk_id in texts if chunk_id not in existing]
+                if not todo:
+                    continue
+                counts = dict(zip(todo, tokenizer.count_batch([texts[chunk_id] for chunk_id in todo])))
+                written += count_dao.upsert_batch(tokenizer.name, counts)
+                if tokenizer.name == default_name:
+                    chunk_dao.update_tokens(counts)
+
+            seen += len(batch)
+            rate = seen / (time.perf_counter() - start)
+            print(f"   {seen} chunks scanned, {written} counts written ({rate:.1f} chunks/s)")
+    finally:
+        db.close()
+    return written
+
+
+def main():
+    config = get_rag_config()
+
+    parser = argparse.ArgumentParser(description="Store per-tokenizer token counts for all chunks")
+    parser.add_argument("--batch-size", type=int, default=config.embed_stream_window)
+    parser.add_argument("--model", action="append", default=[], help="Also count with this model's tokenizer")
+    parser.add_argument("--force", action="store_true", help="Recount chunks that already have a count")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    tokenizers = {tokenizer.name: tokenizer for tokenizer in get_ingest_tokenizers()}
+    for model in args.model:
+        tokenizer = get_tokenizer_for_model(model)
+        tokenizers.setdefault(tokenizer.name, tokenizer)
+
+    print(f"Tokenizers: {', '.join(tokenizers)}")
+    written = backfill(list(tokenizers.values()), args.batch_size, args.force)
+    print(f"✅ {written} token counts written")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 """
 ChunkDAO - Data Access Object for Chunk entity
 """
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
+from Chatbot.cache.HydrationCache import get_hydration_cache
 from Chatbot.models.Chunk import Chunk
+from Chatbot.models.Document import Document
 
 
 class ChunkDAO:
@@ -46,6 +48,29 @@ class ChunkDAO:
         chunk_map = {chunk.id: chunk for chunk in chunks}
         return [chunk_map[cid] for cid in chunk_ids if cid in chunk_map]
 
+    def find_projections_by_ids(self, chunk_ids: List[str]) -> List[Dict]:
+        """
+        Find chunks as dict projections (Chunk.to_dict), served from the
+        hydration cache when possible - only misses hit SQL
+
+        Args:
+            chunk_ids: List of chunk UUIDs
+
+        Returns:
+            List of chunk dicts in the order of input IDs (missing IDs skipped)
+        """
+        if not chunk_ids:
+            return []
+
+        cache = get_hydration_cache()
+        found, missing = cache.get_many("chunk", chunk_ids)
+        if missing:
+            loaded = {chunk.id: chunk.to_dict() for chunk in self.find_by_ids(missing)}
+            cache.put_many("chunk", loaded)
+            found.update(loaded)
+
+        return [found[cid] for cid in chunk_ids if cid in found]
+
     def insert(self, chunk: Chunk) -> str:
         """
         Insert a new chunk
@@ -59,6 +84,7 @@ class ChunkDAO:
         self.db.add(chunk)
         self.db.commit()
         self.db.refresh(chunk)
+        get_hydration_cache().invalidate("chunk", [chunk.id])
         return chunk.id
 
     def insert_batch(self, chunks: List[Chunk]) -> List[str]:
@@ -75,7 +101,22 @@ class ChunkDAO:
         self.db.commit()
         for chunk in chunks:
             self.db.refresh(chunk)
-        return [chunk.id for chunk in chunks]
+        chunk_ids = [chunk.id for chunk in chunks]
+        get_hydration_cache().invalidate("chunk", chunk_ids)
+        return chunk_ids
+
+    def update_tokens(self, counts: Dict[str, int]) -> None:
+        """
+        Set chunks.tokens (default tokenizer count) for many chunks in one commit
+
+        Args:
+            counts: Dict chunk_id → tokens
+        """
+        if not counts:
+            return
+        self.db.bulk_update_mappings(Chunk, [{"id": chunk_id, "tokens": tokens} for chunk_id, tokens in counts.items()])
+        self.db.commit()
+        get_hydration_cache().invalidate("chunk", list(counts))
 
     def find_by_document(self, document_id: str) -> List[Chunk]:
         """
@@ -108,6 +149,7 @@ class ChunkDAO:
         if chunk:
             self.db.delete(chunk)
             self.db.commit()
+            get_hydration_cache().invalidate("chunk", [chunk_id])
             return True
         return False
 
@@ -122,3 +164,34 @@ class ChunkDAO:
             Number of chunks
         """
         return self.db.query(Chunk).filter(Chunk.document_id == document_id).count()
+
+    def iter_batches(
+        self,
+        batch_size: int = 256,
+        namespace: Optional[str] = None
+    ) -> Iterator[List[Tuple[str, str, Optional[str]]]]:
+        """
+        Stream all chunks in id order, one batch at a time (keyset pagination)
+        Memory stays bounded by batch_size regardless of table size
+
+        Args:
+            batch_size: Rows per batch
+            namespace: Only chunks of documents in this namespace (None = all)
+
+        Yields:
+            Lists of (chunk_id, text, document source_uri) tuples
+        """
+        last_id = ""
+        while True:
+            query = (
+                self.db.query(Chunk.id, Chunk.text, Document.source_uri)
+                .join(Document, Document.id == Chunk.document_id)
+                .filter(Chunk.id > last_id)
+            )
+            if namespace is not None:
+                query = query.filter(Document.source_uri == namespace)
+            rows = query.order_by(Chunk.id).limit(batch_size).all()
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+            last_id = rows[-1][0]
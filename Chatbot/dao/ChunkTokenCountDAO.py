@@ -0,0 +1,69 @@
+"""
+ChunkTokenCountDAO - Data Access Object for ChunkTokenCount entity
+"""
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from Chatbot.cache.HydrationCache import get_hydration_cache
+from Chatbot.models.ChunkTokenCount import ChunkTokenCount
+
+
+class ChunkTokenCountDAO:
+    """
+    DAO for per-tokenizer chunk token counts
+    Rows are normally created with their chunk at ingest (Chunk.token_counts);
+    this DAO serves lookups and backfills for tokenizers added later.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_counts(self, chunk_ids: List[str], tokenizer: str) -> Dict[str, int]:
+        """
+        Stored token counts of chunks for one tokenizer
+
+        Args:
+            chunk_ids: List of chunk UUIDs
+            tokenizer: Tokenizer name
+
+        Returns:
+            Dict chunk_id → tokens (chunks without a count are absent)
+        """
+        if not chunk_ids:
+            return {}
+
+        rows = (
+            self.db.query(ChunkTokenCount.chunk_id, ChunkTokenCount.tokens)
+            .filter(ChunkTokenCount.tokenizer == tokenizer, ChunkTokenCount.chunk_id.in_(chunk_ids))
+            .all()
+        )
+        return {chunk_id: int(tokens) for chunk_id, tokens in rows}
+
+    def upsert_batch(self, tokenizer: str, counts: Dict[str, int]) -> int:
+        """
+        Insert or replace token counts of chunks for one tokenizer (one commit)
+
+        Args:
+            tokenizer: Tokenizer name
+            counts: Dict chunk_id → tokens
+
+        Returns:
+            Number of rows written
+        """
+        if not counts:
+            return 0
+
+        chunk_ids = list(counts)
+        (
+            self.db.query(ChunkTokenCount)
+            .filter(ChunkTokenCount.tokenizer == tokenizer, ChunkTokenCount.chunk_id.in_(chunk_ids))
+            .delete(synchronize_session=False)
+        )
+        self.db.add_all(
+            ChunkTokenCount(chunk_id=chunk_id, tokenizer=tokenizer, tokens=tokens)
+            for chunk_id, tokens in counts.items()
+        )
+        self.db.commit()
+        get_hydration_cache().invalidate("chunk", chunk_ids)
+        return len(chunk_ids)
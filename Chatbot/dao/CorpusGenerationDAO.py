@@ -0,0 +1,72 @@
+"""
+CorpusGenerationDAO - Data Access Object for CorpusGeneration entity
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from Chatbot.models.CorpusGeneration import CorpusGeneration
+
+GLOBAL_NAMESPACE = "*"
+
+
+class CorpusGenerationDAO:
+    """
+    DAO for the corpus generation counters
+    Bumps are atomic UPDATE ... SET generation = generation + 1 statements,
+    so concurrent ingests in different processes never lose an increment.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_all(self) -> Dict[str, int]:
+        """
+        Current generation of every namespace (and the global row "*")
+
+        Returns:
+            Dict namespace → generation
+        """
+        rows = self.db.query(CorpusGeneration.namespace, CorpusGeneration.generation).all()
+        return {namespace: int(generation) for namespace, generation in rows}
+
+    def bump(self, namespaces: Iterable[str]) -> Dict[str, int]:
+        """
+        Increment the generation of namespaces and of the global row
+
+        Args:
+            namespaces: Namespaces whose content changed
+
+        Returns:
+            Dict namespace → new generation (includes "*")
+        """
+        targets = sorted({ns for ns in namespaces if ns} | {GLOBAL_NAMESPACE})
+        for namespace in targets:
+            self._increment(namespace)
+        self.db.commit()
+
+        rows = (
+            self.db.query(CorpusGeneration.namespace, CorpusGeneration.generation)
+            .filter(CorpusGeneration.namespace.in_(targets))
+            .all()
+        )
+        return {namespace: int(generation) for namespace, generation in rows}
+
+    def _increment(self, namespace: str):
+        """Atomic increment; first bump of a namespace inserts its row"""
+        statement = (
+            update(CorpusGeneration)
+            .where(CorpusGeneration.namespace == namespace)
+            .values(generation=CorpusGeneration.generation + 1)
+        )
+        if self.db.execute(statement).rowcount:
+            return
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(CorpusGeneration(namespace=namespace, generation=1))
+        except IntegrityError:
+            # Another process inserted the row first
+            self.db.execute(statement)
@@ -1,8 +1,10 @@
 """
 DocumentDAO - Data Access Object for Document entity
 """
-from typing import Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
+from Chatbot.cache.HydrationCache import get_hydration_cache
+from Chatbot.models.Chunk import Chunk
 from Chatbot.models.Document import Document
 
 
@@ -27,6 +29,48 @@ class DocumentDAO:
         """
         return self.db.query(Document).filter(Document.id == doc_id).first()
 
+    def find_by_ids(self, doc_ids: List[str]) -> Dict[str, Document]:
+        """
+        Find multiple documents by IDs in one query
+
+        Args:
+            doc_ids: List of document UUIDs
+
+        Returns:
+            Dict document ID → Document (missing IDs are absent)
+        """
+        if not doc_ids:
+            return {}
+        docs = self.db.query(Document).filter(Document.id.in_(list(doc_ids))).all()
+        return {doc.id: doc for doc in docs}
+
+    def find_projections_by_ids(self, doc_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Find documents as dict projections for citations, served from the
+        hydration cache when possible - only misses hit SQL
+        The full document text is left out (citations never need it).
+
+        Args:
+            doc_ids: List of document UUIDs
+
+        Returns:
+            Dict document ID → document dict (missing IDs are absent)
+        """
+        if not doc_ids:
+            return {}
+
+        cache = get_hydration_cache()
+        found, missing = cache.get_many("doc", doc_ids)
+        if missing:
+            loaded = {}
+            for doc_id, doc in self.find_by_ids(missing).items():
+                projection = doc.to_dict()
+                projection.pop("text", None)
+                loaded[doc_id] = projection
+            cache.put_many("doc", loaded)
+            found.update(loaded)
+        return found
+
     def upsert(self, document: Document) -> str:
         """
         Insert or update document
@@ -46,6 +90,7 @@ class DocumentDAO:
             existing.text = document.text
             self.db.commit()
             self.db.refresh(existing)
+            get_hydration_cache().invalidate("doc", [existing.id])
             return existing.id
         else:
             # Insert new document
@@ -84,8 +129,12 @@ class DocumentDAO:
         """
         doc = self.find_by_id(doc_id)
         if doc:
+            chunk_ids = [row[0] for row in self.db.query(Chunk.id).filter(Chunk.document_id == doc_id)]
             self.db.delete(doc)
             self.db.commit()
+            cache = get_hydration_cache()
+            cache.invalidate("doc", [doc_id])
+            cache.invalidate("chunk", chunk_ids)
             return True
         return False
 
@@ -0,0 +1,622 @@
+"""
+LocalVectorIndexDAO - In-process vector index backend (no Qdrant server)
+Same query/upsert/delete_by_* interface as VectorIndexDAO.
+
+Lưu trữ dạng log append-only trong vector_store_path/<collection>/:
+- vectors.f32: ma trận float32 liên tục (mỗi row = 1 vector đã L2-normalize)
+- rows.jsonl:  log put/del (chunk_id, namespace, payload) → replay để rebuild
+
+Search là exact top-k bằng NumPy (BLAS matmul theo block), file lớn được
+memory-map thay vì load vào RAM. HNSW (hnswlib) là tùy chọn.
+Mọi process cùng đọc một thư mục: mỗi lần query, process đọc tiếp phần log
+mới do process khác ghi (ghi được serialize bằng file lock).
+
+Dùng làm backend chính (vector_store_type = "local") hoặc failover khi Qdrant
+không kết nối được (vector_failover = true).
+"""
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from Chatbot.utils.fingerprint import get_active_fingerprint
+from Chatbot.utils.search_filters import normalize_filters, payload_matches
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are serialized within one process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_BLOCK_ROWS = 65536  # Rows scored per matmul (bounds temporary memory on memmaps)
+
+
+class LocalVectorStore:
+    """
+    Append-only float32 vector store with exact (and optional HNSW) cosine search
+
+    Rows are never rewritten in place: re-upserting a chunk appends a new row
+    and tombstones the old one. compact() rewrites the files with live rows only.
+    """
+
+    def __init__(self, path: str, fingerprint: Dict, mmap_threshold_bytes: int, use_hnsw: bool = False):
+        """
+        Open (or create) a store directory and replay its log
+
+        Args:
+            path: Store directory
+            fingerprint: Embedding fingerprint (dimension is taken from it)
+            mmap_threshold_bytes: Memory-map vectors.f32 instead of loading it once it is this big
+            use_hnsw: Build an HNSW graph (requires hnswlib)
+        """
+        from Chatbot.config.rag_config import get_rag_config
+        config = get_rag_config()
+
+        self.path = path
+        self.fingerprint = fingerprint
+        self.dimension = int(fingerprint["dimension"])
+        self.mmap_threshold_bytes = mmap_threshold_bytes
+        self.use_hnsw = use_hnsw
+        self.hnsw_m = config.hnsw_m
+        self.hnsw_ef_search = config.hnsw_ef_search
+        self.hnsw_min_points = config.hnsw_min_points
+
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.log_path = os.path.join(path, "rows.jsonl")
+        self._lock_path = os.path.join(path, ".lock")
+        self._lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        self._check_meta()
+        self._reset_state()
+        self.refresh()
+
+    def _check_meta(self):
+        """Write meta.json on creation, refuse a store built for another dimension"""
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("dimension") != self.dimension:
+                raise ValueError(
+                    f"Local vector store {self.path} has dimension {meta.get('dimension')}, "
+                    f"model produces {self.dimension}"
+                )
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dimension": self.dimension, "fingerprint": self.fingerprint}, f)
+
+    def _reset_state(self):
+        self._buffer = np.zeros((0, self.dimension), dtype=np.float32)  # RAM matrix (with spare capacity) or memmap
+        self._mmap = False
+        self._n_rows = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._ns_ids = np.zeros(0, dtype=np.int32)
+        self._row_chunk: List[Optional[str]] = []
+        self._payloads: List[Optional[Dict]] = []
+        self._row_of: Dict[str, int] = {}
+        self._namespaces: List[str] = []
+        self._ns_lookup: Dict[str, int] = {}
+        self._log_offset = 0
+        self._log_inode = None
+        self._hnsw = None
+        self._hnsw_rows = 0
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialize writers across threads and (where supported) processes"""
+        with self._lock:
+            with open(self._lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ===== Log replay =====
+
+    def refresh(self):
+        """Apply log records written since the last refresh (by any process)"""
+        with self._lock:
+            try:
+                stat = os.stat(self.log_path)
+            except FileNotFoundError:
+                if self._log_offset:
+                    self._reset_state()
+                return
+
+            if self._log_inode is not None and (stat.st_ino != self._log_inode or stat.st_size < self._log_offset):
+                # Files were replaced (compact / rebuild): reload from scratch
+                self._reset_state()
+            self._log_inode = stat.st_ino
+            if stat.st_size == self._log_offset:
+                return
+
+            with open(self.log_path, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # ignore a partially written last line
+            if end == 0:
+                return
+            records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+            self._log_offset += end
+
+            max_row = max((r["row"] for r in records if r["op"] == "put"), default=-1)
+            if max_row >= self._n_rows:
+                self._load_vectors(max_row + 1)
+
+            for record in records:
+                self._apply(record)
+            self._sync_hnsw()
+
+    def _load_vectors(self, n_rows: int):
+        """Make rows [0, n_rows) of vectors.f32 available for search"""
+        row_bytes = self.dimension * 4
+        if self._mmap or n_rows * row_bytes >= self.mmap_threshold_bytes:
+            self._buffer = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n_rows, self.dimension))
+            self._mmap = True
+        else:
+            new_rows = np.fromfile(
+                self.vectors_path,
+                dtype=np.float32,
+                count=(n_rows - self._n_rows) * self.dimension,
+                offset=self._n_rows * row_bytes
+            ).reshape(-1, self.dimension)
+            if n_rows > len(self._buffer):
+                grown = np.zeros((max(n_rows, 2 * len(self._buffer), 1024), self.dimension), dtype=np.float32)
+                grown[:self._n_rows] = self._buffer[:self._n_rows]
+                self._buffer = grown
+            self._buffer[self._n_rows:n_rows] = new_rows
+
+        if n_rows > len(self._alive):
+            capacity = max(n_rows, 2 * len(self._alive), 1024)
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+            self._ns_ids = np.concatenate([self._ns_ids, np.zeros(capacity - len(self._ns_ids), dtype=np.int32)])
+        self._row_chunk.extend([None] * (n_rows - len(self._row_chunk)))
+        self._payloads.extend([None] * (n_rows - len(self._payloads)))
+        self._n_rows = n_rows
+
+    def _apply(self, record: Dict):
+        op = record["op"]
+        if op == "put":
+            row, chunk_id, namespace = record["row"], record["chunk_id"], record["namespace"]
+            old = self._row_of.get(chunk_id)
+            if old is not None:
+                self._alive[old] = False
+            ns_id = self._ns_lookup.get(namespace)
+            if ns_id is None:
+                ns_id = self._ns_lookup[namespace] = len(self._namespaces)
+                self._namespaces.append(namespace)
+            self._row_of[chunk_id] = row
+            self._row_chunk[row] = chunk_id
+            self._payloads[row] = record.get("payload")
+            self._ns_ids[row] = ns_id
+            self._alive[row] = True
+        elif op == "del":
+            row = self._row_of.pop(record["chunk_id"], None)
+            if row is not None:
+                self._alive[row] = False
+        elif op == "del_ns":
+            ns_id = self._ns_lookup.get(record["namespace"])
+            if ns_id is not None:
+                for row in np.flatnonzero(self._alive[:self._n_rows] & (self._ns_ids[:self._n_rows] == ns_id)):
+                    self._row_of.pop(self._row_chunk[row], None)
+                    self._alive[row] = False
+
+    # ===== HNSW (optional) =====
+
+    def _sync_hnsw(self):
+        """Add rows appended since the last sync to the HNSW graph"""
+        if not self.use_hnsw or self._n_rows < self.hnsw_min_points:
+            return
+        if self._hnsw is None:
+            try:
+                import hnswlib
+            except ImportError:
+                logger.warning("hnswlib not installed, local vector search stays exact. Install with: pip install hnswlib")
+                self.use_hnsw = False
+                return
+            self._hnsw = hnswlib.Index(space="ip", dim=self.dimension)
+            self._hnsw.init_index(max_elements=2 * self._n_rows, ef_construction=200, M=self.hnsw_m)
+            self._hnsw.set_ef(self.hnsw_ef_search)
+            self._hnsw_rows = 0
+
+        if self._n_rows > self._hnsw_rows:
+            if self._n_rows > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(2 * self._n_rows)
+            self._hnsw.add_items(
+                np.asarray(self._buffer[self._hnsw_rows:self._n_rows]),
+                np.arange(self._hnsw_rows, self._n_rows)
+            )
+            self._hnsw_rows = self._n_rows
+
+    # ===== Write path =====
+
+    def put(self, namespace: str, chunk_ids: List[str], vectors: np.ndarray, payloads: Optional[List[Dict]] = None):
+        """
+        Append vectors (L2-normalized here so dot product = cosine)
+
+        Args:
+            namespace: Namespace of these chunks
+            chunk_ids: Chunk IDs
+            vectors: float32 matrix (len(chunk_ids), dimension)
+            payloads: Optional payload per chunk
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(chunk_ids), self.dimension)
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        row_bytes = self.dimension * 4
+
+        with self._write_lock():
+            size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+            if size % row_bytes:
+                # Torn write from a crashed writer: drop the partial row
+                with open(self.vectors_path, "r+b") as f:
+                    f.truncate(size - size % row_bytes)
+                size -= size % row_bytes
+            first_row = size // row_bytes
+
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            lines = [
+                json.dumps({
+                    "op": "put",
+                    "row": first_row + i,
+                    "chunk_id": chunk_id,
+                    "namespace": namespace,
+                    "payload": payloads[i] if payloads is not None else None
+                }, ensure_ascii=False)
+                for i, chunk_id in enumerate(chunk_ids)
+            ]
+            self._append_log(lines)
+        self.refresh()
+
+    def delete(self, chunk_ids: List[str]):
+        """Tombstone chunks"""
+        with self._write_lock():
+            self._append_log([json.dumps({"op": "del", "chunk_id": chunk_id}) for chunk_id in chunk_ids])
+        self.refresh()
+
+    def delete_namespace(self, namespace: str):
+        """Tombstone every chunk of a namespace"""
+        with self._write_lock():
+            self._append_log([json.dumps({"op": "del_ns", "namespace": namespace}, ensure_ascii=False)])
+        self.refresh()
+
+    def _append_log(self, lines: List[str]):
+        if lines:
+            with open(self.log_path, "ab") as f:
+                f.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+    def compact(self) -> int:
+        """
+        Rewrite the store with live rows only (other processes reload on their next query)
+
+        Returns:
+            Number of rows kept
+        """
+        self.refresh()
+        with self._write_lock():
+            rows = np.flatnonzero(self._alive[:self._n_rows])
+            tmp_vectors, tmp_log = self.vectors_path + ".tmp", self.log_path + ".tmp"
+            with open(tmp_vectors, "wb") as vf, open(tmp_log, "wb") as lf:
+                for new_row, row in enumerate(rows):
+                    vf.write(np.asarray(self._buffer[row], dtype=np.float32).tobytes())
+                    lf.write((json.dumps({
+                        "op": "put",
+                        "row": new_row,
+                        "chunk_id": self._row_chunk[row],
+                        "namespace": self._namespaces[self._ns_ids[row]],
+                        "payload": self._payloads[row]
+                    }, ensure_ascii=False) + "\n").encode("utf-8"))
+            self._buffer = np.zeros((0, self.dimension), dtype=np.float32)  # release the memmap before replacing
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_log, self.log_path)
+            self._reset_state()
+        self.refresh()
+        return len(rows)
+
+    # ===== Read path =====
+
+    def search(
+        self,
+        namespace: Optional[str],
+        query_vector: np.ndarray,
+        top_k: int,
+        conditions: Optional[Dict[str, List]] = None
+    ) -> List[Tuple[str, float, Optional[Dict]]]:
+        """
+        Cosine top-k
+
+        Args:
+            namespace: Restrict to one namespace (None = all)
+            query_vector: Query embedding
+            top_k: Number of results
+            conditions: Payload conditions (normalize_filters output), checked per row
+
+        Returns:
+            List of (chunk_id, score, payload), best first
+        """
+        self.refresh()
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        with self._lock:
+            ns_id = None
+            if namespace:
+                ns_id = self._ns_lookup.get(namespace)
+                if ns_id is None:
+                    return []
+            n = self._n_rows
+            matrix, alive, ns_ids = self._buffer, self._alive[:n], self._ns_ids[:n]
+            if conditions:
+                # No payload index here: one pass over the payloads, folded into the alive mask
+                alive = alive & np.fromiter(
+                    (payload_matches(payload, conditions) for payload in self._payloads[:n]),
+                    dtype=bool, count=n
+                )
+            if self._hnsw is not None and self._hnsw_rows:
+                rows, scores = self._search_hnsw(query, top_k, alive, ns_ids, ns_id)
+                if len(rows) >= min(top_k, int(alive.sum())):
+                    return self._format(rows, scores)
+
+        rows, scores = self._search_exact(matrix, n, alive, ns_ids, ns_id, query, top_k)
+        return self._format(rows, scores)
+
+    @staticmethod
+    def _search_exact(matrix, n, alive, ns_ids, ns_id, query, top_k):
+        """Blocked matmul + argpartition over all live rows"""
+        candidate_rows, candidate_scores = [], []
+        for start in range(0, n, _BLOCK_ROWS):
+            end = min(start + _BLOCK_ROWS, n)
+            scores = np.asarray(matrix[start:end]) @ query
+            mask = alive[start:end]
+            if ns_id is not None:
+                mask = mask & (ns_ids[start:end] == ns_id)
+            scores = np.where(mask, scores, -np.inf)
+            k = min(top_k, end - start)
+            idx = np.argpartition(-scores, k - 1)[:k]
+            idx = idx[np.isfinite(scores[idx])]
+            candidate_rows.append(idx + start)
+            candidate_scores.append(scores[idx])
+
+        if not candidate_rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return rows[order], scores[order]
+
+    def _search_hnsw(self, query, top_k, alive, ns_ids, ns_id):
+        """Approximate search; over-fetches to survive tombstone/namespace filtering"""
+        fetch = min(self._hnsw_rows, top_k * 4)
+        labels, distances = self._hnsw.knn_query(query, k=fetch)
+        rows, scores = [], []
+        for row, distance in zip(labels[0], distances[0]):
+            if alive[row] and (ns_id is None or ns_ids[row] == ns_id):
+                rows.append(int(row))
+                scores.append(1.0 - float(distance))  # ip space: distance = 1 - dot
+                if len(rows) == top_k:
+                    break
+        return rows, scores
+
+    def _format(self, rows, scores) -> List[Tuple[str, float, Optional[Dict]]]:
+        results = []
+        for row, score in zip(rows, scores):
+            chunk_id = self._row_chunk[row]
+            if chunk_id is not None:
+                results.append((chunk_id, float(score), self._payloads[row]))
+        return results
+
+    def get_payloads(self, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """chunk_id → payload for live chunks"""
+        self.refresh()
+        with self._lock:
+            result = {}
+            for chunk_id in chunk_ids:
+                row = self._row_of.get(chunk_id)
+                if row is not None:
+                    result[chunk_id] = self._payloads[row] or {}
+            return result
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "points_count": len(self._row_of),
+                "rows": self._n_rows,
+                "tombstones": self._n_rows - len(self._row_of),
+                "storage": "mmap" if self._mmap else "memory",
+                "hnsw": self._hnsw is not None,
+            }
+
+
+# One store per directory per process
+_stores: Dict[str, LocalVectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_local_vector_store(path: str, fingerprint: Dict) -> LocalVectorStore:
+    """
+    Get the process-wide store for a directory
+
+    Args:
+        path: Store directory
+        fingerprint: Embedding fingerprint
+
+    Returns:
+        LocalVectorStore instance
+    """
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            from Chatbot.config.rag_config import get_rag_config
+            config = get_rag_config()
+            store = LocalVectorStore(
+                path,
+                fingerprint,
+                mmap_threshold_bytes=int(config.local_vector_mmap_threshold_mb * 1024 * 1024),
+                use_hnsw=config.local_vector_hnsw
+            )
+            _stores[path] = store
+        return store
+
+
+class LocalVectorIndexDAO:
+    """
+    DAO for the local vector store, interface-compatible with VectorIndexDAO
+    Payloads follow the same layout (chunk_id, namespace, denormalized fields)
+    """
+
+    def __init__(
+        self,
+        db=None,
+        collection_name: str = None,
+        fingerprint: Optional[Dict] = None,
+        path: str = None
+    ):
+        """
+        Initialize LocalVectorIndexDAO
+
+        Args:
+            db: SQLAlchemy session (ignored, kept for interface compatibility)
+            collection_name: Collection alias (default: config.qdrant_collection_name)
+            fingerprint: Embedding fingerprint (default: live model's fingerprint)
+            path: Root directory (default: config.vector_store_path)
+        """
+        from Chatbot.config.rag_config import get_rag_config
+        config = get_rag_config()
+
+        self.alias_name = collection_name or config.qdrant_collection_name
+        self.fingerprint = fingerprint or get_active_fingerprint()
+        self.collection_name = f"{self.alias_name}__{self.fingerprint['id']}"
+        self.host = os.path.join(path or config.vector_store_path, self.collection_name)
+        self.port = None
+
+        try:
+            self._store = get_local_vector_store(self.host, self.fingerprint)
+        except Exception as e:
+            logger.error(f"Failed to open local vector store at {self.host} - {e}")
+            self._store = None
+
+    def query(
+        self,
+        namespace: Optional[str],
+        query_vector: np.ndarray,
+        top_k: int = 5,
+        filters: Optional[Dict] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Query local index for similar chunks
+
+        Args:
+            namespace: Namespace identifier (None = search all namespaces)
+            query_vector: Query embedding vector
+            top_k: Number of results to return
+            filters: Optional domain filters (see utils/search_filters.py)
+
+        Returns:
+            List of (chunk_id, similarity_score) tuples, sorted by score descending
+        """
+        return [(chunk_id, score) for chunk_id, score, _ in self.query_with_payload(namespace, query_vector, top_k, filters)]
+
+    def query_with_payload(
+        self,
+        namespace: Optional[str],
+        query_vector: np.ndarray,
+        top_k: int = 5,
+        filters: Optional[Dict] = None
+    ) -> List[Tuple[str, float, Dict]]:
+        """Query and return (chunk_id, score, payload) tuples"""
+        if self._store is None:
+            return []
+        results = self._store.search(namespace, query_vector, top_k, normalize_filters(filters))
+        return [
+            (chunk_id, score, {"chunk_id": chunk_id, **(payload or {})})
+            for chunk_id, score, payload in results
+        ]
+
+    def query_batch(self, queries) -> List[List[Tuple[str, float]]]:
+        """Several searches (VectorQuery list), results aligned with queries"""
+        return [
+            [(chunk_id, score) for chunk_id, score, _ in results]
+            for results in self.query_batch_with_payload(queries)
+        ]
+
+    def query_batch_with_payload(self, queries) -> List[List[Tuple[str, float, Dict]]]:
+        """In-process index: no round trip to save, queries run one after another"""
+        return [self.query_with_payload(q.namespace, q.query_vector, q.top_k, q.filters) for q in queries]
+
+    def fetch_payloads(self, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """chunk_id → payload without a vector search"""
+        if self._store is None or not chunk_ids:
+            return {}
+        return {
+            chunk_id: {"chunk_id": chunk_id, **payload}
+            for chunk_id, payload in self._store.get_payloads(chunk_ids).items()
+        }
+
+    def upsert(
+        self,
+        namespace: str,
+        pairs: List[Tuple[str, np.ndarray]],
+        payloads: Optional[List[Dict]] = None
+    ) -> None:
+        """
+        Insert or update embeddings
+
+        Args:
+            namespace: Namespace identifier
+            pairs: List of (chunk_id, vector) tuples
+            payloads: Optional extra payload per pair, aligned with pairs
+        """
+        if self._store is None or not pairs:
+            return
+        try:
+            self._store.put(
+                namespace,
+                [chunk_id for chunk_id, _ in pairs],
+                np.asarray([vector for _, vector in pairs], dtype=np.float32),
+                payloads
+            )
+            logger.info(f"Upserted {len(pairs)} vectors to local index namespace '{namespace}'")
+        except Exception as e:
+            logger.error(f"Local vector upsert failed: {e}")
+
+    def delete_by_chunk_id(self, chunk_id: str) -> bool:
+        """Delete embedding by chunk ID"""
+        return self.delete_by_chunk_ids([chunk_id])
+
+    def delete_by_chunk_ids(self, chunk_ids: List[str]) -> bool:
+        """Delete embeddings of many chunks"""
+        if self._store is None or not chunk_ids:
+            return False
+        self._store.delete(list(chunk_ids))
+        return True
+
+    def delete_by_namespace(self, namespace: str):
+        """Delete all embeddings in a namespace"""
+        if self._store is not None:
+            self._store.delete_namespace(namespace)
+
+    def get_stats(self) -> Dict:
+        """Local store statistics (same keys as VectorIndexDAO.get_stats where applicable)"""
+        if self._store is None:
+            return {"status": "disconnected", "backend": "local"}
+        return {
+            "status": "connected",
+            "backend": "local",
+            "collection": self.collection_name,
+            "alias": self.alias_name,
+            "fingerprint": self.fingerprint,
+            "path": self.host,
+            **self._store.get_stats()
+        }
+
+    def health_check(self) -> bool:
+        return self._store is not None
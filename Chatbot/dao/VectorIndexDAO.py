@@ -4,13 +4,73 @@ Powered by Qdrant Vector Database for fast similarity search
 
 Replaced old database-backed storage with Qdrant for better performance
 """
-from typing import List, Tuple, Optional, Dict
+from typing import Any, List, NamedTuple, Tuple, Optional, Dict
 import numpy as np
 import uuid
 import logging
+import threading
+
+from Chatbot.utils.fingerprint import get_active_fingerprint, make_fingerprint
+from Chatbot.utils.search_filters import FILTER_FIELDS, document_filter_fields, to_qdrant_filter
 
 logger = logging.getLogger(__name__)
 
+# Collections whose payload indexes were already ensured by this process
+_indexed_collections = set()
+
+# Pooled Qdrant clients per (host, port) and resolved collection per
+# (host, port, alias, fingerprint id): after the first connect, building a
+# VectorIndexDAO costs no round trip
+_clients: Dict[Tuple[str, int], Any] = {}
+_resolved_collections: Dict[Tuple[str, int, str, str], str] = {}
+_pool_lock = threading.Lock()
+
+QDRANT_IN_MEMORY = ":memory:"
+
+
+def get_qdrant_client(host: str, port: int, timeout: int = 30):
+    """
+    Shared QdrantClient for a server (thread-safe, keeps its HTTP connections open)
+
+    Args:
+        host: Qdrant host (":memory:" = in-process Qdrant, no server - load tests)
+        port: Qdrant port
+        timeout: Request timeout in seconds
+
+    Returns:
+        QdrantClient
+    """
+    client = _clients.get((host, port))
+    if client is None:
+        with _pool_lock:
+            client = _clients.get((host, port))
+            if client is None:
+                from qdrant_client import QdrantClient
+                if host == QDRANT_IN_MEMORY:
+                    # Per-process and empty at start: seed through /api/rag/ingest
+                    client = QdrantClient(location=QDRANT_IN_MEMORY)
+                else:
+                    client = QdrantClient(host=host, port=port, timeout=timeout)
+                _clients[(host, port)] = client
+    return client
+
+
+def reset_qdrant_pool():
+    """Forget pooled clients and resolved collections (after alias swaps or a Qdrant restart)"""
+    with _pool_lock:
+        _clients.clear()
+        _resolved_collections.clear()
+        _indexed_collections.clear()
+
+
+class VectorQuery(NamedTuple):
+    """One search of a batch (query_batch / RetrieverService.search_batch)"""
+    namespace: Optional[str]
+    query_vector: Any  # np.ndarray or list of floats
+    top_k: int = 5
+    filters: Optional[Dict] = None
+    query_text: Optional[str] = None  # Used by RetrieverService for BM25, ignored by the DAOs
+
 
 class VectorIndexDAO:
     """
@@ -20,7 +80,14 @@ class VectorIndexDAO:
     Provides same interface as before, but with Qdrant backend for better performance
     """
 
-    def __init__(self, db=None, host: str = None, port: int = None, collection_name: str = None):
+    def __init__(
+        self,
+        db=None,
+        host: str = None,
+        port: int = None,
+        collection_name: str = None,
+        fingerprint: Optional[Dict] = None
+    ):
         """
         Initialize VectorIndexDAO with Qdrant backend
 
@@ -28,7 +95,8 @@ class VectorIndexDAO:
             db: SQLAlchemy session (ignored, kept for backward compatibility)
             host: Qdrant server host (default: from config)
             port: Qdrant server port (default: from config)
-            collection_name: Collection name (default: from config)
+            collection_name: Collection name or alias (default: from config)
+            fingerprint: Embedding fingerprint (default: live model's fingerprint)
         """
         # Load from config if not provided
         from Chatbot.config.rag_config import get_rag_config
@@ -36,37 +104,62 @@ class VectorIndexDAO:
 
         self.host = host or config.qdrant_host
         self.port = port or config.qdrant_port
-        self.collection_name = collection_name or config.qdrant_collection_name
+        self.alias_name = collection_name or config.qdrant_collection_name
+        self.collection_name = self.alias_name  # Physical collection, resolved in _connect
+        self.fingerprint = fingerprint or get_active_fingerprint()
         self._client = None
         self._connect()
 
-    def _connect(self):
-        """Connect to Qdrant server"""
-        try:
-            from qdrant_client import QdrantClient
-            from qdrant_client.models import Distance, VectorParams
-
-            self._client = QdrantClient(
-                host=self.host,
-                port=self.port,
-                timeout=30
-            )
+    @staticmethod
+    def physical_name(alias_name: str, fingerprint: Dict) -> str:
+        """Physical collection name for a (alias, model fingerprint) pair"""
+        return f"{alias_name}__{fingerprint['id']}"
 
-            # Create collection if not exists
-            collections = self._client.get_collections().collections
-            collection_names = [c.name for c in collections]
+    def _connect(self):
+        """
+        Connect to Qdrant server and resolve the collection for this model
+
+        Resolution order:
+        1. <alias>__<fingerprint id> exists → use it (collection built for this model)
+        2. <alias> exists → use it only if it was built by this model (fingerprint
+           id from the physical name suffix or the collection metadata); a legacy
+           collection without a fingerprint is used if its dimension matches
+        3. Nothing yet → create <alias>__<fingerprint id> sized from the live model,
+           and point <alias> at it
+
+        The client is pooled and the resolution cached per process, so only the
+        first DAO for a collection talks to Qdrant here.
+        """
+        resolution_key = (self.host, self.port, self.alias_name, self.fingerprint["id"])
+        resolved = _resolved_collections.get(resolution_key)
+        if resolved is not None:
+            self._client = _clients.get((self.host, self.port))
+            if self._client is not None:
+                self.collection_name = resolved
+                return
 
-            if self.collection_name not in collection_names:
-                self._client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=384,  # Default dimension for all-MiniLM-L6-v2
-                        distance=Distance.COSINE
-                    )
-                )
-                logger.info(f"Created Qdrant collection: {self.collection_name}")
+        try:
+            self._client = get_qdrant_client(self.host, self.port)
+
+            collection_names = {c.name for c in self._client.get_collections().collections}
+            own_collection = self.physical_name(self.alias_name, self.fingerprint)
+
+            if own_collection in collection_names:
+                self.collection_name = own_collection
+                logger.info(f"Using Qdrant collection: {self.collection_name}")
+                self.ensure_payload_indexes(self._client, self.collection_name)
+            elif self.alias_name in collection_names or self._alias_exists(self.alias_name):
+                self.collection_name = self.alias_name
+                self._verify_model()
+                if self._client is not None:
+                    self.ensure_payload_indexes(self._client, self.collection_name)
             else:
-                logger.info(f"Using existing Qdrant collection: {self.collection_name}")
+                self.create_collection(self._client, own_collection, self.fingerprint)
+                self.set_alias(self._client, self.alias_name, own_collection)
+                self.collection_name = own_collection
+
+            if self._client is not None:
+                _resolved_collections[resolution_key] = self.collection_name
 
         except ImportError:
             logger.error("qdrant-client not installed. Install with: pip install qdrant-client")
@@ -75,6 +168,164 @@ class VectorIndexDAO:
             logger.error(f"Failed to connect to Qdrant at {self.host}:{self.port} - {e}")
             self._client = None
 
+    def _alias_exists(self, alias_name: str) -> bool:
+        """Check whether an alias with this name exists"""
+        try:
+            aliases = self._client.get_aliases().aliases
+            return any(a.alias_name == alias_name for a in aliases)
+        except Exception:
+            return False
+
+    def _alias_target(self, alias_name: str) -> Optional[str]:
+        """Physical collection an alias points at (None = not an alias)"""
+        try:
+            for alias in self._client.get_aliases().aliases:
+                if alias.alias_name == alias_name:
+                    return alias.collection_name
+        except Exception:
+            pass
+        return None
+
+    def _stored_fingerprint_id(self, info) -> Optional[str]:
+        """
+        Fingerprint id of the model that built the collection behind the alias:
+        the __<fingerprint id> suffix of its physical name, else the fingerprint
+        stored as collection metadata (None = legacy collection)
+        """
+        physical = self._alias_target(self.alias_name) or self.alias_name
+        prefix = f"{self.alias_name}__"
+        if physical.startswith(prefix):
+            return physical[len(prefix):]
+        metadata = getattr(info.config, "metadata", None) or {}
+        return (metadata.get("embedding_fingerprint") or {}).get("id")
+
+    def _verify_model(self):
+        """
+        Refuse a collection built by another embedding model: same dimension is
+        not enough, searching another model's vectors returns wrong neighbours
+        and ingest would mix both models in one collection
+        """
+        info = self._client.get_collection(self.collection_name)
+        stored_id = self._stored_fingerprint_id(info)
+        if stored_id is None:
+            self._verify_dimension(info)
+            return
+
+        # Same model and dimension: the id may differ only by the normalize flag
+        # (known once the model is loaded)
+        model, dimension = self.fingerprint["model"], self.fingerprint["dimension"]
+        own_ids = {make_fingerprint(model, dimension, normalize)["id"] for normalize in (None, True, False)}
+        if stored_id not in own_ids | {self.fingerprint["id"]}:
+            logger.error(
+                f"Qdrant collection '{self.collection_name}' was built by another embedding model "
+                f"(fingerprint {stored_id}), live model {model} has fingerprint {self.fingerprint['id']}. "
+                f"Run: python -m Chatbot.reembed"
+            )
+            self._client = None
+            return
+        logger.info(f"Using existing Qdrant collection: {self.collection_name}")
+
+    def _verify_dimension(self, info):
+        """
+        Legacy collection (no fingerprint): refuse it when its vector size differs
+        from the live model (searching it would return garbage or fail on every request)
+        """
+        vectors = info.config.params.vectors
+        size = getattr(vectors, "size", None)
+        if size is not None and size != self.fingerprint["dimension"]:
+            logger.error(
+                f"Qdrant collection '{self.collection_name}' has dimension {size}, "
+                f"but model {self.fingerprint['model']} produces {self.fingerprint['dimension']}. "
+                f"Run: python -m Chatbot.reembed"
+            )
+            self._client = None
+            return
+        logger.info(f"Using existing Qdrant collection: {self.collection_name}")
+
+    @staticmethod
+    def create_collection(client, name: str, fingerprint: Dict):
+        """
+        Create a collection sized for the fingerprint's model
+        The fingerprint is stored as collection metadata where the server supports it
+
+        Args:
+            client: QdrantClient
+            name: Physical collection name
+            fingerprint: Embedding fingerprint
+        """
+        from qdrant_client.models import Distance, VectorParams
+
+        vectors_config = VectorParams(size=fingerprint["dimension"], distance=Distance.COSINE)
+        try:
+            client.create_collection(
+                collection_name=name,
+                vectors_config=vectors_config,
+                metadata={"embedding_fingerprint": fingerprint}
+            )
+        except (TypeError, AssertionError):
+            # Older qdrant-client without collection metadata: fingerprint lives in point payloads
+            client.create_collection(collection_name=name, vectors_config=vectors_config)
+        logger.info(f"Created Qdrant collection: {name} (dim={fingerprint['dimension']}, model={fingerprint['model']})")
+        VectorIndexDAO.ensure_payload_indexes(client, name)
+
+    @staticmethod
+    def ensure_payload_indexes(client, name: str):
+        """
+        Create payload indexes for the filterable fields (namespace, category,
+        academic_year, document_id, year) so filtered searches don't scan
+        every point. Missing indexes only are created, once per process.
+
+        Args:
+            client: QdrantClient
+            name: Collection name (or alias)
+        """
+        if name in _indexed_collections:
+            return
+
+        from qdrant_client.models import PayloadSchemaType
+
+        schema_types = {"keyword": PayloadSchemaType.KEYWORD, "integer": PayloadSchemaType.INTEGER}
+        try:
+            existing = set((client.get_collection(name).payload_schema or {}).keys())
+            for field, schema in FILTER_FIELDS.items():
+                if field not in existing:
+                    client.create_payload_index(
+                        collection_name=name,
+                        field_name=field,
+                        field_schema=schema_types[schema],
+                        wait=True
+                    )
+                    logger.info(f"Created payload index {name}.{field} ({schema})")
+            _indexed_collections.add(name)
+        except Exception as e:
+            logger.warning(f"Could not create payload indexes on {name}: {e}")
+
+    @staticmethod
+    def set_alias(client, alias_name: str, collection_name: str):
+        """
+        Atomically point alias at collection (delete + create in one request)
+
+        Args:
+            client: QdrantClient
+            alias_name: Alias used by the application (config.qdrant_collection_name)
+            collection_name: Physical collection to serve
+        """
+        from qdrant_client.models import (
+            CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation
+        )
+
+        operations = []
+        try:
+            if any(a.alias_name == alias_name for a in client.get_aliases().aliases):
+                operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias_name)))
+        except Exception:
+            pass
+        operations.append(CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=collection_name, alias_name=alias_name)
+        ))
+        client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(f"Alias '{alias_name}' → '{collection_name}'")
+
     def query(
         self,
         namespace: Optional[str],
@@ -89,29 +340,53 @@ class VectorIndexDAO:
             namespace: Namespace/collection identifier (None = search all namespaces)
             query_vector: Query embedding vector
             top_k: Number of results to return
-            filters: Optional filters (not implemented yet)
+            filters: Optional domain filters, e.g. {"category": "tuition"} (see utils/search_filters.py)
 
         Returns:
             List of (chunk_id, similarity_score) tuples, sorted by score descending
         """
+        return [
+            (chunk_id, score)
+            for chunk_id, score, _ in self._search(namespace, query_vector, top_k, ["chunk_id"], filters=filters)
+        ]
+
+    def query_with_payload(
+        self,
+        namespace: Optional[str],
+        query_vector: np.ndarray,
+        top_k: int = 5,
+        filters: Optional[Dict] = None
+    ) -> List[Tuple[str, float, Dict]]:
+        """
+        Query vector index and return the full point payloads
+        (denormalized payload mode: chunk text + document fields, no SQL needed)
+
+        Args:
+            namespace: Namespace/collection identifier (None = search all namespaces)
+            query_vector: Query embedding vector
+            top_k: Number of results to return
+            filters: Optional domain filters (see utils/search_filters.py)
+
+        Returns:
+            List of (chunk_id, similarity_score, payload) tuples, sorted by score descending
+        """
+        return self._search(namespace, query_vector, top_k, True, filters=filters)
+
+    def _search(self, namespace: Optional[str], query_vector: np.ndarray, top_k: int, with_payload,
+                raise_errors: bool = False, filters: Optional[Dict] = None):
+        """
+        Run one Qdrant search → [(chunk_id, score, payload)]
+        raise_errors=True lets FailoverVectorIndexDAO tell "no results" from "Qdrant down"
+        """
         if self._client is None:
+            if raise_errors:
+                raise ConnectionError(f"Qdrant not available at {self.host}:{self.port}")
             logger.warning("Qdrant client not available, returning empty results")
             return []
 
         try:
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
-
-            # Build filter for namespace
-            query_filter = None
-            if namespace:
-                query_filter = Filter(
-                    must=[
-                        FieldCondition(
-                            key="namespace",
-                            match=MatchValue(value=namespace)
-                        )
-                    ]
-                )
+            # Namespace + domain filters → payload conditions (served by payload indexes)
+            query_filter = to_qdrant_filter(namespace, filters)
 
             # Search in Qdrant
             search_results = self._client.search(
@@ -119,30 +394,175 @@ class VectorIndexDAO:
                 query_vector=query_vector.tolist() if isinstance(query_vector, np.ndarray) else query_vector,
                 limit=top_k,
                 query_filter=query_filter,
-                with_payload=True,
+                with_payload=with_payload,
                 with_vectors=False
             )
 
-            # Format results as (chunk_id, score)
+            # Format results as (chunk_id, score, payload)
             results = []
             for result in search_results:
                 chunk_id = result.payload.get("chunk_id")
                 if chunk_id:
-                    results.append((chunk_id, float(result.score)))
+                    results.append((chunk_id, float(result.score), result.payload))
 
             return results
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Qdrant query failed: {e}")
             return []
 
-    def upsert(self, namespace: str, pairs: List[Tuple[str, np.ndarray]]) -> None:
+    def query_batch(self, queries: List[VectorQuery]) -> List[List[Tuple[str, float]]]:
+        """
+        Run several searches (each with its own namespace, filters, top_k)
+        in one Qdrant request
+
+        Args:
+            queries: VectorQuery list
+
+        Returns:
+            One list of (chunk_id, similarity_score) per query, aligned with queries
+        """
+        return [
+            [(chunk_id, score) for chunk_id, score, _ in results]
+            for results in self._search_batch(queries, ["chunk_id"])
+        ]
+
+    def query_batch_with_payload(self, queries: List[VectorQuery]) -> List[List[Tuple[str, float, Dict]]]:
+        """
+        Batched search returning full point payloads (see query_with_payload)
+
+        Args:
+            queries: VectorQuery list
+
+        Returns:
+            One list of (chunk_id, similarity_score, payload) per query, aligned with queries
+        """
+        return self._search_batch(queries, True)
+
+    def _search_batch(self, queries: List[VectorQuery], with_payload, raise_errors: bool = False):
+        """
+        Run N searches in one search_batch request → [[(chunk_id, score, payload)], ...]
+        """
+        if not queries:
+            return []
+        if self._client is None:
+            if raise_errors:
+                raise ConnectionError(f"Qdrant not available at {self.host}:{self.port}")
+            logger.warning("Qdrant client not available, returning empty results")
+            return [[] for _ in queries]
+
+        try:
+            from qdrant_client.models import SearchRequest
+
+            requests = [
+                SearchRequest(
+                    vector=q.query_vector.tolist() if isinstance(q.query_vector, np.ndarray) else list(q.query_vector),
+                    filter=to_qdrant_filter(q.namespace, q.filters),
+                    limit=q.top_k,
+                    with_payload=with_payload,
+                    with_vector=False
+                )
+                for q in queries
+            ]
+            batch_results = self._client.search_batch(collection_name=self.collection_name, requests=requests)
+
+            return [
+                [
+                    (result.payload["chunk_id"], float(result.score), result.payload)
+                    for result in search_results
+                    if result.payload and result.payload.get("chunk_id")
+                ]
+                for search_results in batch_results
+            ]
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Qdrant batch query failed: {e}")
+            return [[] for _ in queries]
+
+    def fetch_payloads(self, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch point payloads by chunk ID in one request (no vector search)
+
+        Args:
+            chunk_ids: Chunk UUIDs
+
+        Returns:
+            Dict chunk_id → payload (chunks without a deterministic point ID are missing)
+        """
+        if self._client is None or not chunk_ids:
+            return {}
+
+        try:
+            points = self._client.retrieve(
+                collection_name=self.collection_name,
+                ids=[self.point_id(chunk_id) for chunk_id in chunk_ids],
+                with_payload=True,
+                with_vectors=False
+            )
+            return {p.payload["chunk_id"]: p.payload for p in points if p.payload and p.payload.get("chunk_id")}
+        except Exception as e:
+            logger.error(f"Qdrant retrieve failed: {e}")
+            return {}
+
+    @staticmethod
+    def point_id(chunk_id: str) -> str:
+        """Deterministic point ID for a chunk (re-upserting a chunk overwrites its point)"""
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, chunk_id))
+
+    @staticmethod
+    def chunk_payload(chunk, document) -> Dict:
+        """
+        Denormalized payload fields for one chunk (vector_payload_mode = "full")
+
+        Args:
+            chunk: Chunk model (id, idx, text, tokens, token_counts, document_id)
+            document: Parent Document model (or None)
+
+        Returns:
+            Payload dict merged into the point payload
+        """
+        return {
+            "text": chunk.text,
+            "idx": chunk.idx,
+            "tokens": chunk.tokens,
+            "token_counts": {tc.tokenizer: tc.tokens for tc in chunk.token_counts},
+            "title": document.title if document else None,
+            "source_uri": document.source_uri if document else None,
+            **VectorIndexDAO.filter_payload(chunk, document),
+        }
+
+    @staticmethod
+    def filter_payload(chunk, document) -> Dict:
+        """
+        Filterable payload fields for one chunk, written in every payload mode
+        (document_id, category, year, academic_year)
+
+        Args:
+            chunk: Chunk model
+            document: Parent Document model (or None)
+
+        Returns:
+            Payload dict merged into the point payload
+        """
+        return {"document_id": chunk.document_id, **document_filter_fields(document)}
+
+    def upsert(
+        self,
+        namespace: str,
+        pairs: List[Tuple[str, np.ndarray]],
+        payloads: Optional[List[Dict]] = None
+    ) -> None:
         """
         Insert or update embeddings in Qdrant
 
         Args:
             namespace: Namespace/collection identifier
             pairs: List of (chunk_id, vector) tuples
+            payloads: Optional extra payload per pair (see chunk_payload), aligned with pairs
         """
         if self._client is None:
             logger.warning("Qdrant client not available, skipping upsert")
@@ -153,20 +573,24 @@ class VectorIndexDAO:
 
             # Prepare points for batch upsert
             points = []
-            for chunk_id, vector in pairs:
-                point_id = str(uuid.uuid4())  # Generate unique point ID
-
+            for i, (chunk_id, vector) in enumerate(pairs):
                 # Convert numpy array to list
                 if isinstance(vector, np.ndarray):
                     vector = vector.tolist()
 
+                payload = {
+                    "chunk_id": chunk_id,
+                    "namespace": namespace,
+                    "embedding_fp": self.fingerprint["id"],
+                    "embedding_model": self.fingerprint["model"]
+                }
+                if payloads is not None:
+                    payload.update(payloads[i])
+
                 point = PointStruct(
-                    id=point_id,
+                    id=self.point_id(chunk_id),
                     vector=vector,
-                    payload={
-                        "chunk_id": chunk_id,
-                        "namespace": namespace
-                    }
+                    payload=payload
                 )
                 points.append(point)
 
@@ -218,6 +642,41 @@ class VectorIndexDAO:
             logger.error(f"Qdrant delete failed: {e}")
             return False
 
+    def delete_by_chunk_ids(self, chunk_ids: List[str]) -> bool:
+        """
+        Delete embeddings of many chunks in one request (e.g. when a document is deleted)
+
+        Args:
+            chunk_ids: Chunk UUIDs
+
+        Returns:
+            True if deleted, False otherwise
+        """
+        if self._client is None or not chunk_ids:
+            return False
+
+        try:
+            from qdrant_client.models import Filter, FieldCondition, MatchAny
+
+            self._client.delete(
+                collection_name=self.collection_name,
+                points_selector=Filter(
+                    must=[
+                        FieldCondition(
+                            key="chunk_id",
+                            match=MatchAny(any=list(chunk_ids))
+                        )
+                    ]
+                ),
+                wait=True
+            )
+            logger.info(f"Deleted {len(chunk_ids)} chunks from Qdrant")
+            return True
+
+        except Exception as e:
+            logger.error(f"Qdrant delete failed: {e}")
+            return False
+
     def delete_by_namespace(self, namespace: str):
         """
         Delete all embeddings in a namespace
@@ -266,6 +725,8 @@ class VectorIndexDAO:
                 "points_count": collection_info.points_count,
                 "vectors_count": collection_info.vectors_count,
                 "collection": self.collection_name,
+                "alias": self.alias_name,
+                "fingerprint": self.fingerprint,
                 "host": f"{self.host}:{self.port}"
             }
         except Exception as e:
@@ -287,3 +748,134 @@ class VectorIndexDAO:
             return True
         except:
             return False
+
+
+class FailoverVectorIndexDAO:
+    """
+    Qdrant primary with the local vector store as automatic failover
+
+    - Writes go to both (write-through keeps the local copy warm)
+    - Reads use Qdrant; when it is unreachable or a search fails,
+      the same query is answered from the local store
+    """
+
+    def __init__(self, primary: VectorIndexDAO, fallback):
+        """
+        Args:
+            primary: VectorIndexDAO (Qdrant)
+            fallback: LocalVectorIndexDAO
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self.alias_name = primary.alias_name
+        self.fingerprint = primary.fingerprint
+
+    @property
+    def collection_name(self) -> str:
+        return self.primary.collection_name if self.primary._client is not None else self.fallback.collection_name
+
+    @property
+    def host(self):
+        return self.primary.host if self.primary._client is not None else self.fallback.host
+
+    @property
+    def port(self):
+        return self.primary.port if self.primary._client is not None else self.fallback.port
+
+    def _failover(self, e: Exception):
+        from Chatbot.utils.metrics import get_metrics
+        get_metrics().counter("rag_vector_failover_total", "Vector queries answered by the local failover index").inc()
+        logger.warning(f"Qdrant unavailable ({e}), answering from local vector index")
+
+    def query(self, namespace, query_vector, top_k: int = 5, filters: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        try:
+            return [
+                (chunk_id, score)
+                for chunk_id, score, _ in self.primary._search(
+                    namespace, query_vector, top_k, ["chunk_id"], raise_errors=True, filters=filters
+                )
+            ]
+        except Exception as e:
+            self._failover(e)
+            return self.fallback.query(namespace, query_vector, top_k, filters)
+
+    def query_with_payload(self, namespace, query_vector, top_k: int = 5, filters: Optional[Dict] = None):
+        try:
+            return self.primary._search(namespace, query_vector, top_k, True, raise_errors=True, filters=filters)
+        except Exception as e:
+            self._failover(e)
+            return self.fallback.query_with_payload(namespace, query_vector, top_k, filters)
+
+    def query_batch(self, queries: List[VectorQuery]) -> List[List[Tuple[str, float]]]:
+        try:
+            return [
+                [(chunk_id, score) for chunk_id, score, _ in results]
+                for results in self.primary._search_batch(queries, ["chunk_id"], raise_errors=True)
+            ]
+        except Exception as e:
+            self._failover(e)
+            return self.fallback.query_batch(queries)
+
+    def query_batch_with_payload(self, queries: List[VectorQuery]):
+        try:
+            return self.primary._search_batch(queries, True, raise_errors=True)
+        except Exception as e:
+            self._failover(e)
+            return self.fallback.query_batch_with_payload(queries)
+
+    def fetch_payloads(self, chunk_ids: List[str]) -> Dict[str, Dict]:
+        if self.primary._client is None:
+            return self.fallback.fetch_payloads(chunk_ids)
+        return self.primary.fetch_payloads(chunk_ids)
+
+    def upsert(self, namespace: str, pairs: List[Tuple[str, np.ndarray]], payloads: Optional[List[Dict]] = None) -> None:
+        self.primary.upsert(namespace, pairs, payloads)
+        self.fallback.upsert(namespace, pairs, payloads)
+
+    def delete_by_chunk_id(self, chunk_id: str) -> bool:
+        return self.delete_by_chunk_ids([chunk_id])
+
+    def delete_by_chunk_ids(self, chunk_ids: List[str]) -> bool:
+        deleted = self.primary.delete_by_chunk_ids(chunk_ids)
+        return self.fallback.delete_by_chunk_ids(chunk_ids) or deleted
+
+    def delete_by_namespace(self, namespace: str):
+        self.primary.delete_by_namespace(namespace)
+        self.fallback.delete_by_namespace(namespace)
+
+    def get_stats(self) -> Dict:
+        stats = self.primary.get_stats()
+        stats["failover"] = self.fallback.get_stats()
+        return stats
+
+    def health_check(self) -> bool:
+        return self.primary.health_check() or self.fallback.health_check()
+
+
+def create_vector_index(db=None, **kwargs):
+    """
+    Build the vector index DAO selected by config
+
+    - vector_store_type "local": LocalVectorIndexDAO only
+    - vector_store_type "qdrant" + vector_failover: Qdrant with local failover
+    - otherwise: VectorIndexDAO (Qdrant)
+
+    Args:
+        db: SQLAlchemy session (passed through, unused by the vector backends)
+        **kwargs: Extra constructor arguments (collection_name, fingerprint)
+
+    Returns:
+        DAO with the query/upsert/delete_by_* interface
+    """
+    from Chatbot.config.rag_config import get_rag_config
+    config = get_rag_config()
+
+    if config.vector_store_type == "local":
+        from Chatbot.dao.LocalVectorIndexDAO import LocalVectorIndexDAO
+        return LocalVectorIndexDAO(db, **kwargs)
+
+    primary = VectorIndexDAO(db, **kwargs)
+    if config.vector_failover:
+        from Chatbot.dao.LocalVectorIndexDAO import LocalVectorIndexDAO
+        return FailoverVectorIndexDAO(primary, LocalVectorIndexDAO(db, **kwargs))
+    return primary
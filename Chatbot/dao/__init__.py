@@ -1,5 +1,18 @@
 from .DocumentDAO import DocumentDAO
 from .ChunkDAO import ChunkDAO
-from .VectorIndexDAO import VectorIndexDAO
+from .VectorIndexDAO import VectorIndexDAO, VectorQuery, FailoverVectorIndexDAO, create_vector_index
+from .LocalVectorIndexDAO import LocalVectorIndexDAO
+from .CorpusGenerationDAO import CorpusGenerationDAO
+from .ChunkTokenCountDAO import ChunkTokenCountDAO
 
-__all__ = ["DocumentDAO", "ChunkDAO", "VectorIndexDAO"]
+__all__ = [
+    "DocumentDAO",
+    "ChunkDAO",
+    "VectorIndexDAO",
+    "VectorQuery",
+    "FailoverVectorIndexDAO",
+    "LocalVectorIndexDAO",
+    "create_vector_index",
+    "CorpusGenerationDAO",
+    "ChunkTokenCountDAO",
+]
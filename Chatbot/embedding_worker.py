@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Embedding worker pool - dedicated processes that own the embedding model
+
+Mỗi worker process load model đúng MỘT lần và phục vụ các uvicorn worker
+qua unix socket (multiprocessing.connection). VectorizerService ở phía HTTP
+chỉ còn là thin client (EmbeddingWorkerClient), nên RAM của model không bị
+nhân lên theo số uvicorn worker.
+
+Usage:
+  python -m Chatbot.embedding_worker                       # 1 worker, socket từ config
+  python -m Chatbot.embedding_worker --workers 2           # 2 processes: <socket>.0, <socket>.1
+  python -m Chatbot.embedding_worker --socket /run/emb.sock
+
+Sau đó chạy server với EMBEDDING_WORKER_MODE=remote.
+"""
+import os
+import signal
+import logging
+import argparse
+import threading
+import multiprocessing
+from multiprocessing.connection import Listener
+
+logger = logging.getLogger(__name__)
+
+
+def worker_socket_paths(base_path: str, count: int) -> list:
+    """Socket path of every worker in the pool"""
+    if count <= 1:
+        return [base_path]
+    return [f"{base_path}.{i}" for i in range(count)]
+
+
+def worker_authkey() -> bytes:
+    """Shared secret between workers and clients"""
+    return os.getenv("EMBEDDING_WORKER_AUTHKEY", "ptit-embedding-worker").encode("utf-8")
+
+
+def _handle_connection(conn, vectorizer):
+    """
+    Serve one client connection until it closes
+
+    Protocol: request = (op, payload), response = ("ok", result) | ("error", message)
+    Ops: ping, info, embed (text), embed_batch (list of texts)
+    """
+    try:
+        while True:
+            try:
+                op, payload = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            try:
+                if op == "embed":
+                    result = vectorizer.embed(payload)
+                elif op == "embed_batch":
+                    result = vectorizer.embed_batch(payload)
+                elif op == "info":
+                    result = {
+                        "model": vectorizer.embed_model,
+                        "dimension": vectorizer.get_dimension(),
+                        "backend": vectorizer.backend,
+                        "loaded": vectorizer.model is not None,
+                        "cache_enabled": vectorizer.enable_cache,
+                        "embedding_cache": vectorizer.get_cache_stats(),
+                        "fingerprint": vectorizer.get_fingerprint(),
+                        "pid": os.getpid(),
+                    }
+                elif op == "ping":
+                    result = "pong"
+                else:
+                    raise ValueError(f"Unknown op: {op}")
+                conn.send(("ok", result))
+            except Exception as e:
+                logger.error(f"Embedding worker op '{op}' failed: {e}")
+                conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+def serve(socket_path: str):
+    """
+    Load the model and serve requests on a unix socket (blocks forever)
+
+    Each client connection gets its own thread; concurrent embed() calls
+    from different connections are merged by the micro-batching queue.
+
+    Args:
+        socket_path: Unix socket path to listen on
+    """
+    from Chatbot.services.VectorizerService import VectorizerService
+
+    vectorizer = VectorizerService()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = Listener(socket_path, family="AF_UNIX", authkey=worker_authkey())
+    logger.info(f"✅ Embedding worker {os.getpid()} listening on {socket_path}")
+    print(f"✅ Embedding worker {os.getpid()} listening on {socket_path}")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                logger.warning(f"Rejected embedding client: {e}")
+                continue
+            threading.Thread(
+                target=_handle_connection,
+                args=(conn, vectorizer),
+                name="embedding-worker-conn",
+                daemon=True
+            ).start()
+    finally:
+        listener.close()
+
+
+def main():
+    from Chatbot.config.rag_config import get_rag_config
+    config = get_rag_config()
+
+    parser = argparse.ArgumentParser(description="Run the embedding worker pool")
+    parser.add_argument("--workers", type=int, default=config.embedding_worker_count)
+    parser.add_argument("--socket", default=config.embedding_worker_socket)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    paths = worker_socket_paths(args.socket, args.workers)
+
+    if len(paths) == 1:
+        serve(paths[0])
+        return
+
+    processes = [
+        multiprocessing.Process(target=serve, args=(path,), name=f"embedding-worker-{i}")
+        for i, path in enumerate(paths)
+    ]
+    for process in processes:
+        process.start()
+
+    def _shutdown(signum, frame):
+        # Children exit on SIGTERM; the join loop below then returns
+        for process in processes:
+            process.terminate()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
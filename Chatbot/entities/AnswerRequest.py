@@ -17,6 +17,18 @@ class AnswerRequest(BaseModel):
         default=None,
         description="Previous conversation messages for context. Format: [{'role': 'user|assistant', 'content': '...'}]"
     )
+    chat_id: Optional[str] = Field(
+        default=None,
+        description="Chat identifier: older history turns are folded into a rolling summary cached per chat"
+    )
+    history_token_budget: Optional[int] = Field(
+        default=None, ge=100, le=8000,
+        description="Max tokens for conversation history (summary + recent turns), separate from token_budget"
+    )
+    deadline_ms: Optional[int] = Field(
+        default=None, ge=1000, le=300000,
+        description="Time left for the caller (ms): the answer is produced within it, using the fallback model if needed"
+    )
 
     class Config:
         json_schema_extra = {
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .RetrievalHit import RetrievalHit
 
 
@@ -12,6 +12,8 @@ class AnswerResult(BaseModel):
     citations: List[RetrievalHit] = Field(default_factory=list, description="Retrieved chunks used as context")
     domain: Optional[str] = Field(None, description="Domain service that handled the question (for debugging)")
     namespace: Optional[str] = Field(None, description="Namespace used for retrieval (for debugging)")
+    timings: Optional[Dict[str, float]] = Field(None, description="Per-stage latency in ms: embed_ms, retrieval_ms, rerank_ms, llm_ms (debugging, load tests)")
+    cache_similarity: Optional[float] = Field(None, description="Set when served from the semantic answer cache: similarity to the cached question")
 
     class Config:
         json_schema_extra = {
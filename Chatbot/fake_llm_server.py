@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Fake LLM server - OpenAI-compatible stand-in cho load test
+
+ModelClient._mock_completion trả lời tức thì nên không phản ánh latency thật,
+còn gọi OpenAI thật thì tốn tiền và dính rate limit. Server này giả lập
+POST /v1/chat/completions (thường và stream SSE) với:
+- time-to-first-token (TTFT) cố định, thêm jitter log-normal nếu muốn mô
+  phỏng tail latency
+- tốc độ sinh token (tokens/giây), độ dài câu trả lời giới hạn bởi max_tokens
+- tỉ lệ lỗi (HTTP 500 mặc định, hoặc 429)
+
+Tất cả lựa chọn ngẫu nhiên (jitter, lỗi) lấy từ một RNG khởi tạo bằng --seed,
+nên hai lần chạy cùng tham số và cùng thứ tự request cho cùng phân phối
+latency và cùng số lỗi. Nội dung câu trả lời chỉ phụ thuộc vào prompt.
+OpenAI SDK vẫn tự retry lỗi 429/5xx (max_retries=2) như với API thật.
+
+Usage:
+  python -m Chatbot.fake_llm_server                                    # :8100, TTFT 400ms, 50 tokens/s
+  python -m Chatbot.fake_llm_server --ttft-ms 800 --ttft-jitter 0.5 --error-rate 0.02
+  python -m Chatbot.fake_llm_server --tokens-per-second 0             # không giới hạn tốc độ sinh
+
+  # Trỏ Chatbot / BE vào server giả (Qdrant in-process, không cần server):
+  LLM_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake QDRANT_HOST=:memory: \\
+      python -m uvicorn Chatbot.main:app --port 8001
+"""
+import sys
+import json
+import time
+import uuid
+import zlib
+import random
+import asyncio
+import argparse
+import threading
+from typing import Dict, List, NamedTuple, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from Chatbot.utils.tokenizers import LOCAL_TOKENIZER, get_tokenizer
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# Từ vựng của câu trả lời giả (độ dài token gần với câu trả lời tiếng Việt thật)
+_VOCABULARY = (
+    "Theo quy chế đào tạo của Học viện, sinh viên cần hoàn thành đủ số tín chỉ "
+    "trong chương trình. Học phí được tính theo số tín chỉ đăng ký mỗi học kỳ và "
+    "có thể thay đổi theo từng năm học. Thông tin chi tiết về tuyển sinh, điểm "
+    "chuẩn, học bổng và các thủ tục hành chính được công bố trên cổng thông tin "
+    "của PTIT. Bạn nên liên hệ phòng Giáo vụ hoặc phòng Công tác sinh viên để "
+    "được hướng dẫn cụ thể."
+).split()
+
+
+class FakeLLMSettings(NamedTuple):
+    """Latency / error profile of the fake provider"""
+    ttft_ms: float = 400.0
+    ttft_jitter: float = 0.0  # Sigma of a log-normal factor on TTFT (0 = fixed TTFT)
+    tokens_per_second: float = 50.0  # 0 = all tokens right after the first one
+    answer_tokens: int = 150  # Tokens per answer (capped by the request's max_tokens)
+    error_rate: float = 0.0  # Fraction of requests answered with error_status
+    error_status: int = 500
+    seed: int = 17
+
+
+class FakeLLM:
+    """
+    Deterministic completion generator
+
+    Per-request latency and failures come from one seeded RNG (in arrival
+    order); answer text is seeded by the prompt only.
+    """
+
+    def __init__(self, settings: FakeLLMSettings):
+        self.settings = settings
+        self._rng = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self._tokenizer = get_tokenizer(LOCAL_TOKENIZER)
+        self._stats = {"requests": 0, "stream_requests": 0, "errors": 0, "completion_tokens": 0,
+                       "in_flight": 0, "max_in_flight": 0}
+
+    def plan(self) -> Tuple[float, bool]:
+        """
+        Draw the next request's TTFT and failure
+
+        Returns:
+            (TTFT in seconds, True when the request must fail)
+        """
+        settings = self.settings
+        with self._lock:
+            jitter = self._rng.lognormvariate(0.0, settings.ttft_jitter) if settings.ttft_jitter > 0 else 1.0
+            fail = self._rng.random() < settings.error_rate
+        return settings.ttft_ms / 1000.0 * jitter, fail
+
+    def answer(self, messages: List[Dict], max_tokens: int) -> List[str]:
+        """
+        Answer tokens for a prompt (same prompt → same answer)
+
+        Args:
+            messages: Chat messages of the request
+            max_tokens: Token limit of the request
+
+        Returns:
+            Token strings (words with their leading space)
+        """
+        prompt = "\n".join(str(message.get("content") or "") for message in messages)
+        rng = random.Random(zlib.crc32(prompt.encode("utf-8")) ^ self.settings.seed)
+        count = max(min(self.settings.answer_tokens, max_tokens), 1)
+        return [(" " if i else "") + rng.choice(_VOCABULARY) for i in range(count)]
+
+    def prompt_tokens(self, messages: List[Dict]) -> int:
+        return sum(self._tokenizer.count(str(message.get("content") or "")) for message in messages)
+
+    def token_interval(self) -> float:
+        """Seconds between two generated tokens"""
+        rate = self.settings.tokens_per_second
+        return 1.0 / rate if rate > 0 else 0.0
+
+    def begin(self, stream: bool):
+        with self._lock:
+            self._stats["stream_requests" if stream else "requests"] += 1
+            self._stats["in_flight"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+
+    def end(self, tokens: int = 0, error: bool = False):
+        with self._lock:
+            self._stats["in_flight"] -= 1
+            self._stats["completion_tokens"] += tokens
+            if error:
+                self._stats["errors"] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "settings": self.settings._asdict()}
+
+
+def create_app(settings: FakeLLMSettings) -> FastAPI:
+    """
+    FastAPI app serving the OpenAI chat completions API from a FakeLLM
+
+    Args:
+        settings: Latency / error profile
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(title="Fake LLM", description="OpenAI-compatible stand-in for load tests")
+    llm = FakeLLM(settings)
+    app.state.llm = llm
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model", "created": 0, "owned_by": "loadtest"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return llm.get_stats()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        model = body.get("model", "fake")
+        stream = bool(body.get("stream"))
+        tokens = llm.answer(messages, int(body.get("max_tokens") or settings.answer_tokens))
+        ttft, fail = llm.plan()
+
+        llm.begin(stream)
+        if fail:
+            await asyncio.sleep(ttft)
+            llm.end(error=True)
+            return JSONResponse(
+                status_code=settings.error_status,
+                content={"error": {"message": "Injected failure (fake LLM)", "type": "server_error", "code": None}}
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        finish_reason = "length" if len(tokens) < settings.answer_tokens else "stop"  # Cut by max_tokens
+        prompt_tokens = llm.prompt_tokens(messages)
+
+        if not stream:
+            try:
+                await asyncio.sleep(ttft + llm.token_interval() * (len(tokens) - 1))
+            finally:
+                llm.end(tokens=len(tokens))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                },
+            }
+
+        def chunk(delta: Dict, finish_reason=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        async def events():
+            sent = 0
+            try:
+                await asyncio.sleep(ttft)
+                yield chunk({"role": "assistant", "content": ""})
+                interval = llm.token_interval()
+                for i, token in enumerate(tokens):
+                    if i and interval:
+                        await asyncio.sleep(interval)
+                    yield chunk({"content": token})
+                    sent += 1
+                yield chunk({}, finish_reason=finish_reason)
+                yield "data: [DONE]\n\n"
+            finally:
+                # Also reached when the client disconnects mid-stream
+                llm.end(tokens=sent)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    defaults = FakeLLMSettings()
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible fake LLM for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft-ms", type=float, default=defaults.ttft_ms, help="Time to first token")
+    parser.add_argument("--ttft-jitter", type=float, default=defaults.ttft_jitter,
+                        help="Log-normal sigma applied to TTFT (0.5 ≈ p99 3x p50)")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--answer-tokens", type=int, default=defaults.answer_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status, help="500 or 429")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    settings = FakeLLMSettings(
+        ttft_ms=args.ttft_ms,
+        ttft_jitter=args.ttft_jitter,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    )
+
+    import uvicorn
+    print(f"🤖 Fake LLM on http://{args.host}:{args.port}/v1 - {settings._asdict()}")
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
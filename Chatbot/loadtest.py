@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test cho RAG server / BE
+
+Gửi request với tốc độ cố định theo kiểu open loop: request thứ i được gửi
+tại t0 + i/rate dù các request trước đã xong hay chưa, và latency tính từ
+thời điểm đó. Khi server quá tải, thời gian xếp hàng nằm trong latency,
+không bị che đi như khi một số client cố định chờ nhau (coordinated omission).
+
+Kết quả được lưu ra JSON (loadtest_results/) để so sánh giữa các commit:
+- throughput, tỉ lệ lỗi, latency p50/p95/p99 (thêm TTFT khi stream)
+- breakdown theo stage từ `timings` của response (embed/retrieval/rerank/llm ms)
+- thay đổi của /api/rag/metrics trong lúc chạy: stage wait, fallback, hedge,
+  cache hit...
+
+Chạy với fake LLM (python -m Chatbot.fake_llm_server, LLM_BASE_URL) và Qdrant
+in-process (QDRANT_HOST=:memory:) để kết quả không phụ thuộc OpenAI.
+
+Usage:
+  python -m Chatbot.loadtest --seed-docs 10 --rate 0                           # chỉ nạp 10 file assets/raw
+  python -m Chatbot.loadtest --rate 10 --duration 60                           # POST /api/rag/answer
+  python -m Chatbot.loadtest --target rag-stream --rate 10                     # SSE, đo TTFT
+  python -m Chatbot.loadtest --target be --url http://127.0.0.1:8000 --user-id 1
+  python -m Chatbot.loadtest --compare loadtest_results/a.json loadtest_results/b.json
+"""
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import subprocess
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import httpx
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+RESULTS_DIR = Path("loadtest_results")
+RAW_DIR = Path(__file__).resolve().parent / "assets" / "raw"
+
+TARGETS = ("rag", "rag-stream", "be")
+
+DEFAULT_QUESTIONS = [
+    "Học phí một tín chỉ ngành Công nghệ thông tin là bao nhiêu?",
+    "Điểm chuẩn ngành An toàn thông tin năm 2024 là bao nhiêu?",
+    "Điều kiện để được xét học bổng khuyến khích học tập là gì?",
+    "Sinh viên bị cảnh báo học tập khi nào?",
+    "Thủ tục xin nghỉ học có thời hạn như thế nào?",
+    "Học viện có những cơ sở đào tạo nào?",
+    "Làm sao để đăng ký học lại một học phần?",
+    "Chương trình chất lượng cao An toàn thông tin học trong bao lâu?",
+    "Sinh viên cần bao nhiêu tín chỉ để tốt nghiệp?",
+    "Cách tính điểm trung bình tích lũy như thế nào?",
+    "Gửi xe ở cơ sở Hà Đông ở đâu?",
+    "Phương thức xét tuyển của PTIT gồm những gì?",
+    "Mẫu đơn xin cấp lại thẻ sinh viên lấy ở đâu?",
+    "Điều kiện chuyển ngành trong Học viện là gì?",
+    "Thời gian đóng học phí mỗi học kỳ là khi nào?",
+    "Ngành Logistics và quản trị chuỗi cung ứng học những gì?",
+]
+
+
+class RequestResult(NamedTuple):
+    """Outcome of one load-test request"""
+    status: str  # HTTP status code, or exception name when no response came back
+    latency: float  # Seconds from the scheduled send time to the full response
+    ttft: Optional[float] = None  # Seconds from the scheduled send time to the first answer text (stream)
+    timings: Optional[Dict[str, float]] = None  # Per-stage ms reported by the server
+    cached: bool = False  # Answered from the semantic answer cache
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "200"
+
+
+def summarize(values: List[float]) -> Optional[Dict]:
+    """
+    Nearest-rank percentiles of a sample
+
+    Args:
+        values: Samples (same unit as the result)
+
+    Returns:
+        {count, p50, p95, p99, mean, max} or None for an empty sample
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+    return {
+        "count": len(ordered),
+        "p50": round(rank(0.50), 2),
+        "p95": round(rank(0.95), 2),
+        "p99": round(rank(0.99), 2),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+# ===== Targets =====
+
+async def send_rag(client: httpx.AsyncClient, args, question: str, index: int, scheduled: float) -> RequestResult:
+    """POST /api/rag/answer"""
+    response = await client.post("/api/rag/answer", json=_answer_body(args, question))
+    latency = time.perf_counter() - scheduled
+    if response.status_code != 200:
+        return RequestResult(str(response.status_code), latency)
+    data = response.json()
+    return RequestResult("200", latency, timings=data.get("timings"), cached=data.get("cache_similarity") is not None)
+
+
+async def send_rag_stream(client: httpx.AsyncClient, args, question: str, index: int, scheduled: float) -> RequestResult:
+    """POST /api/rag/answer/stream (Server-Sent Events: citations, delta*, done | error)"""
+    ttft = None
+    done = None
+    event = None
+    async with client.stream("POST", "/api/rag/answer/stream", json=_answer_body(args, question)) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return RequestResult(str(response.status_code), time.perf_counter() - scheduled)
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                if event == "delta" and ttft is None:
+                    ttft = time.perf_counter() - scheduled
+                elif event == "done":
+                    done = json.loads(line[len("data:"):])
+                elif event == "error":
+                    return RequestResult("stream-error", time.perf_counter() - scheduled, ttft)
+
+    latency = time.perf_counter() - scheduled
+    if done is None:
+        return RequestResult("stream-incomplete", latency, ttft)
+    return RequestResult("200", latency, ttft, done.get("timings"), done.get("cache_similarity") is not None)
+
+
+async def send_be(client: httpx.AsyncClient, args, question: str, index: int, scheduled: float) -> RequestResult:
+    """POST /api/chat/send (BE → RAG, message history saved in SQL)"""
+    data = {"chat_id": str(args.chat_ids[index % len(args.chat_ids)]), "content": question}
+    if args.model:
+        data["model"] = args.model
+    response = await client.post("/api/chat/send", data=data)
+    latency = time.perf_counter() - scheduled
+    if response.status_code != 200:
+        return RequestResult(str(response.status_code), latency)
+    if response.json().get("ok") is False:
+        return RequestResult("not-ok", latency)
+    return RequestResult("200", latency)
+
+
+SENDERS = {"rag": send_rag, "rag-stream": send_rag_stream, "be": send_be}
+
+
+def _answer_body(args, question: str) -> Dict:
+    body = {"namespace_id": args.namespace, "question": question, "top_k": args.top_k}
+    if args.model:
+        body["model"] = args.model
+    return body
+
+
+async def create_chats(client: httpx.AsyncClient, user_id: int, count: int) -> List[int]:
+    """Chats the BE target spreads its messages over"""
+    chat_ids = []
+    for i in range(count):
+        response = await client.post("/api/chat/create", data={"user_id": str(user_id), "title": f"loadtest #{i + 1}"})
+        response.raise_for_status()
+        chat_ids.append(response.json()["chat"]["id"])
+    return chat_ids
+
+
+async def seed_documents(client: httpx.AsyncClient, limit: int) -> int:
+    """
+    Ingest the first `limit` files of Chatbot/assets/raw (same domain
+    classification as ingest_docs_multi_domain) - an in-memory Qdrant
+    starts empty
+
+    Returns:
+        Number of chunks ingested
+    """
+    from Chatbot.ingest_docs_multi_domain import classify_document
+
+    chunks = 0
+    for file_path in sorted(RAW_DIR.glob("*.md"))[:limit]:
+        content = file_path.read_text(encoding="utf-8")
+        classification = classify_document(file_path, content)
+        response = await client.post("/api/rag/ingest", json={
+            "namespace_id": classification["namespace"],
+            "document_title": file_path.stem,
+            "content": content,
+            "category": classification["category"],
+            "metadata": classification["metadata"],
+        }, timeout=300)
+        response.raise_for_status()
+        chunks += response.json().get("chunk_count", 0)
+        print(f"   📄 {file_path.name} → {classification['namespace']}")
+    return chunks
+
+
+# ===== Server metrics =====
+
+async def fetch_metrics(client: httpx.AsyncClient, url: str) -> Optional[Dict]:
+    try:
+        response = await client.get(f"{url}/api/rag/metrics", timeout=10)
+        response.raise_for_status()
+        return response.json()["metrics"]
+    except Exception as e:
+        print(f"⚠️  Cannot read {url}/api/rag/metrics: {e}")
+        return None
+
+
+def metrics_delta(before: Optional[Dict], after: Optional[Dict]) -> Optional[Dict]:
+    """
+    What changed in /api/rag/metrics during the run
+
+    Returns:
+        {"counters": {name: increase}, "histograms": {name: {count, mean}}, "gauges": {name: value}}
+        (mean in ms for *_seconds histograms); None when metrics were unavailable
+    """
+    if before is None or after is None:
+        return None
+
+    delta = {"counters": {}, "histograms": {}, "gauges": {}}
+    for name, snap in after.items():
+        old = before.get(name, {})
+        if snap["type"] == "counter":
+            increase = snap["value"] - old.get("value", 0)
+            if increase:
+                delta["counters"][name] = increase
+        elif snap["type"] == "histogram":
+            count = snap["count"] - old.get("count", 0)
+            if count:
+                mean = (snap["sum"] - old.get("sum", 0.0)) / count
+                if name.endswith("_seconds"):
+                    name, mean = name[:-len("_seconds")] + "_ms", mean * 1000
+                delta["histograms"][name] = {"count": count, "mean": round(mean, 2)}
+        else:
+            delta["gauges"][name] = snap["value"]
+    return delta
+
+
+# ===== Runner =====
+
+async def run_load(args) -> Dict:
+    """
+    Send rate × duration requests at fixed intervals and collect the results
+
+    Returns:
+        Result document (see module docstring)
+    """
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        if args.seed_docs:
+            print(f"🌱 Seeding {args.seed_docs} documents...")
+            print(f"   {await seed_documents(client, args.seed_docs)} chunks ingested")
+        if args.rate <= 0:
+            return {}
+
+        if args.target == "be":
+            args.chat_ids = await create_chats(client, args.user_id, args.conversations)
+
+        send = SENDERS[args.target]
+        questions = args.questions
+
+        # Warm-up (not measured): model load, connection pools, caches
+        for i in range(args.warmup):
+            await send(client, args, questions[i % len(questions)], i, time.perf_counter())
+
+        before = await fetch_metrics(client, args.metrics_url)
+
+        total = int(args.rate * args.duration)
+        lags = []
+
+        async def fire(i: int, scheduled: float) -> RequestResult:
+            lags.append(time.perf_counter() - scheduled)
+            try:
+                return await send(client, args, questions[i % len(questions)], i, scheduled)
+            except Exception as e:
+                return RequestResult(type(e).__name__, time.perf_counter() - scheduled)
+
+        print(f"🚀 {total} requests → {args.target} at {args.rate}/s for {args.duration}s")
+        start = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            scheduled = start + i / args.rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(i, scheduled)))
+        results: List[RequestResult] = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        after = await fetch_metrics(client, args.metrics_url)
+
+    ok = [r for r in results if r.ok]
+    stages: Dict[str, List[float]] = {}
+    for result in ok:
+        for stage, ms in (result.timings or {}).items():
+            stages.setdefault(stage, []).append(ms)
+
+    max_lag_ms = round(max(lags) * 1000, 2) if lags else 0.0
+    if max_lag_ms > 100:
+        print(f"⚠️  Sends started up to {max_lag_ms:.0f}ms late - the load generator itself is saturated")
+
+    return {
+        "run": {
+            "target": args.target,
+            "url": args.url,
+            "rate": args.rate,
+            "duration": args.duration,
+            "model": args.model,
+            "namespace": args.namespace,
+            "questions": len(questions),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            **git_revision(),
+        },
+        "summary": {
+            "requests": len(results),
+            "ok": len(ok),
+            "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+            "throughput_rps": round(len(ok) / elapsed, 2),
+            "elapsed_s": round(elapsed, 2),
+            "cache_hits": sum(r.cached for r in ok),
+            "max_send_lag_ms": max_lag_ms,
+            "latency_ms": summarize([r.latency * 1000 for r in ok]),
+            "ttft_ms": summarize([r.ttft * 1000 for r in ok if r.ttft is not None]),
+        },
+        "status_codes": dict(Counter(r.status for r in results)),
+        "stages_ms": {stage: summarize(values) for stage, values in sorted(stages.items())},
+        "server_metrics": metrics_delta(before, after),
+    }
+
+
+def git_revision() -> Dict:
+    """Commit the results belong to (for comparisons across commits)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return {"git_commit": commit, "git_dirty": dirty}
+    except Exception:
+        return {"git_commit": None, "git_dirty": None}
+
+
+def print_summary(result: Dict):
+    summary = result["summary"]
+    print(f"\n✅ {summary['ok']}/{summary['requests']} ok ({summary['error_rate']:.1%} errors), "
+          f"{summary['throughput_rps']} req/s, status {result['status_codes']}")
+    for label, stats in [("latency", summary["latency_ms"]), ("ttft", summary["ttft_ms"])] + \
+            [(stage, stats) for stage, stats in result["stages_ms"].items()]:
+        if stats:
+            print(f"   {label:<14} p50 {stats['p50']:>9.1f}  p95 {stats['p95']:>9.1f}  p99 {stats['p99']:>9.1f} ms")
+
+
+def compare(old_path: str, new_path: str):
+    """Print p50/p95/p99, throughput and stage latencies of two result files side by side"""
+    old, new = (json.loads(Path(path).read_text(encoding="utf-8")) for path in (old_path, new_path))
+
+    def rows(result: Dict) -> Dict[str, float]:
+        summary = result["summary"]
+        values = {"throughput_rps": summary["throughput_rps"], "error_rate": summary["error_rate"]}
+        sections = {"latency": summary["latency_ms"], "ttft": summary["ttft_ms"], **result["stages_ms"]}
+        for section, stats in sections.items():
+            for q in ("p50", "p95", "p99"):
+                if stats:
+                    values[f"{section}.{q}"] = stats[q]
+        return values
+
+    old_rows, new_rows = rows(old), rows(new)
+    labels = [result["run"].get("git_commit") or Path(path).stem for result, path in ((old, old_path), (new, new_path))]
+    width = max(14, *(len(label) + 2 for label in labels))
+    print(f"{'':<22}{labels[0]:>{width}}{labels[1]:>{width}}")
+    for key in [k for k in old_rows if k in new_rows] + [k for k in new_rows if k not in old_rows]:
+        a, b = old_rows.get(key), new_rows.get(key)
+        change = f"{(b - a) / a:+.1%}" if a and b is not None else ""
+        print(f"{key:<22}{'' if a is None else a:>{width}}{'' if b is None else b:>{width}}  {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixed-rate load test for the RAG and BE endpoints")
+    parser.add_argument("--target", choices=TARGETS, default="rag")
+    parser.add_argument("--url", default="http://127.0.0.1:8001", help="Server under test")
+    parser.add_argument("--metrics-url", default=None, help="Server exposing /api/rag/metrics (default: --url)")
+    parser.add_argument("--rate", type=float, default=5.0, help="Requests per second (0 = seed only)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests sent first")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--namespace", default="ptit_docs", help="namespace_id (ptit_docs = domain routing)")
+    parser.add_argument("--model", default=None, help="LLM model sent with each request (default: server's)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--questions", type=Path, default=None, help="File with one question per line")
+    parser.add_argument("--user-id", type=int, default=1, help="BE target: owner of the load-test chats")
+    parser.add_argument("--conversations", type=int, default=20, help="BE target: chats the messages are spread over")
+    parser.add_argument("--seed-docs", type=int, default=0, help="Ingest this many files of assets/raw first")
+    parser.add_argument("--output", type=Path, default=None, help="Result JSON (default: loadtest_results/...)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.url = args.url.rstrip("/")
+    args.metrics_url = (args.metrics_url or args.url).rstrip("/")
+    if args.questions:
+        args.questions = [line.strip() for line in args.questions.read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        args.questions = DEFAULT_QUESTIONS
+
+    result = asyncio.run(run_load(args))
+    if not result:
+        return
+    print_summary(result)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}_{result['run']['git_commit'] or 'nogit'}_{args.target}_r{args.rate:g}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"📁 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,19 @@ Chạy server này độc lập với BE server:
 
 API Endpoints:
     POST /api/rag/answer      - Trả lời câu hỏi với RAG
+    POST /api/rag/answer/stream - Trả lời dạng stream (Server-Sent Events)
     POST /api/rag/ingest      - Nạp document vào vector store
     GET  /api/rag/documents   - Liệt kê documents
     GET  /api/rag/health      - Health check
+    GET  /api/rag/metrics     - Metrics (JSON hoặc ?format=prometheus)
+    GET  /health              - Liveness (trả lời ngay)
+    GET  /ready               - Readiness (503 cho đến khi model warm-up xong)
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from Chatbot.controllers.RAGController import router as rag_router
+from Chatbot.bootstrap import start_rag_services, readiness
 from BE.db.session import Base, engine
 from dotenv import load_dotenv
 import logging
@@ -21,7 +27,7 @@ import logging
 load_dotenv()
 
 # Import models để register với Base.metadata
-from Chatbot.models import Document, Chunk, Embedding
+from Chatbot.models import Document, Chunk, Embedding, ChunkTokenCount
 
 # Tạo FastAPI app cho Chatbot
 app = FastAPI(
@@ -54,17 +60,21 @@ app.include_router(rag_router)
 def startup():
     """
     Tạo bảng database khi khởi động
-    Tự động tạo: documents, chunks, embeddings
+    Tự động tạo: documents, chunks, embeddings, chunk_token_counts
+    Model được load ở background thread (không chặn startup)
     """
     try:
         Base.metadata.create_all(bind=engine)
         app.state.db_ready = True
         logging.info("✅ Chatbot RAG database initialized successfully")
-        logging.info("📊 Tables: documents, chunks, embeddings")
+        logging.info("📊 Tables: documents, chunks, embeddings, chunk_token_counts")
     except Exception as e:
         app.state.db_ready = False
         logging.exception(f"❌ Chatbot RAG database initialization failed: {e}")
 
+    # Load vectorizer/generator in the background; /ready flips when warmed up
+    start_rag_services(app)
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -77,9 +87,15 @@ def root():
 
 @app.get("/health")
 def health():
-    """Health check endpoint"""
+    """Health check endpoint (liveness - answers immediately)"""
     return {
         "ok": True,
         "service": "Chatbot RAG Server",
         "db_available": getattr(app.state, "db_ready", False)
     }
+
+@app.get("/ready")
+def ready():
+    """Readiness endpoint - 503 until RAG services are loaded and warmed up"""
+    status = readiness(app)
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
@@ -9,7 +9,7 @@ class Chunk(Base):
     """
     Chunk entity - Represents a text chunk from a document
     Schema: chunks table
-    Relationship: Many Chunks -> 1 Document, 1 Chunk -> 1 Embedding
+    Relationship: Many Chunks -> 1 Document, 1 Chunk -> 1 Embedding, 1 Chunk -> Many ChunkTokenCounts
     """
     __tablename__ = "chunks"
 
@@ -17,13 +17,14 @@ class Chunk(Base):
     document_id = Column(String(36), ForeignKey("documents.id"), nullable=False)
     idx = Column(Integer, nullable=False)  # Index of chunk in document
     text = Column(Text, nullable=False)
-    tokens = Column(Integer, nullable=True)  # Token count
+    tokens = Column(Integer, nullable=True)  # Token count (default LLM's tokenizer)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     document = relationship("Document", back_populates="chunks")
     embedding = relationship("Embedding", back_populates="chunk", uselist=False, cascade="all, delete-orphan")
+    token_counts = relationship("ChunkTokenCount", back_populates="chunk", cascade="all, delete-orphan", lazy="selectin")
 
     def __repr__(self):
         return f"<Chunk(id={self.id}, doc_id={self.document_id}, idx={self.idx})>"
@@ -35,6 +36,7 @@ class Chunk(Base):
             "idx": self.idx,
             "text": self.text,
             "tokens": self.tokens,
+            "token_counts": {tc.tokenizer: tc.tokens for tc in self.token_counts},
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
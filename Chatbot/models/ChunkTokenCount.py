@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from BE.db.session import Base
+
+
+class ChunkTokenCount(Base):
+    """
+    ChunkTokenCount entity - Token count of a chunk for one tokenizer
+    Schema: chunk_token_counts table
+    Relationship: Many ChunkTokenCounts -> 1 Chunk (one row per tokenizer)
+    Computed in batch at ingest; context packing reads them instead of re-tokenizing.
+    """
+    __tablename__ = "chunk_token_counts"
+
+    chunk_id = Column(String(36), ForeignKey("chunks.id"), primary_key=True)
+    tokenizer = Column(String(64), primary_key=True)  # e.g., "cl100k_base", "o200k_base", "local"
+    tokens = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationship
+    chunk = relationship("Chunk", back_populates="token_counts")
+
+    def __repr__(self):
+        return f"<ChunkTokenCount(chunk_id={self.chunk_id}, tokenizer={self.tokenizer}, tokens={self.tokens})>"
+
+    def to_dict(self):
+        return {
+            "chunk_id": self.chunk_id,
+            "tokenizer": self.tokenizer,
+            "tokens": self.tokens,
+        }
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from datetime import datetime
+from BE.db.session import Base
+
+
+class CorpusGeneration(Base):
+    """
+    CorpusGeneration entity - Monotonic change counter of the knowledge base
+    Schema: corpus_generations table
+    One row per namespace plus the global row (namespace = "*"), bumped by
+    every ingest / document delete. Caches put the generation in their keys.
+    """
+    __tablename__ = "corpus_generations"
+
+    namespace = Column(String(128), primary_key=True)  # "*" = whole corpus
+    generation = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CorpusGeneration(namespace={self.namespace}, generation={self.generation})>"
+
+    def to_dict(self):
+        return {
+            "namespace": self.namespace,
+            "generation": self.generation,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -1,5 +1,7 @@
 from .Document import Document
 from .Chunk import Chunk
 from .Embedding import Embedding
+from .CorpusGeneration import CorpusGeneration
+from .ChunkTokenCount import ChunkTokenCount
 
-__all__ = ["Document", "Chunk", "Embedding"]
+__all__ = ["Document", "Chunk", "Embedding", "CorpusGeneration", "ChunkTokenCount"]
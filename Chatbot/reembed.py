@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Zero-downtime re-embedding migration
+
+Đọc chunks trực tiếp từ bảng `chunks` theo batch, embed bằng model hiện tại
+(config.embedding_model) vào collection mới `<alias>__<fingerprint>`, rồi
+chuyển alias sang collection mới trong MỘT request (atomic). Không cần
+ingest lại qua HTTP, server không phải dừng:
+- Server chạy model mới tự dùng collection khớp fingerprint của nó
+- Server chạy model cũ vẫn đọc collection cũ cho đến khi được restart
+
+Usage:
+  python -m Chatbot.reembed                      # build + switch alias
+  python -m Chatbot.reembed --batch-size 128
+  python -m Chatbot.reembed --no-switch          # chỉ build, switch sau
+  python -m Chatbot.reembed --drop-old           # xóa collection cũ sau khi switch
+"""
+import sys
+import time
+import argparse
+import logging
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from BE.db.session import SessionLocal
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.dao.ChunkDAO import ChunkDAO
+from Chatbot.dao.DocumentDAO import DocumentDAO
+from Chatbot.dao.VectorIndexDAO import VectorIndexDAO
+from Chatbot.services.VectorizerService import VectorizerService
+
+logger = logging.getLogger(__name__)
+
+
+def load_namespace_map(client, collection_name: str) -> dict:
+    """
+    chunk_id → namespace from the currently served collection
+    (namespace lives only in point payloads; chunks table doesn't store it)
+    """
+    mapping = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=1024,
+            offset=offset,
+            with_payload=["chunk_id", "namespace"],
+            with_vectors=False
+        )
+        for point in points:
+            if point.payload and point.payload.get("chunk_id"):
+                mapping[point.payload["chunk_id"]] = point.payload.get("namespace")
+        if offset is None:
+            return mapping
+
+
+def resolve_alias_target(client, alias_name: str):
+    """Physical collection the alias currently points to (None if alias doesn't exist)"""
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == alias_name:
+            return alias.collection_name
+    return None
+
+
+def build_collection(client, vectorizer, fingerprint: dict, target: str, previous, batch_size: int):
+    """Create target collection and fill it from the chunks table"""
+    config = get_rag_config()
+    namespace_map = load_namespace_map(client, previous) if previous else {}
+    VectorIndexDAO.create_collection(client, target, fingerprint)
+    vidx = VectorIndexDAO(collection_name=target, fingerprint=fingerprint)
+
+    # Stream chunks → embed → upsert, batch by batch (bounded memory)
+    db = SessionLocal()
+    chunk_dao = ChunkDAO(db)
+    doc_dao = DocumentDAO(db)
+    full_payload = config.vector_payload_mode == "full"
+    total = 0
+    start = time.perf_counter()
+    try:
+        for batch in chunk_dao.iter_batches(batch_size):
+            vectors = vectorizer.embed_batch([text for _, text, _ in batch])
+
+            # Filter fields per point; payload mode "full" adds denormalized chunk + document fields
+            chunks = chunk_dao.find_by_ids([chunk_id for chunk_id, _, _ in batch])
+            docs = doc_dao.find_by_ids(list({chunk.document_id for chunk in chunks}))
+            build_payload = VectorIndexDAO.chunk_payload if full_payload else VectorIndexDAO.filter_payload
+            extra = {c.id: build_payload(c, docs.get(c.document_id)) for c in chunks}
+
+            by_namespace = {}
+            for (chunk_id, _, source_uri), vector in zip(batch, vectors):
+                namespace = namespace_map.get(chunk_id) or source_uri or config.default_namespace
+                by_namespace.setdefault(namespace, []).append((chunk_id, vector))
+            for namespace, pairs in by_namespace.items():
+                payloads = [extra.get(chunk_id, {}) for chunk_id, _ in pairs]
+                vidx.upsert(namespace, pairs, payloads)
+
+            total += len(batch)
+            rate = total / (time.perf_counter() - start)
+            print(f"   {total} chunks re-embedded ({rate:.1f} chunks/s)")
+    finally:
+        db.close()
+
+    print(f"✅ Built {target} with {total} chunks")
+
+
+def main():
+    config = get_rag_config()
+
+    parser = argparse.ArgumentParser(description="Re-embed all chunks into a new Qdrant collection")
+    parser.add_argument("--batch-size", type=int, default=config.embed_stream_window)
+    parser.add_argument("--no-switch", action="store_true", help="Build only, don't move the alias")
+    parser.add_argument("--drop-old", action="store_true", help="Delete the previous collection after switching")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the target collection exists")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    alias = config.qdrant_collection_name
+
+    vectorizer = VectorizerService()
+    if vectorizer.model is None:
+        print("❌ Embedding model failed to load - aborting (would write random vectors)")
+        sys.exit(1)
+
+    fingerprint = vectorizer.get_fingerprint()
+    target = VectorIndexDAO.physical_name(alias, fingerprint)
+
+    from qdrant_client import QdrantClient
+    client = QdrantClient(host=config.qdrant_host, port=config.qdrant_port, timeout=config.qdrant_timeout)
+    existing = {c.name for c in client.get_collections().collections}
+
+    legacy = alias in existing  # Pre-fingerprint deployments: alias name is a real collection
+    previous = alias if legacy else resolve_alias_target(client, alias)
+
+    print(f"Model:      {fingerprint['model']} (dim={fingerprint['dimension']}, fp={fingerprint['id']})")
+    print(f"Serving:    {previous or '-'}")
+    print(f"Target:     {target}")
+
+    if previous == target and not args.force:
+        print("✅ Alias already serves this model - nothing to do")
+        return
+
+    if target in existing and args.force:
+        client.delete_collection(target)
+        existing.discard(target)
+
+    if target in existing:
+        print(f"ℹ️  {target} already built - switching only (use --force to rebuild)")
+    else:
+        build_collection(client, vectorizer, fingerprint, target, previous, args.batch_size)
+
+    if args.no_switch:
+        print("Alias not moved. Switch later with: python -m Chatbot.reembed (no --no-switch)")
+        return
+
+    if legacy:
+        # A collection can't share its name with an alias: the legacy one must go first.
+        # Servers already on the new model read <alias>__<fp> directly, so they are unaffected.
+        print(f"⚠️  Dropping legacy collection '{alias}' to free the alias name")
+        client.delete_collection(alias)
+
+    VectorIndexDAO.set_alias(client, alias, target)
+    print(f"✅ Alias '{alias}' now serves {target}")
+
+    if args.drop_old and previous and not legacy and previous != target:
+        client.delete_collection(previous)
+        print(f"🗑️  Dropped old collection {previous}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+DomainServiceRegistry - Router + domain services dùng chung cho cả process
+Build một lần lúc startup (bootstrap), mỗi request chỉ bind DB session.
+
+Trước đây mỗi /api/rag/answer tạo mới DomainRouterService (build lại keyword
+index), domain service, RetrieverService và VectorIndexDAO (QdrantClient mới
++ get_collections) trước khi search.
+"""
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from Chatbot.utils.metrics import get_metrics
+
+from .DomainRouterService import DomainRouterService
+from .RetrieverService import RetrieverService
+from .rag.BaseRAGService import BaseRAGService
+from .rag.MultiDomainRAGService import MultiDomainRAGService
+
+
+class DomainServiceRegistry:
+    """
+    Holds the router and one stateless instance per domain service class
+
+    All domain services share one RetrieverService (and so one vector index
+    DAO / pooled Qdrant client); route() returns a copy bound to the
+    request's session.
+    """
+
+    def __init__(self, vectorizer, generator):
+        """
+        Args:
+            vectorizer: VectorizerService singleton
+            generator: GeneratorService singleton (default model)
+        """
+        self.vectorizer = vectorizer
+        self.generator = generator
+        self.router = DomainRouterService()
+
+        retriever = RetrieverService(None)
+        self._services = {
+            service_class: service_class(None, vectorizer, generator, retriever=retriever)
+            for service_class in self.router.domain_services + [self.router.fallback_service]
+        }
+        self._setup_histogram = get_metrics().histogram(
+            "rag_request_setup_seconds", "Per-request routing + domain service binding time"
+        )
+
+    def route(self, question: str, db: Session, generator=None) -> BaseRAGService:
+        """
+        Domain service for the question, bound to the request session
+
+        Args:
+            question: User's question
+            db: Request DB session
+            generator: GeneratorService override (request chose another model)
+
+        Returns:
+            Domain service ready to answer
+        """
+        start = time.perf_counter()
+        service = self._bind(self.router.detect_domain(question), db, generator)
+        self._setup_histogram.observe(time.perf_counter() - start)
+        return service
+
+    def route_answering_service(
+        self,
+        question: str,
+        db: Session,
+        generator=None,
+        multi_domain: bool = True,
+        max_domains: int = 2
+    ):
+        """
+        Service that answers the question: MultiDomainRAGService when several
+        domains match (and multi_domain is on), else the single best domain
+
+        Args:
+            question: User's question
+            db: Request DB session
+            generator: GeneratorService override
+            multi_domain: Allow multi-domain answers
+            max_domains: Max domains queried together
+
+        Returns:
+            Object with answer(question, top_k, token_budget, conversation_history)
+        """
+        start = time.perf_counter()
+        service_classes = self.router.detect_multi_domain(question) if multi_domain else []
+        if len(service_classes) > 1:
+            services = [self._bind(cls, db, generator) for cls in service_classes[:max_domains]]
+            service = MultiDomainRAGService(services, db, self.vectorizer, generator or self.generator)
+        else:
+            service = self._bind(self.router.detect_domain(question), db, generator)
+        self._setup_histogram.observe(time.perf_counter() - start)
+        return service
+
+    def _bind(self, service_class, db: Session, generator) -> BaseRAGService:
+        return self._services[service_class].bind(db, generator=generator)
+
+    def get_services(self) -> List[BaseRAGService]:
+        """Unbound domain service instances (for info/debug endpoints)"""
+        return list(self._services.values())
+
+
+# Process-wide registry (built by bootstrap once models are loaded)
+_registry: Optional[DomainServiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def init_domain_registry(vectorizer, generator) -> DomainServiceRegistry:
+    """
+    Build the process-wide registry (bootstrap, after vectorizer/generator load)
+
+    Returns:
+        DomainServiceRegistry instance
+    """
+    global _registry
+    with _registry_lock:
+        _registry = DomainServiceRegistry(vectorizer, generator)
+    return _registry
+
+
+def get_domain_registry(vectorizer=None, generator=None) -> DomainServiceRegistry:
+    """
+    Get the process-wide registry, building it from the given services if
+    bootstrap hasn't (scripts, tests)
+
+    Returns:
+        DomainServiceRegistry instance
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DomainServiceRegistry(vectorizer, generator)
+    return _registry
@@ -0,0 +1,178 @@
+"""
+EmbeddingBatcher - Dynamic micro-batching in front of the embedding model
+Concurrent embed() calls are queued and flushed as one model.encode batch
+"""
+from typing import Callable, List, Optional
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+from Chatbot.utils.metrics import get_metrics, DEFAULT_SIZE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching queue for single-text embedding requests
+
+    Flow:
+    1. Caller thread submits text → receives a Future
+    2. Background worker collects requests until max_batch_size is reached
+       or max_wait_ms has passed since the first request of the batch
+    3. Worker runs ONE encode call for the whole batch
+    4. Each caller gets back its own row of the result matrix
+
+    Cách dùng:
+        batcher = EmbeddingBatcher(encode_fn=lambda texts: model.encode(texts))
+        vector = batcher.submit("Học phí ngành CNTT?")
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        timeout: float = 30.0,
+        name: str = "embedding"
+    ):
+        """
+        Initialize batcher
+
+        Args:
+            encode_fn: Function mapping a list of texts to a (n, dim) matrix
+            max_batch_size: Flush as soon as this many requests are queued
+            max_wait_ms: Max time the first request of a batch waits for company
+            timeout: Max seconds submit() waits for its vector
+            name: Metric name prefix
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.timeout = timeout
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        metrics = get_metrics()
+        self._batch_size_hist = metrics.histogram(
+            f"rag_{name}_batch_size",
+            "Number of texts per flushed encode batch",
+            buckets=DEFAULT_SIZE_BUCKETS
+        )
+        self._queue_wait_hist = metrics.histogram(
+            f"rag_{name}_queue_wait_seconds",
+            "Time a request spent queued before its batch was encoded"
+        )
+        self._encode_hist = metrics.histogram(
+            f"rag_{name}_encode_seconds",
+            "Wall time of one batched encode call"
+        )
+
+    def _ensure_worker(self):
+        """Start the background worker thread (lazily, once)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="embedding-batcher",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, text: str) -> np.ndarray:
+        """
+        Embed one text through the shared batch queue (blocks until done)
+
+        Args:
+            text: Input text
+
+        Returns:
+            Embedding vector (float32)
+
+        Raises:
+            concurrent.futures.TimeoutError: No vector within self.timeout seconds
+        """
+        future = self.submit_async(text)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def submit_async(self, text: str) -> Future:
+        """
+        Enqueue one text and return a Future for its vector
+
+        Args:
+            text: Input text
+
+        Returns:
+            concurrent.futures.Future resolving to the embedding vector
+        """
+        if self._closed:
+            raise RuntimeError("EmbeddingBatcher is closed")
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        self._ensure_worker()
+        return future
+
+    def _collect_batch(self) -> list:
+        """Block for the first item, then gather more until size or deadline"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get_nowait() if remaining <= 0 else self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._closed = True
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        """Worker loop: collect → encode → fan results back out"""
+        while not (self._closed and self._queue.empty()):
+            batch = self._collect_batch()
+            if not batch:
+                break
+
+            texts = [text for text, _, _ in batch]
+            start = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                self._queue_wait_hist.observe(start - enqueued_at)
+            self._batch_size_hist.observe(len(batch))
+
+            try:
+                matrix = np.asarray(self.encode_fn(texts), dtype=np.float32)
+                self._encode_hist.observe(time.perf_counter() - start)
+                if matrix.ndim != 2 or matrix.shape[0] != len(batch):
+                    raise ValueError(f"encode_fn returned shape {matrix.shape} for {len(batch)} texts")
+                for row, (_, future, _) in zip(matrix, batch):
+                    if not future.done():  # Cancelled by a caller that timed out
+                        future.set_result(row)
+            except Exception as e:
+                logger.error(f"Batched encode failed for {len(batch)} texts: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def close(self):
+        """Stop the worker after draining queued requests"""
+        self._closed = True
+        self._queue.put(None)
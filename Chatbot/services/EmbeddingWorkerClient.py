@@ -0,0 +1,164 @@
+"""
+EmbeddingWorkerClient - Thin VectorizerService client for the embedding worker pool
+Same embed/embed_batch/embed_stream API, but the model lives in
+Chatbot/embedding_worker.py processes reached over unix sockets
+"""
+from typing import Iterable, Iterator, List, Optional
+from multiprocessing.connection import Client
+import itertools
+import logging
+import threading
+
+import numpy as np
+
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.embedding_worker import worker_socket_paths, worker_authkey
+from Chatbot.utils.fingerprint import make_fingerprint, set_active_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingWorkerClient:
+    """
+    Client for the out-of-process embedding workers
+
+    - One connection per (thread, worker socket), reused across calls
+    - Requests are spread round-robin over the worker sockets
+    - Falls back to random vectors if the pool is unreachable
+      (same degradation as VectorizerService without a model)
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, worker_count: Optional[int] = None):
+        """
+        Initialize client and fetch model info from the pool
+
+        Args:
+            socket_path: Base unix socket path (optional, uses config if None)
+            worker_count: Number of workers in the pool (optional, uses config if None)
+        """
+        config = get_rag_config()
+        self.socket_paths = worker_socket_paths(
+            socket_path or config.embedding_worker_socket,
+            worker_count or config.embedding_worker_count
+        )
+        self._local = threading.local()
+        self._rr = itertools.count()
+        self._rr_lock = threading.Lock()
+
+        # Defaults until the pool answers
+        self.embed_model = config.embedding_model
+        self.embedding_dimension = config.embedding_dimension
+        self.backend = f"remote:{config.embedding_backend}"
+        self.enable_cache = config.enable_cache
+        self.model = None
+        self.fingerprint = make_fingerprint(self.embed_model, self.embedding_dimension, None)
+
+        info = self._call("info", None)
+        if info:
+            self.embed_model = info["model"]
+            self.embedding_dimension = info["dimension"]
+            self.backend = f"remote:{info['backend']}"
+            self.enable_cache = info["cache_enabled"]
+            self.model = "remote" if info["loaded"] else None
+            self.fingerprint = info["fingerprint"]
+            if self.model is not None:
+                set_active_fingerprint(self.fingerprint)
+            logger.info(f"✓ Connected to embedding worker pool ({len(self.socket_paths)} workers)")
+        else:
+            logger.warning("Embedding worker pool unreachable, embeddings will be random until it is up")
+
+    # ===== Transport =====
+
+    def _next_path(self) -> str:
+        with self._rr_lock:
+            return self.socket_paths[next(self._rr) % len(self.socket_paths)]
+
+    def _connection(self, path: str):
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(path)
+        if conn is None:
+            conn = Client(path, family="AF_UNIX", authkey=worker_authkey())
+            conns[path] = conn
+        return conn
+
+    def _drop_connection(self, path: str):
+        conns = getattr(self._local, "conns", {})
+        conn = conns.pop(path, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _call(self, op: str, payload):
+        """
+        Send one request to the next worker (one reconnect attempt on failure)
+
+        Returns:
+            Result or None if the pool is unreachable / the op failed
+        """
+        path = self._next_path()
+        for attempt in range(2):
+            try:
+                conn = self._connection(path)
+                conn.send((op, payload))
+                status, result = conn.recv()
+                if status == "ok":
+                    return result
+                logger.error(f"Embedding worker error ({op}): {result}")
+                return None
+            except (EOFError, OSError, ConnectionError) as e:
+                self._drop_connection(path)
+                if attempt == 1:
+                    logger.error(f"Embedding worker {path} unreachable: {e}")
+        return None
+
+    # ===== VectorizerService API =====
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed one text in a worker process"""
+        vector = self._call("embed", text)
+        if vector is None:
+            return np.random.rand(self.embedding_dimension).astype('float32')
+        return vector
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts in a worker process (one round trip)"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.embedding_dimension), dtype='float32')
+        matrix = self._call("embed_batch", texts)
+        if matrix is None:
+            return np.random.rand(len(texts), self.embedding_dimension).astype('float32')
+        return matrix
+
+    def embed_stream(self, texts: Iterable[str], window: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Stream embeddings window by window (one round trip per window)"""
+        window = window or get_rag_config().embed_stream_window
+        buffer: List[str] = []
+        for text in texts:
+            buffer.append(text)
+            if len(buffer) >= window:
+                yield self.embed_batch(buffer)
+                buffer = []
+        if buffer:
+            yield self.embed_batch(buffer)
+
+    def warm_up(self):
+        """Open this thread's connection and check the pool answers"""
+        self._call("ping", None)
+
+    def get_fingerprint(self) -> dict:
+        return self.fingerprint
+
+    def get_dimension(self) -> int:
+        return self.embedding_dimension
+
+    def get_cache_stats(self) -> dict:
+        """Cache stats of the next worker in the pool"""
+        info = self._call("info", None)
+        if not info:
+            return {}
+        return {"worker_pid": info["pid"], **info["embedding_cache"]}
@@ -2,9 +2,47 @@
 GeneratorService - Generates answers using LLM with retrieved context
 Enhanced with conversation history support
 """
-from typing import List, Optional, Dict
+import asyncio
+import functools
+import logging
+from typing import AsyncIterator, Iterator, List, Optional, Dict
 from Chatbot.services.ModelClient import ModelClient
 from Chatbot.config.rag_config import get_rag_config
+from Chatbot.utils.async_stages import stage_slot
+from Chatbot.utils.deadline import Deadline, DeadlineExceeded
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.services.HistoryCompactor import SUMMARY_ROLE
+
+logger = logging.getLogger(__name__)
+
+
+def _tail_stats() -> Dict:
+    """Counters of the async LLM calls (rates = counter / rag_llm_requests_total)"""
+    metrics = get_metrics()
+    return {
+        "requests": metrics.counter("rag_llm_requests_total", "Async LLM answer calls to a real provider"),
+        "hedged": metrics.counter("rag_llm_hedged_requests_total", "Calls that sent a hedge request after the p95 delay"),
+        "hedge_wins": metrics.counter("rag_llm_hedge_wins_total", "Hedged calls answered by the hedge request"),
+        "fallbacks": metrics.counter("rag_llm_fallbacks_total", "Calls retried on the fallback model"),
+        "deadline_exceeded": metrics.counter("rag_llm_deadline_exceeded_total", "LLM attempts cut off by the request deadline"),
+    }
+
+
+def get_tail_stats() -> Dict:
+    """
+    Hedge / fallback counters and rates (health endpoint)
+
+    Returns:
+        Dict with counts and hedge_rate, hedge_win_rate, fallback_rate
+    """
+    counts = {name: int(counter.value) for name, counter in _tail_stats().items()}
+    requests = max(counts["requests"], 1)
+    return {
+        **counts,
+        "hedge_rate": round(counts["hedged"] / requests, 4),
+        "hedge_win_rate": round(counts["hedge_wins"] / max(counts["hedged"], 1), 4),
+        "fallback_rate": round(counts["fallbacks"] / requests, 4),
+    }
 
 
 class GeneratorService:
@@ -17,7 +55,8 @@ class GeneratorService:
         self,
         model_name: Optional[str] = None,
         max_tokens: Optional[int] = None,
-        backend: Optional[str] = None
+        backend: Optional[str] = None,
+        client: Optional[ModelClient] = None
     ):
         """
         Initialize generator service
@@ -26,14 +65,20 @@ class GeneratorService:
             model_name: LLM model identifier (optional, uses config if None)
             max_tokens: Maximum tokens for generation (optional, uses config if None)
             backend: LLM backend (optional, uses config if None)
+            client: Existing ModelClient to reuse (ModelClientPool); model_name/backend ignored
         """
         config = get_rag_config()
-        self.client = ModelClient(
+        self.client = client or ModelClient(
             model_name=model_name or config.llm_model,
             backend=backend or config.llm_backend
         )
         self.max_tokens = max_tokens or config.llm_max_tokens
 
+    @property
+    def tokenizer(self):
+        """Tokenizer of the generating model (context packing counts with it)"""
+        return self.client.tokenizer
+
     def generate(
         self,
         question: str,
@@ -51,7 +96,7 @@ class GeneratorService:
             language: Language for answer ("vi" or "en")
             conversation_history: Previous conversation turns in format:
                                  [{"role": "user|assistant", "content": "..."}]
-                                 Will use last 10 messages to maintain context
+                                 compacted by HistoryCompactor (summary + recent turns)
             system_context: Optional additional system context (for domain-specific prompts)
 
         Returns:
@@ -74,33 +119,274 @@ class GeneratorService:
 
         return answer
 
+    def generate_stream(
+        self,
+        question: str,
+        contexts: List[str],
+        language: str = "vi",
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        system_context: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Streaming variant of generate(): same prompt, answer yielded as text deltas
+
+        Args:
+            question: User's current question
+            contexts: Retrieved context chunks
+            language: Language for answer ("vi" or "en")
+            conversation_history: Previous conversation turns
+            system_context: Optional additional system context (domain-specific)
+
+        Yields:
+            Text deltas of the answer
+        """
+        config = get_rag_config()
+        messages = self._build_messages_with_context(
+            question, contexts, language, conversation_history, system_context
+        )
+        yield from self.client.stream(
+            prompt=question,
+            max_tokens=self.max_tokens,
+            temperature=config.llm_temperature,
+            messages=messages
+        )
+
+    async def agenerate(
+        self,
+        question: str,
+        contexts: List[str],
+        language: str = "vi",
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        system_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> str:
+        """
+        Async variant of generate() (async LLM client, within the "llm" stage limit)
+
+        With a real provider the call is bounded by the deadline, hedged after
+        the model's recent p95 latency (enable_llm_hedging) and retried on the
+        fallback model (llm_fallback_model) when it fails or runs out of time.
+
+        Args:
+            deadline: Request deadline (None = config.llm_default_deadline from now)
+
+        Returns:
+            Generated answer
+
+        Raises:
+            DeadlineExceeded / provider error when every attempt failed
+        """
+        messages = self._build_messages_with_context(
+            question, contexts, language, conversation_history, system_context
+        )
+        async with stage_slot("llm"):
+            return await self._acomplete_with_fallback(question, messages, deadline)
+
+    async def agenerate_stream(
+        self,
+        question: str,
+        contexts: List[str],
+        language: str = "vi",
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        system_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of generate_stream() (holds an "llm" stage slot until the stream ends)
+
+        The first token must arrive within the deadline; otherwise (or on a
+        provider error before it) the fallback model streams the answer.
+        Streams are not hedged.
+
+        Yields:
+            Text deltas of the answer
+        """
+        messages = self._build_messages_with_context(
+            question, contexts, language, conversation_history, system_context
+        )
+        async with stage_slot("llm"):
+            async for delta in self._astream_with_fallback(question, messages, deadline):
+                yield delta
+
+    # ===== Tail latency control (deadline, hedging, fallback) =====
+
+    def _attempt_clients(self) -> List[ModelClient]:
+        """Primary client, then the fallback model's pooled client (if configured and different)"""
+        config = get_rag_config()
+        clients = [self.client]
+        if config.llm_fallback_model and config.llm_fallback_model != self.client.model_name:
+            from Chatbot.services.ModelClientPool import get_model_client_pool
+            fallback = get_model_client_pool().get_generator(config.llm_fallback_model).client
+            if fallback.is_available:
+                clients.append(fallback)
+        return clients
+
+    async def _acomplete_with_fallback(self, question: str, messages: List[Dict[str, str]], deadline: Optional[Deadline]) -> str:
+        config = get_rag_config()
+        if not self.client.is_available:
+            # Mock/setup message: nothing to hedge or fall back from
+            return await self.client.acomplete(prompt=question, max_tokens=self.max_tokens,
+                                               temperature=config.llm_temperature, messages=messages)
+
+        deadline = deadline or Deadline(config.llm_default_deadline)
+        stats = _tail_stats()
+        stats["requests"].inc()
+        clients = self._attempt_clients()
+        for i, client in enumerate(clients):
+            last = i == len(clients) - 1
+            if i > 0:
+                stats["fallbacks"].inc()
+            call = functools.partial(
+                client.acomplete, prompt=question, max_tokens=self.max_tokens,
+                temperature=config.llm_temperature, messages=messages, raise_errors=True
+            )
+            try:
+                timeout = deadline.budget(reserve=0.0 if last else config.llm_fallback_reserve,
+                                          cap=config.llm_request_timeout)
+                if i == 0 and config.enable_llm_hedging:
+                    return await asyncio.wait_for(self._hedged(call, client, timeout), timeout)
+                return await asyncio.wait_for(call(), timeout)
+            except Exception as e:
+                if isinstance(e, (asyncio.TimeoutError, DeadlineExceeded)):
+                    stats["deadline_exceeded"].inc()
+                logger.warning(f"LLM call to {client.model_name} failed ({type(e).__name__}: {e})"
+                               + ("" if last else f" - falling back to {clients[i + 1].model_name}"))
+                if last:
+                    if isinstance(e, asyncio.TimeoutError) and not isinstance(e, DeadlineExceeded):
+                        raise DeadlineExceeded("LLM deadline exceeded") from e
+                    raise
+
+    async def _hedged(self, call, client: ModelClient, timeout: float) -> str:
+        """
+        Send a duplicate request when the first one is slower than the model's
+        recent p95 (llm_hedge_quantile); the first successful response wins
+        """
+        config = get_rag_config()
+        delay = client.latency_quantile(config.llm_hedge_quantile, min_samples=config.llm_hedge_min_samples)
+        if delay is None or delay < config.llm_hedge_min_delay or delay >= timeout:
+            return await call()
+
+        stats = _tail_stats()
+        first = asyncio.ensure_future(call())
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            stats["hedged"].inc()
+            hedge = asyncio.ensure_future(call())
+            pending.add(hedge)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            stats["hedge_wins"].inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _astream_with_fallback(self, question: str, messages: List[Dict[str, str]], deadline: Optional[Deadline]) -> AsyncIterator[str]:
+        config = get_rag_config()
+        kwargs = {"prompt": question, "max_tokens": self.max_tokens, "temperature": config.llm_temperature, "messages": messages}
+        if not self.client.is_available:
+            async for delta in self.client.astream(**kwargs):
+                yield delta
+            return
+
+        deadline = deadline or Deadline(config.llm_default_deadline)
+        stats = _tail_stats()
+        stats["requests"].inc()
+        clients = self._attempt_clients()
+        for i, client in enumerate(clients):
+            last = i == len(clients) - 1
+            if i > 0:
+                stats["fallbacks"].inc()
+            stream = client.astream(**kwargs, raise_errors=True)
+            try:
+                timeout = deadline.budget(reserve=0.0 if last else config.llm_fallback_reserve,
+                                          cap=config.llm_request_timeout)
+                first = await asyncio.wait_for(stream.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                await stream.aclose()
+                if isinstance(e, (asyncio.TimeoutError, DeadlineExceeded)):
+                    stats["deadline_exceeded"].inc()
+                logger.warning(f"LLM stream from {client.model_name} failed before the first token ({type(e).__name__}: {e})"
+                               + ("" if last else f" - falling back to {clients[i + 1].model_name}"))
+                if last:
+                    if isinstance(e, asyncio.TimeoutError) and not isinstance(e, DeadlineExceeded):
+                        raise DeadlineExceeded("LLM deadline exceeded") from e
+                    raise
+                continue
+
+            # First token arrived: the rest of the answer comes from this model
+            yield first
+            async for delta in stream:
+                yield delta
+            return
+
     def _build_messages_with_context(
         self,
         question: str,
         contexts: List[str],
         language: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
-        system_context: Optional[str] = None,
-        max_history_turns: int = 10
+        system_context: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """
-        Build messages array with system context, conversation history, and current question
-        Following the reference implementation pattern for better conversational AI
+        Build messages array: static system prompt, conversation summary,
+        recent history, then retrieved context + current question
+
+        The static part (persona, domain prompt, instructions) comes first and
+        is identical for every request of a domain, so provider-side prompt
+        prefix caching hits; per-request content (contexts) goes last.
 
         Args:
             question: Current user question
             contexts: Retrieved RAG context chunks
             language: Language for response
-            conversation_history: Previous conversation messages
+            conversation_history: Compacted history (HistoryCompactor): optional
+                                  {"role": "summary"} message, then user/assistant messages
             system_context: Optional additional system context (domain-specific)
-            max_history_turns: Maximum number of conversation turns to include
 
         Returns:
             List of messages in OpenAI chat format
         """
-        messages = []
+        messages = [{"role": "system", "content": self._system_prompt(language, system_context)}]
+
+        # Conversation summary + recent messages (already compacted to the history budget)
+        for msg in conversation_history or []:
+            role = msg.get("role", "user")
+            content = msg.get("content", "")
+            if not content:
+                continue
+            if role == SUMMARY_ROLE:
+                label = "Tóm tắt hội thoại trước đó" if language == "vi" else "Summary of the earlier conversation"
+                messages.append({"role": "system", "content": f"{label}:\n{content}"})
+            elif role in ["user", "assistant"]:
+                messages.append({"role": role, "content": content})
+
+        # Retrieved context + current user question
+        if contexts:
+            header = "=== THÔNG TIN THAM KHẢO ===" if language == "vi" else "=== REFERENCE INFORMATION ==="
+            question_label = "=== CÂU HỎI ===" if language == "vi" else "=== QUESTION ==="
+            sources = "".join(f"[Nguồn {i}]: {ctx}\n\n" for i, ctx in enumerate(contexts, 1))
+            messages.append({"role": "user", "content": f"{header}\n\n{sources}{question_label}\n{question}"})
+        else:
+            messages.append({"role": "user", "content": question})
+
+        return messages
 
-        # Step 1: Build system message with RAG context (optimized, shorter prompt)
+    @staticmethod
+    def _system_prompt(language: str, system_context: Optional[str] = None) -> str:
+        """Static system prompt (no per-request content: cacheable prefix)"""
         # Use custom system_context if provided (for domain-specific prompts)
         if system_context:
             system_content = system_context + "\n\n"
@@ -115,72 +401,26 @@ class GeneratorService:
                 "Use the provided information to answer questions accurately and comprehensively.\n\n"
             )
 
-        # Add RAG retrieved context
-        if contexts:
-            if language == "vi":
-                system_content += "=== THÔNG TIN THAM KHẢO ===\n\n"
-            else:
-                system_content += "=== REFERENCE INFORMATION ===\n\n"
-
-            for i, ctx in enumerate(contexts, 1):
-                system_content += f"[Nguồn {i}]: {ctx}\n\n"
-
-            if language == "vi":
-                system_content += (
-                    "=== HƯỚng DẪN ===\n"
-                    "- Trả lời dựa trên thông tin tham khảo trên\n"
-                    "- Nếu câu hỏi về địa chỉ/liên hệ: liệt kê TẤT CẢ các địa điểm\n"
-                    "- Sử dụng bullet points khi cần thiết\n"
-                    "- Nếu thiếu thông tin: nói rõ và gợi ý cách tìm thêm\n"
-                )
-            else:
-                system_content += (
-                    "=== INSTRUCTIONS ===\n"
-                    "- Answer based on the reference information above\n"
-                    "- Use bullet points when appropriate\n"
-                    "- If information is insufficient, clearly state that\n"
-                )
-
-        messages.append({"role": "system", "content": system_content})
-
-        # Step 2: Add conversation history (last N turns for context window)
-        if conversation_history:
-            # Take only last N messages to avoid token limit
-            recent_history = conversation_history[-max_history_turns:]
-
-            # Add conversation history context marker
-            if language == "vi":
-                history_marker = "=== Lịch sử hội thoại trước đó ==="
-            else:
-                history_marker = "=== Previous conversation ==="
-
-            messages.append({"role": "system", "content": history_marker})
-
-            # Add each message from history
-            for msg in recent_history:
-                role = msg.get("role", "user")
-                content = msg.get("content", "")
-                if content and role in ["user", "assistant"]:
-                    messages.append({"role": role, "content": content})
-
-            # Add instruction to use conversation context
-            if language == "vi":
-                context_instruction = (
-                    "Sử dụng lịch sử hội thoại để hiểu ngữ cảnh và các đại từ tham chiếu "
-                    "(như 'nó', 'đó', 'cái đó', 'địa chỉ trên')."
-                )
-            else:
-                context_instruction = (
-                    "Use the conversation history to understand context and references "
-                    "(like 'it', 'that', 'the previous one')."
-                )
-
-            messages.append({"role": "system", "content": context_instruction})
-
-        # Step 3: Add current user question
-        messages.append({"role": "user", "content": question})
-
-        return messages
+        if language == "vi":
+            system_content += (
+                "=== HƯỚNG DẪN ===\n"
+                "- Trả lời dựa trên phần THÔNG TIN THAM KHẢO đi kèm câu hỏi\n"
+                "- Nếu câu hỏi về địa chỉ/liên hệ: liệt kê TẤT CẢ các địa điểm\n"
+                "- Sử dụng bullet points khi cần thiết\n"
+                "- Nếu thiếu thông tin: nói rõ và gợi ý cách tìm thêm\n"
+                "- Sử dụng lịch sử hội thoại để hiểu ngữ cảnh và các đại từ tham chiếu "
+                "(như 'nó', 'đó', 'cái đó', 'địa chỉ trên')\n"
+            )
+        else:
+            system_content += (
+                "=== INSTRUCTIONS ===\n"
+                "- Answer based on the REFERENCE INFORMATION sent with the question\n"
+                "- Use bullet points when appropriate\n"
+                "- If information is insufficient, clearly state that\n"
+                "- Use the conversation history to understand context and references "
+                "(like 'it', 'that', 'the previous one')\n"
+            )
+        return system_content
 
     def _build_prompt(self, question: str, contexts: List[str], language: str) -> str:
         """
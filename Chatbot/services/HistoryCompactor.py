@@ -0,0 +1,309 @@
+"""
+HistoryCompactor - Nén lịch sử hội thoại trước khi gửi cho LLM
+Trước đây mỗi lượt gửi nguyên văn tối đa 10 message cũ → chat dài tốn hàng
+nghìn prompt token lặp lại. Giờ:
+- history_recent_messages message gần nhất giữ nguyên văn
+- các message cũ hơn được gộp vào một bản tóm tắt (rolling summary) cache
+  theo chat; lượt sau chỉ gộp thêm phần mới, và chỉ khi đã có ít nhất
+  history_summary_batch message chờ gộp (ít lời gọi LLM hơn)
+- tổng (tóm tắt + message gần nhất) nằm trong history_token_budget, tách
+  biệt với token_budget của RAG context
+
+Không có LLM (chưa cấu hình API key, lỗi provider): tóm tắt trích xuất (các
+câu hỏi trước đó của người dùng) thay cho tóm tắt bằng LLM.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+from Chatbot.cache.ConversationSummaryCache import get_summary_cache
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.utils.async_stages import stage_slot
+from Chatbot.utils.deadline import Deadline
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.utils.tokenizers import Tokenizer
+
+logger = logging.getLogger(__name__)
+
+# History sizes in tokens (history_token_budget is at most 8000)
+_TOKEN_BUCKETS = (50, 100, 200, 400, 800, 1200, 1600, 2400, 3200, 4800, 8000)
+
+# Role of the summary message in a compacted history (GeneratorService renders it)
+SUMMARY_ROLE = "summary"
+
+
+class CompactionPlan(NamedTuple):
+    """Which messages stay verbatim (messages[split:]) and which get folded (pending)"""
+    key: str  # Summary cache key
+    messages: List[Dict[str, str]]  # Sanitized history (user/assistant only)
+    split: int  # Messages before this index are covered by the summary
+    summary: Optional[str]  # Cached summary of the messages already folded
+    pending: List[Dict[str, str]]  # Messages to fold into the summary now
+    budget: int
+    tokenizer: Tokenizer
+
+
+class HistoryCompactor:
+    """
+    Compacts conversation history to (rolling summary, recent messages)
+    """
+
+    def __init__(
+        self,
+        summary_cache=None,
+        recent_messages: int = 6,
+        token_budget: int = 1200,
+        summary_max_tokens: int = 300,
+        summary_batch: int = 4,
+        summary_model: Optional[str] = None,
+        summary_timeout: float = 5.0
+    ):
+        """
+        Initialize compactor
+
+        Args:
+            summary_cache: ConversationSummaryCache (default process-wide cache)
+            recent_messages: Messages kept verbatim
+            token_budget: Default history budget (summary + recent messages)
+            summary_max_tokens: Max tokens of the rolling summary
+            summary_batch: Pending older messages needed before folding them
+            summary_model: Model writing the summaries (None = config.llm_model)
+            summary_timeout: Max seconds for a summary call (extractive summary after that)
+        """
+        self.summary_cache = summary_cache or get_summary_cache()
+        self.recent_messages = recent_messages
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_batch = summary_batch
+        self.summary_model = summary_model
+        self.summary_timeout = summary_timeout
+
+        metrics = get_metrics()
+        self._summarized_counter = metrics.counter("rag_history_summaries_total", "Rolling summary updates (LLM calls)")
+        self._fallback_counter = metrics.counter("rag_history_summary_fallbacks_total", "Extractive summaries used because the LLM was unavailable")
+        self._tokens_hist = metrics.histogram(
+            "rag_history_tokens", "Tokens of compacted history sent to the LLM", _TOKEN_BUCKETS
+        )
+
+    def compact(
+        self,
+        history: Optional[List[Dict[str, str]]],
+        tokenizer: Tokenizer,
+        chat_id: Optional[str] = None,
+        language: str = "vi",
+        token_budget: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Compact history (sync: the summary LLM call blocks)
+
+        Args:
+            history: [{"role": "user|assistant", "content": "..."}], oldest first
+            tokenizer: Tokenizer of the answering model (budgets are counted with it)
+            chat_id: Chat identifier for the summary cache (None = derived from the first message)
+            language: Summary language ("vi" or "en")
+            token_budget: History budget (None = config default)
+
+        Returns:
+            Compacted history: optional {"role": "summary"} message, then recent messages
+        """
+        plan = self._plan(history, tokenizer, chat_id, token_budget)
+        summary = plan.summary
+        if plan.pending:
+            messages = self._summary_messages(plan.summary, plan.pending, language)
+            try:
+                text = self._summary_client().complete(
+                    prompt="", max_tokens=self.summary_max_tokens, temperature=0.0,
+                    messages=messages, raise_errors=True
+                )
+                summary = self._store(plan, text)
+            except Exception as e:
+                summary = self._fallback(plan, language, e)
+        return self._finish(plan, summary)
+
+    async def acompact(
+        self,
+        history: Optional[List[Dict[str, str]]],
+        tokenizer: Tokenizer,
+        chat_id: Optional[str] = None,
+        language: str = "vi",
+        token_budget: Optional[int] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Async variant of compact() (summary LLM call within the "llm" stage limit,
+        bounded by summary_timeout and the request deadline)
+
+        Returns:
+            Compacted history: optional {"role": "summary"} message, then recent messages
+        """
+        plan = self._plan(history, tokenizer, chat_id, token_budget)
+        summary = plan.summary
+        if plan.pending:
+            messages = self._summary_messages(plan.summary, plan.pending, language)
+            try:
+                timeout = deadline.budget(cap=self.summary_timeout) if deadline else self.summary_timeout
+                async with stage_slot("llm"):
+                    text = await asyncio.wait_for(self._summary_client().acomplete(
+                        prompt="", max_tokens=self.summary_max_tokens, temperature=0.0,
+                        messages=messages, raise_errors=True
+                    ), timeout)
+                summary = self._store(plan, text)
+            except Exception as e:
+                summary = self._fallback(plan, language, e)
+        return self._finish(plan, summary)
+
+    # ===== Planning =====
+
+    def _plan(self, history, tokenizer: Tokenizer, chat_id: Optional[str], token_budget: Optional[int]) -> "CompactionPlan":
+        """Decide which messages stay verbatim and which (new) ones get folded"""
+        messages = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in (history or [])
+            if msg.get("content") and msg.get("role") in ("user", "assistant")
+        ]
+        budget = token_budget or self.token_budget
+        key = chat_id or (self._digest(messages[:1]) if messages else "")
+
+        counts = tokenizer.count_batch([msg["content"] for msg in messages])
+        if len(messages) <= self.recent_messages and sum(counts) <= budget:
+            return CompactionPlan(key, messages, 0, None, [], budget, tokenizer)
+
+        # Recent window: newest messages that fit next to a full-size summary
+        recent_budget = max(budget - self.summary_max_tokens, 0)
+        split = len(messages)
+        used = 0
+        while split > 0 and len(messages) - split < self.recent_messages and used + counts[split - 1] <= recent_budget:
+            split -= 1
+            used += counts[split]
+
+        # Reuse the cached summary when it still matches the start of this chat
+        entry = self.summary_cache.get(key) if key else None
+        covered, summary = 0, None
+        if entry and entry.get("covered", 0) <= len(messages) \
+                and entry.get("digest") == self._digest(messages[:entry["covered"]]):
+            covered, summary = entry["covered"], entry["summary"]
+
+        # Few messages pending: keep them verbatim for now if they fit (no LLM call this turn)
+        if covered >= split or (split - covered < self.summary_batch and sum(counts[covered:]) <= recent_budget):
+            return CompactionPlan(key, messages, covered, summary, [], budget, tokenizer)
+        return CompactionPlan(key, messages, split, summary, messages[covered:split], budget, tokenizer)
+
+    def _finish(self, plan: "CompactionPlan", summary: Optional[str]) -> List[Dict[str, str]]:
+        """Summary message + recent messages, cut to the history budget (oldest recent messages go first)"""
+        tokenizer = plan.tokenizer
+        result = []
+        remaining = plan.budget
+        if summary:
+            result.append({"role": SUMMARY_ROLE, "content": summary})
+            remaining -= tokenizer.count(summary)
+
+        recent = []
+        for msg in reversed(plan.messages[plan.split:]):
+            tokens = tokenizer.count(msg["content"])
+            if tokens > remaining:
+                if not recent and remaining > 0:
+                    # The latest message alone exceeds the budget: keep its beginning
+                    recent.append({"role": msg["role"], "content": tokenizer.truncate(msg["content"], remaining)})
+                break
+            recent.append(msg)
+            remaining -= tokens
+        result.extend(reversed(recent))
+
+        self._tokens_hist.observe(plan.budget - remaining)
+        return result
+
+    # ===== Summaries =====
+
+    def _fallback(self, plan: "CompactionPlan", language: str, error: Exception) -> str:
+        logger.warning(f"History summary failed ({error}) - using extractive summary")
+        return self._store(plan, self._extractive_summary(plan.summary, plan.pending, language), fallback=True)
+
+    def _store(self, plan: "CompactionPlan", summary: str, fallback: bool = False) -> str:
+        summary = plan.tokenizer.truncate((summary or "").strip(), self.summary_max_tokens)
+        if fallback:
+            self._fallback_counter.inc()
+        else:
+            self._summarized_counter.inc()
+        if plan.key:
+            self.summary_cache.put(plan.key, {
+                "covered": plan.split,
+                "digest": self._digest(plan.messages[:plan.split]),
+                "summary": summary,
+            })
+        return summary
+
+    def _summary_client(self):
+        from Chatbot.services.ModelClientPool import get_model_client_pool
+        return get_model_client_pool().get_generator(self.summary_model).client
+
+    def _summary_messages(self, previous: Optional[str], pending: List[Dict[str, str]], language: str) -> List[Dict[str, str]]:
+        """Prompt folding new messages into the previous summary"""
+        if language == "vi":
+            instruction = (
+                "Tóm tắt ngắn gọn cuộc hội thoại giữa người dùng và trợ lý tư vấn của PTIT. "
+                "Giữ lại các đối tượng người dùng đang hỏi (ngành, cơ sở, năm học, mức học phí, điểm chuẩn, ...) "
+                "và các thông tin đã trả lời, để hiểu được các câu hỏi tiếp theo dùng đại từ tham chiếu. "
+                f"Tối đa khoảng {self.summary_max_tokens // 2} từ, chỉ trả về bản tóm tắt."
+            )
+            labels = {"user": "Người dùng", "assistant": "Trợ lý"}
+            previous_label, new_label = "Tóm tắt trước đó", "Các lượt hội thoại mới"
+        else:
+            instruction = (
+                "Briefly summarize the conversation between the user and the PTIT assistant. "
+                "Keep what the user is asking about (programs, campuses, years, fees, scores, ...) "
+                "and the facts already answered, so follow-up questions with references can be understood. "
+                f"At most about {self.summary_max_tokens // 2} words, return only the summary."
+            )
+            labels = {"user": "User", "assistant": "Assistant"}
+            previous_label, new_label = "Previous summary", "New turns"
+
+        content = ""
+        if previous:
+            content += f"{previous_label}:\n{previous}\n\n"
+        content += f"{new_label}:\n" + "\n".join(f"{labels[msg['role']]}: {msg['content']}" for msg in pending)
+        return [{"role": "system", "content": instruction}, {"role": "user", "content": content}]
+
+    @staticmethod
+    def _extractive_summary(previous: Optional[str], pending: List[Dict[str, str]], language: str) -> str:
+        """LLM-free summary: the user's earlier questions (caller truncates to the budget, newest kept)"""
+        label = "Người dùng đã hỏi" if language == "vi" else "The user asked"
+        lines = [f"- {label}: {msg['content'].strip()}" for msg in pending if msg["role"] == "user"]
+        parts = ([previous] if previous else []) + lines
+        # Newest first so truncation drops the oldest questions
+        return "\n".join(reversed(parts))
+
+    @staticmethod
+    def _digest(messages: List[Dict[str, str]]) -> str:
+        payload = json.dumps([[msg["role"], msg["content"]] for msg in messages], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+# Process-wide singleton
+_compactor: Optional[HistoryCompactor] = None
+_compactor_lock = threading.Lock()
+
+
+def get_history_compactor() -> HistoryCompactor:
+    """
+    Get the process-wide history compactor (configured from RAGConfig)
+
+    Returns:
+        HistoryCompactor instance
+    """
+    global _compactor
+    if _compactor is None:
+        with _compactor_lock:
+            if _compactor is None:
+                config = get_rag_config()
+                _compactor = HistoryCompactor(
+                    recent_messages=config.history_recent_messages,
+                    token_budget=config.history_token_budget,
+                    summary_max_tokens=config.history_summary_max_tokens,
+                    summary_batch=config.history_summary_batch,
+                    summary_model=config.history_summary_model,
+                    summary_timeout=config.history_summary_timeout
+                )
+    return _compactor
@@ -0,0 +1,408 @@
+"""
+LexicalIndexService - In-memory BM25 index over the chunks table
+Bắt các câu hỏi phụ thuộc token chính xác (mã ngành, số tiền, số quyết định,
+tên tòa nhà) mà dense search hay bỏ sót.
+
+- Token: âm tiết tiếng Việt bỏ dấu (Chatbot/utils/vn_tokenizer.py)
+- Postings: mỗi term là 2 array compact (slot int32, tf uint16), score bằng numpy
+- Cập nhật incremental khi ingest / delete; xóa là tombstone, compact định kỳ
+
+Index nằm trong RAM của từng process: được build từ DB khi khởi động
+(bootstrap) và cập nhật theo ingest/delete của chính process đó. Ingest/delete
+ở worker khác được nhận ra qua corpus generation (CorpusGenerationTracker):
+namespace có generation thay đổi được đọc lại từ DB trước lần search kế tiếp.
+"""
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import threading
+import time
+
+import numpy as np
+
+from Chatbot.cache.CorpusGenerationTracker import get_corpus_generation
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.dao.CorpusGenerationDAO import GLOBAL_NAMESPACE
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.utils.vn_tokenizer import tokenize_vi
+
+logger = logging.getLogger(__name__)
+
+_MAX_TF = 65535  # tf stored as uint16
+
+
+class LexicalIndex:
+    """
+    BM25 (Okapi) inverted index with array-backed postings
+
+    Each chunk gets an integer slot. Per term the index keeps two parallel
+    arrays (slots, term frequencies); per slot it keeps the document length,
+    namespace id and an alive flag. Deleted slots are tombstoned and
+    reclaimed by compaction once they make up a quarter of the index.
+    """
+
+    def __init__(self, k1: Optional[float] = None, b: Optional[float] = None, generations=None):
+        """
+        Initialize an empty index
+
+        Args:
+            k1: BM25 term frequency saturation (optional, uses config if None)
+            b: BM25 length normalization (optional, uses config if None)
+            generations: Optional CorpusGenerationTracker (None = this process's changes only)
+        """
+        config = get_rag_config()
+        self.k1 = k1 if k1 is not None else config.bm25_k1
+        self.b = b if b is not None else config.bm25_b
+        self.generations = generations
+        self._seen: Dict[str, int] = {}  # Corpus generations the index reflects
+
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._chunk_ids: List[Optional[str]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._doc_len = array("I")
+        self._ns_of = array("i")
+        self._alive = bytearray()
+        self._namespaces: List[str] = []
+        self._ns_lookup: Dict[str, int] = {}
+        self._live_count = 0
+        self._total_len = 0
+        self._dead_count = 0
+
+        self.ready = False  # True once the initial build from DB finished
+        self._build_lock = threading.Lock()
+
+    # ===== Write path =====
+
+    def add(self, chunk_id: str, text: str, namespace: Optional[str] = None):
+        """Index one chunk (re-adding an existing chunk_id replaces it)"""
+        self.add_many([(chunk_id, text)], namespace)
+
+    def add_many(self, items: Iterable[Tuple[str, str]], namespace: Optional[str] = None):
+        """
+        Index chunks of one namespace
+
+        Args:
+            items: (chunk_id, text) pairs
+            namespace: Namespace of these chunks (None = default namespace)
+        """
+        namespace = namespace or get_rag_config().default_namespace
+        # Tokenize outside the lock
+        prepared = [(chunk_id, Counter(tokenize_vi(text))) for chunk_id, text in items]
+
+        with self._lock:
+            ns_id = self._ns_lookup.get(namespace)
+            if ns_id is None:
+                ns_id = self._ns_lookup[namespace] = len(self._namespaces)
+                self._namespaces.append(namespace)
+
+            for chunk_id, term_freqs in prepared:
+                if chunk_id in self._slot_of:
+                    self._remove_locked(chunk_id)
+
+                slot = len(self._chunk_ids)
+                length = sum(term_freqs.values())
+                self._chunk_ids.append(chunk_id)
+                self._slot_of[chunk_id] = slot
+                self._doc_len.append(length)
+                self._ns_of.append(ns_id)
+                self._alive.append(1)
+                self._live_count += 1
+                self._total_len += length
+
+                for term, tf in term_freqs.items():
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        posting = self._postings[term] = (array("i"), array("H"))
+                    posting[0].append(slot)
+                    posting[1].append(min(tf, _MAX_TF))
+
+    def remove(self, chunk_ids: Iterable[str]) -> int:
+        """
+        Remove chunks from the index
+
+        Args:
+            chunk_ids: Chunk IDs to remove (unknown IDs are ignored)
+
+        Returns:
+            Number of chunks removed
+        """
+        removed = 0
+        with self._lock:
+            for chunk_id in chunk_ids:
+                if self._remove_locked(chunk_id):
+                    removed += 1
+            if self._dead_count > 1024 and self._dead_count * 4 > len(self._chunk_ids):
+                self._compact_locked()
+        return removed
+
+    def _remove_locked(self, chunk_id: str) -> bool:
+        slot = self._slot_of.pop(chunk_id, None)
+        if slot is None:
+            return False
+        self._alive[slot] = 0
+        self._chunk_ids[slot] = None
+        self._live_count -= 1
+        self._total_len -= self._doc_len[slot]
+        self._dead_count += 1
+        return True
+
+    def _compact_locked(self):
+        """Drop tombstoned slots and renumber postings"""
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        new_slot = np.cumsum(alive, dtype=np.int64) - 1
+
+        postings = {}
+        for term, (slots, tfs) in self._postings.items():
+            slot_arr = np.frombuffer(slots, dtype=np.int32)
+            keep = alive[slot_arr]
+            if keep.any():
+                postings[term] = (
+                    array("i", new_slot[slot_arr[keep]].astype(np.int32).tobytes()),
+                    array("H", np.frombuffer(tfs, dtype=np.uint16)[keep].tobytes()),
+                )
+            del slot_arr
+        self._postings = postings
+
+        keep_idx = np.flatnonzero(alive)
+        self._chunk_ids = [self._chunk_ids[i] for i in keep_idx]
+        self._slot_of = {chunk_id: i for i, chunk_id in enumerate(self._chunk_ids)}
+        self._doc_len = array("I", np.frombuffer(self._doc_len, dtype=np.uint32)[keep_idx].tobytes())
+        self._ns_of = array("i", np.frombuffer(self._ns_of, dtype=np.int32)[keep_idx].tobytes())
+        self._alive = bytearray(b"\x01" * len(keep_idx))
+        self._dead_count = 0
+
+    # ===== Read path =====
+
+    def search(self, query: str, top_k: int = 10, namespace: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        BM25 search
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            namespace: Restrict to one namespace (None = all namespaces)
+
+        Returns:
+            List of (chunk_id, bm25_score) tuples, sorted by score descending
+        """
+        start = time.perf_counter()
+        self.sync_generation()
+        terms = list(dict.fromkeys(tokenize_vi(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            scores = self._score_locked(terms, namespace)
+            if scores is None:
+                return []
+            matched = np.flatnonzero(scores > 0)
+            if len(matched) > top_k:
+                matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+            matched = matched[np.argsort(-scores[matched], kind="stable")]
+            results = [(self._chunk_ids[i], float(scores[i])) for i in matched]
+
+        get_metrics().histogram("rag_lexical_search_seconds", "BM25 search latency").observe(
+            time.perf_counter() - start
+        )
+        return results
+
+    def _score_locked(self, terms: List[str], namespace: Optional[str]) -> Optional[np.ndarray]:
+        """Accumulate BM25 scores for all slots (numpy views must not outlive the lock)"""
+        if self._live_count == 0:
+            return None
+
+        ns_id = None
+        if namespace is not None:
+            ns_id = self._ns_lookup.get(namespace)
+            if ns_id is None:
+                return None
+
+        n_docs = self._live_count
+        avgdl = self._total_len / n_docs if n_docs else 1.0
+        doc_len = np.frombuffer(self._doc_len, dtype=np.uint32).astype(np.float32)
+        norm = self.k1 * (1.0 - self.b + self.b * doc_len / max(avgdl, 1e-9))
+        scores = np.zeros(len(self._chunk_ids), dtype=np.float32)
+
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            slots = np.frombuffer(posting[0], dtype=np.int32)
+            tfs = np.frombuffer(posting[1], dtype=np.uint16).astype(np.float32)
+            # df counts tombstoned slots too until compaction; close enough for idf
+            df = min(len(slots), n_docs)
+            idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            scores[slots] += idf * tfs * (self.k1 + 1.0) / (tfs + norm[slots])
+            del slots
+
+        alive = np.frombuffer(self._alive, dtype=np.uint8)
+        mask = alive == 0
+        if ns_id is not None:
+            mask |= np.frombuffer(self._ns_of, dtype=np.int32) != ns_id
+        scores[mask] = 0.0
+        del alive
+        return scores
+
+    # ===== Build / stats =====
+
+    def build_from_db(self, batch_size: int = 1024) -> int:
+        """
+        (Re)build the index from the chunks table
+        Chunks ingested while the build runs are kept (add replaces by chunk_id).
+
+        Args:
+            batch_size: Rows fetched per query
+
+        Returns:
+            Number of chunks indexed
+        """
+        from BE.db.session import SessionLocal
+        from Chatbot.dao.ChunkDAO import ChunkDAO
+
+        with self._build_lock:
+            start = time.perf_counter()
+            # Snapshot before reading: changes committed during the build are re-synced
+            seen = self.generations.get_all() if self.generations is not None else {}
+            total = 0
+            db = SessionLocal()
+            try:
+                for batch in ChunkDAO(db).iter_batches(batch_size):
+                    by_namespace: Dict[Optional[str], List[Tuple[str, str]]] = {}
+                    for chunk_id, text, source_uri in batch:
+                        by_namespace.setdefault(source_uri, []).append((chunk_id, text))
+                    for namespace, items in by_namespace.items():
+                        self.add_many(items, namespace)
+                    total += len(batch)
+            finally:
+                db.close()
+
+            with self._lock:
+                self._seen = seen
+            self.ready = True
+            logger.info(
+                f"✓ Lexical index built: {total} chunks, {len(self._postings)} terms "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+            return total
+
+    # ===== Cross-worker sync =====
+
+    def sync_generation(self):
+        """
+        Catch up with ingest/delete done by other workers
+
+        Namespaces whose corpus generation moved since the index last saw it
+        are re-read from the DB. One thread refreshes; concurrent searches keep
+        using the current index meanwhile.
+        """
+        if self.generations is None or not self.ready:
+            return
+        if self.generations.get() == self._seen.get(GLOBAL_NAMESPACE, 0):
+            return
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            # Read before the DB: a bump committed during the refresh is caught next time
+            current = self.generations.get_all()
+            for namespace, generation in current.items():
+                if namespace != GLOBAL_NAMESPACE and generation != self._seen.get(namespace, 0):
+                    self.refresh_namespace(namespace)
+            with self._lock:
+                self._seen = current
+        except Exception as e:
+            logger.warning(f"Lexical index refresh failed, serving the current index: {e}")
+        finally:
+            self._build_lock.release()
+
+    def note_bump(self, generations: Dict[str, int]):
+        """
+        Record the generations of a change this process already applied
+
+        A generation that moved by more than one also covers a change from
+        another worker and is left for sync_generation().
+
+        Args:
+            generations: Dict namespace → new generation, as returned by bump()
+        """
+        with self._lock:
+            for namespace, generation in generations.items():
+                if generation == self._seen.get(namespace, 0) + 1:
+                    self._seen[namespace] = generation
+
+    def refresh_namespace(self, namespace: str, batch_size: int = 1024) -> Tuple[int, int]:
+        """
+        Reconcile one namespace with the chunks table (by chunk id)
+
+        Args:
+            namespace: Namespace to refresh
+            batch_size: Rows fetched per query
+
+        Returns:
+            (chunks added, chunks removed)
+        """
+        from BE.db.session import SessionLocal
+        from Chatbot.dao.ChunkDAO import ChunkDAO
+
+        start = time.perf_counter()
+        with self._lock:
+            ns_id = self._ns_lookup.get(namespace)
+            # Only chunks indexed before the DB read may be removed: a concurrent
+            # ingest in this process adds chunks the read might not see yet
+            indexed = {
+                chunk_id for chunk_id, slot in self._slot_of.items() if self._ns_of[slot] == ns_id
+            } if ns_id is not None else set()
+
+        in_db = set()
+        added = 0
+        db = SessionLocal()
+        try:
+            for batch in ChunkDAO(db).iter_batches(batch_size, namespace=namespace):
+                in_db.update(chunk_id for chunk_id, _, _ in batch)
+                with self._lock:
+                    new_items = [(chunk_id, text) for chunk_id, text, _ in batch if chunk_id not in self._slot_of]
+                if new_items:
+                    self.add_many(new_items, namespace)
+                    added += len(new_items)
+        finally:
+            db.close()
+
+        removed = self.remove(indexed - in_db)
+        logger.info(
+            f"Lexical index refreshed namespace {namespace}: +{added} / -{removed} chunks "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        return added, removed
+
+    def get_stats(self) -> dict:
+        """Index size statistics"""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "generation": self._seen.get(GLOBAL_NAMESPACE, 0),
+                "chunks": self._live_count,
+                "terms": len(self._postings),
+                "tombstones": self._dead_count,
+                "avg_chunk_tokens": round(self._total_len / self._live_count, 1) if self._live_count else 0,
+            }
+
+
+# Process-wide singleton
+_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """
+    Get the process-wide lexical index (empty until build_from_db runs)
+
+    Returns:
+        LexicalIndex instance
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LexicalIndex(generations=get_corpus_generation())
+    return _index
@@ -3,8 +3,46 @@ ModelClient - Client for LLM inference
 Supports multiple backends: OpenAI, Claude, Local models
 Enhanced with conversation history support
 """
-from typing import Optional, Dict, List
+from typing import AsyncIterator, Optional, Dict, Iterator, List, Tuple
+import asyncio
 import os
+import re
+import threading
+import time
+import weakref
+from collections import deque
+
+# Shared async HTTP pool (keep-alive connections to the LLM providers), one per event loop
+_async_http_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client():
+    """
+    httpx.AsyncClient shared by every async LLM client of the running event loop
+
+    Returns:
+        httpx.AsyncClient with the pool limits from RAGConfig
+    """
+    import httpx
+    from Chatbot.config.rag_config import get_rag_config
+
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        config = get_rag_config()
+        client = httpx.AsyncClient(limits=_http_limits(config), timeout=httpx.Timeout(config.llm_request_timeout, connect=10.0))
+        _async_http_clients[loop] = client
+    return client
+
+
+def _http_limits(config):
+    """Connection pool limits; idle keep-alive connections live llm_http_keepalive_expiry seconds"""
+    import httpx
+    return httpx.Limits(
+        max_connections=config.llm_http_max_connections,
+        max_keepalive_connections=config.llm_http_max_keepalive,
+        keepalive_expiry=config.llm_http_keepalive_expiry
+    )
 
 
 class ModelClient:
@@ -29,8 +67,19 @@ class ModelClient:
         """
         self.model_name = model_name
         self.backend = backend
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY")
+        if backend == "anthropic":
+            self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        else:
+            self.api_key = api_key or os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY")
+        from Chatbot.config.rag_config import get_rag_config
+        self.base_url = get_rag_config().llm_base_url if backend == "openai" else None  # None = api.openai.com
         self.client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # Event loop → AsyncOpenAI/AsyncAnthropic
+        self._usage = {"requests": 0, "stream_requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._created_at = time.time()
+        self.last_used = self._created_at
+        self._usage_lock = threading.Lock()
+        self._latencies = deque(maxlen=256)  # Recent successful acomplete() latencies (hedge delay)
         self._initialize_client()
 
     def _initialize_client(self):
@@ -38,11 +87,11 @@ class ModelClient:
         try:
             if self.backend == "openai":
                 from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
+                self.client = OpenAI(api_key=self.api_key, base_url=self.base_url, http_client=self._sync_http_client())
                 print(f"Initialized OpenAI client with model: {self.model_name}")
             elif self.backend == "anthropic":
                 from anthropic import Anthropic
-                self.client = Anthropic(api_key=self.api_key)
+                self.client = Anthropic(api_key=self.api_key, http_client=self._sync_http_client())
                 print(f"Initialized Anthropic client with model: {self.model_name}")
             elif self.backend == "local":
                 # Placeholder for local model (e.g., using transformers)
@@ -58,12 +107,80 @@ class ModelClient:
             print(f"Error initializing LLM client: {e}")
             self.client = None
 
+    @staticmethod
+    def _sync_http_client():
+        """httpx.Client whose keep-alive connections outlive the httpx default (5s)"""
+        import httpx
+        from Chatbot.config.rag_config import get_rag_config
+        config = get_rag_config()
+        return httpx.Client(limits=_http_limits(config), timeout=httpx.Timeout(config.llm_request_timeout, connect=10.0))
+
+    def close(self):
+        """Close the sync HTTP pool (shutdown)"""
+        if self.client is not None and hasattr(self.client, "close"):
+            try:
+                self.client.close()
+            except Exception as e:
+                print(f"Error closing LLM client: {e}")
+
+    @property
+    def is_available(self) -> bool:
+        """True when completions come from a real provider (not the mock/setup message)"""
+        return self.client is not None and self.backend != "local"
+
+    def get_usage(self) -> Dict:
+        """
+        Usage counters of this client (requests, errors, tokens reported by the provider)
+
+        Returns:
+            Dict with counters, created_at and last_used (epoch seconds)
+        """
+        with self._usage_lock:
+            return {
+                **self._usage,
+                "created_at": round(self._created_at, 3),
+                "last_used": round(self.last_used, 3),
+            }
+
+    def latency_quantile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """
+        Quantile of the recent completion latencies of this model
+
+        Args:
+            q: Quantile (0-1), e.g. 0.95
+            min_samples: Samples required before an estimate is returned
+
+        Returns:
+            Seconds, or None while there are fewer than min_samples
+        """
+        with self._usage_lock:
+            samples = sorted(self._latencies)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+    def _record_usage(self, response=None, stream: bool = False, error: bool = False, latency: Optional[float] = None):
+        """Count one request (token usage from the provider response when present)"""
+        usage = getattr(response, "usage", None)
+        with self._usage_lock:
+            self.last_used = time.time()
+            if latency is not None:
+                self._latencies.append(latency)
+            if error:
+                self._usage["errors"] += 1
+                return
+            self._usage["stream_requests" if stream else "requests"] += 1
+            if usage is not None:
+                self._usage["prompt_tokens"] += getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", 0) or 0
+                self._usage["completion_tokens"] += getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", 0) or 0
+
     def complete(
         self,
         prompt: str,
         max_tokens: int = 512,
         temperature: float = 0.7,
-        messages: Optional[List[Dict[str, str]]] = None
+        messages: Optional[List[Dict[str, str]]] = None,
+        raise_errors: bool = False
     ) -> str:
         """
         Generate completion from prompt with optional conversation history
@@ -75,11 +192,15 @@ class ModelClient:
             messages: Optional conversation history in format:
                      [{"role": "system|user|assistant", "content": "..."}]
                      If provided, ignores single prompt parameter
+            raise_errors: Raise instead of returning the mock/setup message
+                          (callers with their own fallback)
 
         Returns:
             Generated text completion
         """
-        if self.client is None:
+        if not self.is_available:
+            if raise_errors:
+                raise RuntimeError(f"LLM backend unavailable: {self.backend}/{self.model_name}")
             return self._mock_completion(prompt)
 
         try:
@@ -95,18 +216,12 @@ class ModelClient:
                     max_tokens=max_tokens,
                     temperature=temperature
                 )
+                self._record_usage(response)
                 return response.choices[0].message.content
 
             elif self.backend == "anthropic":
                 # Anthropic requires separating system message
-                system_msg = None
-                conversation_msgs = []
-
-                for msg in messages:
-                    if msg["role"] == "system":
-                        system_msg = msg["content"]
-                    else:
-                        conversation_msgs.append(msg)
+                system_msg, conversation_msgs = self._split_system(messages)
 
                 kwargs = {
                     "model": self.model_name,
@@ -118,6 +233,7 @@ class ModelClient:
                     kwargs["system"] = system_msg
 
                 response = self.client.messages.create(**kwargs)
+                self._record_usage(response)
                 return response.content[0].text
 
             elif self.backend == "local":
@@ -126,8 +242,246 @@ class ModelClient:
 
         except Exception as e:
             print(f"Error generating completion: {e}")
+            self._record_usage(error=True)
+            if raise_errors:
+                raise
+            return self._mock_completion(prompt)
+
+    def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        messages: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[str]:
+        """
+        Stream a completion as text deltas (same arguments as complete)
+
+        Args:
+            prompt: Current user prompt/question
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (0-1)
+            messages: Optional conversation history (OpenAI chat format)
+
+        Yields:
+            Text deltas in generation order
+        """
+        if self.client is None or self.backend == "local":
+            yield from self._split_deltas(self._mock_completion(prompt))
+            return
+
+        if messages is None:
+            messages = [{"role": "user", "content": prompt}]
+
+        emitted = False
+        self._record_usage(stream=True)
+        try:
+            if self.backend == "openai":
+                response = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                )
+                for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        emitted = True
+                        yield delta
+
+            elif self.backend == "anthropic":
+                system_msg, conversation_msgs = self._split_system(messages)
+                kwargs = {
+                    "model": self.model_name,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                    "messages": conversation_msgs
+                }
+                if system_msg:
+                    kwargs["system"] = system_msg
+
+                with self.client.messages.stream(**kwargs) as response:
+                    for delta in response.text_stream:
+                        if delta:
+                            emitted = True
+                            yield delta
+
+        except Exception as e:
+            print(f"Error streaming completion: {e}")
+            self._record_usage(error=True)
+            if not emitted:
+                # Nothing reached the caller yet: same fallback as complete()
+                yield from self._split_deltas(self._mock_completion(prompt))
+
+    def _get_async_client(self):
+        """AsyncOpenAI / AsyncAnthropic on the shared HTTP pool (created per event loop)"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            if self.backend == "openai":
+                from openai import AsyncOpenAI
+                client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=get_async_http_client())
+            else:
+                from anthropic import AsyncAnthropic
+                client = AsyncAnthropic(api_key=self.api_key, http_client=get_async_http_client())
+            self._async_clients[loop] = client
+        return client
+
+    async def acomplete(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        messages: Optional[List[Dict[str, str]]] = None,
+        raise_errors: bool = False
+    ) -> str:
+        """
+        Async variant of complete() (does not block the event loop)
+
+        Args:
+            prompt: Current user prompt/question
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (0-1)
+            messages: Optional conversation history (OpenAI chat format)
+            raise_errors: Raise instead of returning the mock/setup message
+
+        Returns:
+            Generated text completion
+        """
+        if not self.is_available:
+            if raise_errors:
+                raise RuntimeError(f"LLM backend unavailable: {self.backend}/{self.model_name}")
+            return self._mock_completion(prompt)
+
+        if messages is None:
+            messages = [{"role": "user", "content": prompt}]
+
+        start = time.perf_counter()
+        try:
+            client = self._get_async_client()
+            if self.backend == "openai":
+                response = await client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                self._record_usage(response, latency=time.perf_counter() - start)
+                return response.choices[0].message.content
+
+            system_msg, conversation_msgs = self._split_system(messages)
+            kwargs = {
+                "model": self.model_name,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "messages": conversation_msgs
+            }
+            if system_msg:
+                kwargs["system"] = system_msg
+            response = await client.messages.create(**kwargs)
+            self._record_usage(response, latency=time.perf_counter() - start)
+            return response.content[0].text
+
+        except Exception as e:
+            print(f"Error generating completion: {e}")
+            self._record_usage(error=True)
+            if raise_errors:
+                raise
             return self._mock_completion(prompt)
 
+    async def astream(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        messages: Optional[List[Dict[str, str]]] = None,
+        raise_errors: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of stream()
+
+        Args:
+            raise_errors: Raise on provider errors (before or during the stream)
+                          instead of yielding the mock/setup message
+
+        Yields:
+            Text deltas in generation order
+        """
+        if not self.is_available:
+            if raise_errors:
+                raise RuntimeError(f"LLM backend unavailable: {self.backend}/{self.model_name}")
+            for delta in self._split_deltas(self._mock_completion(prompt)):
+                yield delta
+            return
+
+        if messages is None:
+            messages = [{"role": "user", "content": prompt}]
+
+        emitted = False
+        self._record_usage(stream=True)
+        try:
+            client = self._get_async_client()
+            if self.backend == "openai":
+                response = await client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                )
+                async for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        emitted = True
+                        yield delta
+            else:
+                system_msg, conversation_msgs = self._split_system(messages)
+                kwargs = {
+                    "model": self.model_name,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                    "messages": conversation_msgs
+                }
+                if system_msg:
+                    kwargs["system"] = system_msg
+                async with client.messages.stream(**kwargs) as response:
+                    async for delta in response.text_stream:
+                        if delta:
+                            emitted = True
+                            yield delta
+
+        except Exception as e:
+            print(f"Error streaming completion: {e}")
+            self._record_usage(error=True)
+            if raise_errors:
+                raise
+            if not emitted:
+                for delta in self._split_deltas(self._mock_completion(prompt)):
+                    yield delta
+
+    @staticmethod
+    def _split_system(messages: List[Dict[str, str]]) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """Anthropic takes the system prompt separately: system messages are joined in order"""
+        system_parts = []
+        conversation_msgs = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system_parts.append(msg["content"])
+            else:
+                conversation_msgs.append(msg)
+        return "\n\n".join(system_parts) or None, conversation_msgs
+
+    @staticmethod
+    def _split_deltas(text: str) -> Iterator[str]:
+        """Word-sized deltas for non-streaming backends (mock/local)"""
+        for match in re.finditer(r"\S+\s*|\s+", text):
+            yield match.group(0)
+
     def _safe_print(self, text: str):
         """Print with encoding error handling for Windows console"""
         try:
@@ -194,16 +548,21 @@ class ModelClient:
 
     def count_tokens(self, text: str) -> int:
         """
-        Count tokens in text (approximate)
+        Count tokens in text with the model family's tokenizer
 
         Args:
             text: Input text
 
         Returns:
-            Estimated token count
+            Token count
         """
-        # Simple approximation: 1 token ≈ 4 characters
-        return len(text) // 4
+        return self.tokenizer.count(text)
+
+    @property
+    def tokenizer(self):
+        """Tokenizer of this model (utils.tokenizers, local stand-in when offline)"""
+        from Chatbot.utils.tokenizers import get_tokenizer_for_model
+        return get_tokenizer_for_model(self.model_name)
 
     def get_context_window(self) -> int:
         """
@@ -0,0 +1,151 @@
+"""
+ModelClientPool - Warm LLM clients dùng lại theo (backend, model)
+Trước đây mỗi request chọn model khác model mặc định (gpt-4 trên UI) tạo mới
+GeneratorService + ModelClient (OpenAI client mới, connection pool mới, TLS
+handshake mới). Pool giữ một GeneratorService cho mỗi (backend, model):
+HTTP keep-alive connections được dùng lại, usage theo từng model, client
+không dùng quá llm_client_idle_seconds bị evict (trừ model mặc định).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.utils.metrics import get_metrics
+
+from .GeneratorService import GeneratorService
+from .ModelClient import ModelClient
+from .ModelProviderService import ModelProviderService
+
+
+class ModelClientPool:
+    """
+    Bounded LRU of GeneratorServices keyed by (backend, model)
+
+    The default model (config.llm_model / llm_backend) is pinned; other
+    entries are evicted when idle for idle_seconds or beyond max_clients.
+    """
+
+    def __init__(self, max_clients: int = 8, idle_seconds: float = 900):
+        """
+        Initialize pool
+
+        Args:
+            max_clients: Max pooled clients (including the default one)
+            idle_seconds: Evict clients unused for this long
+        """
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self._generators: "OrderedDict[Tuple[str, str], GeneratorService]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        metrics = get_metrics()
+        self._created_counter = metrics.counter("rag_llm_clients_created_total", "LLM clients created (pool misses)")
+        self._evicted_counter = metrics.counter("rag_llm_clients_evicted_total", "LLM clients evicted (idle or LRU)")
+        self._size_gauge = metrics.gauge("rag_llm_clients", "LLM clients held by the pool")
+
+    def get_generator(self, model_name: Optional[str] = None, backend: Optional[str] = None) -> GeneratorService:
+        """
+        Pooled GeneratorService for a model (created on first use)
+
+        Args:
+            model_name: Model identifier (None = config default)
+            backend: LLM backend (None = config default for the default model,
+                     inferred from the model name otherwise)
+
+        Returns:
+            GeneratorService sharing the pooled ModelClient
+        """
+        key = self._key(model_name, backend)
+        with self._lock:
+            self._evict_idle_locked()
+            generator = self._generators.get(key)
+            if generator is None:
+                generator = GeneratorService(client=ModelClient(model_name=key[1], backend=key[0]))
+                self._generators[key] = generator
+                self._created_counter.inc()
+                self._evict_lru_locked()
+            else:
+                self._generators.move_to_end(key)
+            generator.client.last_used = time.time()
+            self._size_gauge.set(len(self._generators))
+            return generator
+
+    def get_stats(self) -> Dict:
+        """Pooled clients with per-model usage"""
+        with self._lock:
+            return {
+                "size": len(self._generators),
+                "max_clients": self.max_clients,
+                "idle_seconds": self.idle_seconds,
+                "clients": {
+                    f"{backend}:{model}": generator.client.get_usage()
+                    for (backend, model), generator in self._generators.items()
+                },
+            }
+
+    def close(self):
+        """Close every pooled client (shutdown)"""
+        with self._lock:
+            for generator in self._generators.values():
+                generator.client.close()
+            self._generators.clear()
+            self._size_gauge.set(0)
+
+    def _key(self, model_name: Optional[str], backend: Optional[str]) -> Tuple[str, str]:
+        config = get_rag_config()
+        model_name = model_name or config.llm_model
+        if backend is None:
+            if model_name == config.llm_model:
+                backend = config.llm_backend
+            else:
+                backend = ModelProviderService.get_model_backend(model_name)
+        return backend, model_name
+
+    def _default_key(self) -> Tuple[str, str]:
+        config = get_rag_config()
+        return config.llm_backend, config.llm_model
+
+    def _evict_idle_locked(self):
+        cutoff = time.time() - self.idle_seconds
+        default_key = self._default_key()
+        for key in [k for k, g in self._generators.items() if k != default_key and g.client.last_used < cutoff]:
+            self._evict_locked(key)
+
+    def _evict_lru_locked(self):
+        default_key = self._default_key()
+        for key in list(self._generators):
+            if len(self._generators) <= self.max_clients:
+                break
+            if key != default_key:
+                self._evict_locked(key)
+
+    def _evict_locked(self, key: Tuple[str, str]):
+        # Not closed here: a request may still hold it; its HTTP pool is released with the object
+        self._generators.pop(key)
+        self._evicted_counter.inc()
+
+
+# Process-wide singleton
+_pool: Optional[ModelClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_model_client_pool() -> ModelClientPool:
+    """
+    Get the process-wide LLM client pool (configured from RAGConfig)
+
+    Returns:
+        ModelClientPool instance
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = get_rag_config()
+                _pool = ModelClientPool(
+                    max_clients=config.llm_client_pool_size,
+                    idle_seconds=config.llm_client_idle_seconds
+                )
+    return _pool
@@ -0,0 +1,235 @@
+"""
+OnnxEmbeddingModel - CPU inference for sentence-transformers via ONNX Runtime
+Exports the transformer once (fp32, optionally dynamic int8), then serves
+encode() without PyTorch on the request path
+"""
+from typing import List, Optional, Union
+from pathlib import Path
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbeddingModel:
+    """
+    Drop-in replacement for SentenceTransformer.encode on CPU-only nodes
+
+    Export layout (cache_dir/<model_name>/):
+        model.onnx        - fp32 graph (input_ids, attention_mask[, token_type_ids] → last_hidden_state)
+        model.int8.onnx   - dynamic int8 quantized graph (backend "onnx-int8")
+        tokenizer files   - saved with tokenizer.save_pretrained
+        embedding.json    - pooling mode, normalize flag, dimension, max_seq_length
+
+    Cách dùng:
+        model = OnnxEmbeddingModel("dangvantuan/vietnamese-document-embedding", quantize=True)
+        vectors = model.encode(["Học phí ngành CNTT"])
+    """
+
+    FP32_FILE = "model.onnx"
+    INT8_FILE = "model.int8.onnx"
+    META_FILE = "embedding.json"
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        cache_dir: str = "./data/onnx",
+        num_threads: Optional[int] = None
+    ):
+        """
+        Initialize ONNX embedding model (exports on first use)
+
+        Args:
+            model_name: HuggingFace / sentence-transformers model id
+            quantize: Use dynamic int8 quantized graph
+            cache_dir: Directory where exported graphs are cached
+            num_threads: ONNX Runtime intra-op threads (None = runtime default)
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self.model_dir = Path(cache_dir) / model_name.replace("/", "__")
+        self.num_threads = num_threads
+
+        self._ensure_exported()
+        if self.quantize:
+            self._ensure_quantized()
+
+        with open(self.model_dir / self.META_FILE, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        from transformers import AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        self.session = self._create_session()
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        logger.info(
+            f"✅ ONNX embedding model ready: {self.model_name} "
+            f"({'int8' if self.quantize else 'fp32'}, pooling={self.meta['pooling']})"
+        )
+
+    # ===== Export (one-time, needs torch) =====
+
+    def _ensure_exported(self):
+        """Export the torch model to ONNX if no cached graph exists"""
+        if (self.model_dir / self.FP32_FILE).exists() and (self.model_dir / self.META_FILE).exists():
+            return
+
+        logger.info(f"🔄 Exporting {self.model_name} to ONNX (one-time)...")
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        st_model = SentenceTransformer(self.model_name, trust_remote_code=True, device="cpu")
+        transformer = st_model[0]
+        tokenizer = transformer.tokenizer
+
+        dummy = tokenizer(["Học viện Công nghệ Bưu chính Viễn thông"], return_tensors="pt", padding=True)
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+
+        class _HiddenStateWrapper(torch.nn.Module):
+            def __init__(self, model, names):
+                super().__init__()
+                self.model = model
+                self.names = names
+
+            def forward(self, *inputs):
+                outputs = self.model(**dict(zip(self.names, inputs)))
+                return outputs[0]  # last_hidden_state
+
+        wrapper = _HiddenStateWrapper(transformer.auto_model.eval(), input_names)
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        with torch.no_grad():
+            torch.onnx.export(
+                wrapper,
+                tuple(dummy[name] for name in input_names),
+                str(self.model_dir / self.FP32_FILE),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+
+        tokenizer.save_pretrained(str(self.model_dir))
+
+        # Record post-processing so ONNX output matches SentenceTransformer.encode
+        pooling = "mean"
+        normalize = False
+        for module in st_model:
+            name = module.__class__.__name__
+            if name == "Pooling":
+                pooling = module.get_pooling_mode_str()
+            elif name == "Normalize":
+                normalize = True
+
+        meta = {
+            "model_name": self.model_name,
+            "pooling": pooling,
+            "normalize": normalize,
+            "dimension": st_model.get_sentence_embedding_dimension(),
+            "max_seq_length": st_model.max_seq_length,
+        }
+        with open(self.model_dir / self.META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        logger.info(f"✅ Exported ONNX graph to {self.model_dir}")
+
+    def _ensure_quantized(self):
+        """Create dynamic int8 graph from the fp32 export (weights only, no calibration)"""
+        int8_path = self.model_dir / self.INT8_FILE
+        if int8_path.exists():
+            return
+
+        logger.info("🔄 Quantizing ONNX graph to int8 (dynamic)...")
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(
+            str(self.model_dir / self.FP32_FILE),
+            str(int8_path),
+            weight_type=QuantType.QInt8
+        )
+        logger.info(f"✅ Quantized graph: {int8_path}")
+
+    def _create_session(self):
+        """Create ONNX Runtime CPU session"""
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+
+        graph = self.INT8_FILE if self.quantize else self.FP32_FILE
+        return ort.InferenceSession(
+            str(self.model_dir / graph),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+    # ===== SentenceTransformer-compatible API =====
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Apply the recorded pooling strategy to token embeddings"""
+        pooling = self.meta["pooling"]
+        if pooling == "cls":
+            return hidden[:, 0]
+        mask = attention_mask[..., None].astype(np.float32)
+        if pooling == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        if pooling == "lasttoken":
+            last = attention_mask.sum(axis=1) - 1
+            return hidden[np.arange(hidden.shape[0]), last]
+        # mean (default)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Encode sentences (same call shape as SentenceTransformer.encode)
+
+        Args:
+            sentences: One text or a list of texts
+            batch_size: Texts per ONNX run
+            convert_to_numpy: Kept for API compatibility (always numpy)
+            show_progress_bar: Ignored
+
+        Returns:
+            (dim,) vector for a single string, (n, dim) float32 matrix otherwise
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.meta.get("max_seq_length") or 512,
+                return_tensors="np"
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+            hidden = self.session.run(None, feeds)[0]
+            pooled = self._pool(hidden, encoded["attention_mask"])
+            if self.meta.get("normalize"):
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            outputs.append(pooled.astype(np.float32))
+
+        matrix = np.concatenate(outputs, axis=0)
+        return matrix[0] if single else matrix
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding dimension recorded at export time"""
+        return int(self.meta["dimension"])
@@ -0,0 +1,185 @@
+"""
+RerankerService - CPU cross-encoder reranking of retrieved chunks
+Retrieve nhiều candidates rẻ (vector/BM25), cross-encoder chấm lại toàn bộ
+(question, chunk) trong MỘT batched forward pass, chỉ giữ top N cho LLM.
+"""
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+import hashlib
+import logging
+import threading
+import time
+
+import numpy as np
+
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.utils.metrics import get_metrics, DEFAULT_SIZE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+class RerankerService:
+    """
+    Cross-encoder reranker with a (query hash, chunk_id) score cache
+
+    Scores are the cross-encoder relevance in 0-1 (sigmoid of the logit).
+    Without sentence-transformers the reranker is disabled and callers keep
+    the retrieval order.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, cache_size: Optional[int] = None):
+        """
+        Initialize and load the cross-encoder
+
+        Args:
+            model_name: HuggingFace cross-encoder ID (optional, uses config if None)
+            cache_size: Pair score cache entries (optional, uses config if None)
+        """
+        config = get_rag_config()
+        self.model_name = model_name or config.reranker_model
+        self.max_length = config.rerank_max_length
+        self.cache_size = cache_size if cache_size is not None else config.rerank_cache_size
+        self._cache: "OrderedDict[tuple, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self.model = None
+        self._load_model()
+
+    def _load_model(self):
+        """Load the cross-encoder on CPU"""
+        try:
+            from sentence_transformers import CrossEncoder
+            self.model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+            logger.info(f"✅ Loaded reranker model: {self.model_name}")
+            print(f"✅ Loaded reranker model: {self.model_name}")
+        except ImportError as e:
+            logger.error(f"❌ ImportError: sentence-transformers not installed - {e}")
+            print("WARNING: sentence-transformers not installed, reranking disabled")
+            self.model = None
+        except Exception as e:
+            logger.error(f"❌ Exception loading reranker model: {e}", exc_info=True)
+            self.model = None
+
+    @staticmethod
+    def _query_key(query: str) -> str:
+        return hashlib.sha1(" ".join(query.lower().split()).encode("utf-8")).hexdigest()[:16]
+
+    def score(self, query: str, chunk_ids: Sequence[str], texts: Sequence[str]) -> np.ndarray:
+        """
+        Relevance of each chunk to the query
+        Cached pairs are reused; all misses go through one batched predict call.
+
+        Args:
+            query: User question
+            chunk_ids: Chunk IDs (cache keys)
+            texts: Chunk texts, aligned with chunk_ids
+
+        Returns:
+            float32 array of scores aligned with chunk_ids
+        """
+        scores = np.zeros(len(chunk_ids), dtype=np.float32)
+        if self.model is None or not chunk_ids:
+            return scores
+
+        qkey = self._query_key(query)
+        miss_idx: List[int] = []
+        with self._cache_lock:
+            for i, chunk_id in enumerate(chunk_ids):
+                cached = self._cache.get((qkey, chunk_id))
+                if cached is None:
+                    miss_idx.append(i)
+                else:
+                    self._cache.move_to_end((qkey, chunk_id))
+                    scores[i] = cached
+            self._hits += len(chunk_ids) - len(miss_idx)
+            self._misses += len(miss_idx)
+
+        if miss_idx:
+            pairs = [(query, texts[i]) for i in miss_idx]
+            predicted = self.model.predict(
+                pairs,
+                batch_size=len(pairs),
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            predicted = np.asarray(predicted, dtype=np.float32).reshape(-1)
+            scores[miss_idx] = predicted
+            get_metrics().histogram(
+                "rag_rerank_batch_size", "Pairs scored per cross-encoder forward pass", DEFAULT_SIZE_BUCKETS
+            ).observe(len(pairs))
+
+            if self.cache_size > 0:
+                with self._cache_lock:
+                    for i, value in zip(miss_idx, predicted):
+                        self._cache[(qkey, chunk_ids[i])] = float(value)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+        return scores
+
+    def rerank(self, query: str, hits: list, top_n: Optional[int] = None) -> list:
+        """
+        Reorder RetrievalHits by cross-encoder score and keep the best top_n
+
+        Args:
+            query: User question
+            hits: RetrievalHit list from retrieval
+            top_n: Number of hits to keep (None = all)
+
+        Returns:
+            Reranked hits (score replaced by the reranker score);
+            retrieval order if the model is unavailable
+        """
+        if self.model is None or not hits:
+            return hits[:top_n] if top_n is not None else hits
+
+        start = time.perf_counter()
+        texts = [hit.chunk["text"] if hit.chunk else "" for hit in hits]
+        scores = self.score(query, [hit.chunk_id for hit in hits], texts)
+
+        order = np.argsort(-scores, kind="stable")
+        if top_n is not None:
+            order = order[:top_n]
+        reranked = [hits[i].model_copy(update={"score": float(scores[i])}) for i in order]
+
+        get_metrics().histogram("rag_rerank_seconds", "Cross-encoder rerank latency per request").observe(
+            time.perf_counter() - start
+        )
+        return reranked
+
+    def warm_up(self):
+        """Run one tiny prediction so the first request doesn't pay init cost"""
+        if self.model is not None:
+            self.model.predict([("warm up", "warm up")], show_progress_bar=False)
+
+    def get_cache_stats(self) -> dict:
+        """Pair score cache hit ratio"""
+        with self._cache_lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._cache),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+# Process-wide singleton
+_reranker: Optional[RerankerService] = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> RerankerService:
+    """
+    Get the process-wide reranker (loads the model on first call)
+
+    Returns:
+        RerankerService instance
+    """
+    global _reranker
+    if _reranker is None:
+        with _reranker_lock:
+            if _reranker is None:
+                _reranker = RerankerService()
+    return _reranker
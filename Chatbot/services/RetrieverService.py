@@ -1,19 +1,24 @@
 """
 RetrieverService - Handles retrieval of relevant chunks from vector index
+Supports vector, lexical (BM25) and hybrid (RRF-fused) retrieval
 """
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 import numpy as np
 from sqlalchemy.orm import Session
-from Chatbot.dao.VectorIndexDAO import VectorIndexDAO
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.dao.VectorIndexDAO import VectorQuery, create_vector_index
 from Chatbot.dao.ChunkDAO import ChunkDAO
 from Chatbot.dao.DocumentDAO import DocumentDAO
 from Chatbot.entities.RetrievalHit import RetrievalHit
+from Chatbot.services.LexicalIndexService import get_lexical_index
+from Chatbot.utils.rank_fusion import reciprocal_rank_fusion
+from Chatbot.utils.search_filters import normalize_filters, payload_matches
 
 
 class RetrieverService:
     """
     Service for retrieving relevant document chunks
-    Combines vector search with database hydration
+    Combines vector and/or BM25 search with database hydration
     """
 
     def __init__(self, db: Session):
@@ -23,7 +28,8 @@ class RetrieverService:
         Args:
             db: SQLAlchemy database session
         """
-        self.vidx = VectorIndexDAO(db)
+        # Cheap after the first call: Qdrant client and collection resolution are pooled
+        self.vidx = create_vector_index(db)
         self.chunk_dao = ChunkDAO(db)
         self.doc_dao = DocumentDAO(db)
 
@@ -32,68 +38,291 @@ class RetrieverService:
         namespace: Optional[str],
         query_vector: np.ndarray,
         top_k: int = 5,
-        filters: Optional[Dict] = None
+        filters: Optional[Dict] = None,
+        query_text: Optional[str] = None,
+        mode: Optional[str] = None
     ) -> List[RetrievalHit]:
         """
-        Search for relevant chunks using vector similarity
+        Search for relevant chunks
 
         Args:
             namespace: Namespace/collection identifier (None = search all namespaces)
             query_vector: Query embedding vector
             top_k: Number of results to return
-            filters: Optional filters (e.g., document_id, date range)
+            filters: Optional domain filters, e.g. {"category": "tuition", "academic_year": "2024-2025"}
+            query_text: Query text for lexical search (required for lexical/hybrid)
+            mode: "vector", "lexical" or "hybrid" (optional, uses config.retrieval_mode if None)
 
         Returns:
             List of RetrievalHit objects with chunk, document, and score
         """
-        # Step 1: Vector search to get (chunk_id, score) pairs
-        chunk_scores = self.vidx.query(namespace, query_vector, top_k, filters)
+        config = get_rag_config()
+        mode = mode or config.retrieval_mode
+
+        # Denormalized payload mode: vector hits carry chunk + document fields
+        payloads: Optional[Dict[str, Dict]] = {} if config.vector_payload_mode == "full" else None
+
+        # Lexical needs the query text and a built index, otherwise fall back to vector
+        lexical_index = get_lexical_index()
+        if mode != "vector" and (not query_text or not lexical_index.ready):
+            mode = "vector"
+
+        # Step 1: Search to get (chunk_id, score) pairs
+        if mode == "lexical":
+            chunk_scores = self._lexical_search(query_text, namespace, top_k, filters, payloads)
+        elif mode == "hybrid":
+            candidates = top_k * config.hybrid_candidate_multiplier
+            chunk_scores = reciprocal_rank_fusion(
+                [
+                    self._vector_search(namespace, query_vector, candidates, filters, payloads),
+                    self._lexical_search(query_text, namespace, candidates, filters, payloads),
+                ],
+                k=config.rrf_k,
+                top_k=top_k
+            )
+        else:
+            chunk_scores = self._vector_search(namespace, query_vector, top_k, filters, payloads)
 
         if not chunk_scores:
             return []
 
-        # Step 2: Hydrate chunks from database
-        chunk_ids = [chunk_id for chunk_id, _ in chunk_scores]
-        chunks = self.chunk_dao.find_by_ids(chunk_ids)
+        if payloads is None:
+            return self._hydrate(chunk_scores)
+        return self._build_hits_from_payloads(chunk_scores, payloads)
+
+    def search_batch(self, queries: List[VectorQuery], mode: Optional[str] = None) -> List[List[RetrievalHit]]:
+        """
+        Run several searches (multi-domain fan-out, query rewrites, evaluation)
+        with one vector store round trip and one hydration pass
+
+        Args:
+            queries: VectorQuery list (namespace, query_vector, top_k, filters, query_text)
+            mode: "vector", "lexical" or "hybrid" (optional, uses config.retrieval_mode if None)
+
+        Returns:
+            One list of RetrievalHit per query, aligned with queries
+        """
+        if not queries:
+            return []
+
+        config = get_rag_config()
+        mode = mode or config.retrieval_mode
+        payloads: Optional[Dict[str, Dict]] = {} if config.vector_payload_mode == "full" else None
+
+        lexical_index = get_lexical_index()
+        modes = [
+            mode if mode == "vector" or (query.query_text and lexical_index.ready) else "vector"
+            for query in queries
+        ]
+
+        # Step 1: All vector searches in one request (hybrid queries fetch fusion candidates)
+        vector_queries = {}
+        for i, (query, query_mode) in enumerate(zip(queries, modes)):
+            if query_mode == "hybrid":
+                vector_queries[i] = query._replace(top_k=query.top_k * config.hybrid_candidate_multiplier)
+            elif query_mode == "vector":
+                vector_queries[i] = query
+        vector_results = dict(zip(
+            vector_queries,
+            self._vector_search_batch(list(vector_queries.values()), payloads)
+        ))
 
-        # Create chunk map for quick lookup
-        chunk_map = {chunk.id: chunk for chunk in chunks}
+        # Step 2: BM25 (in-process) and fusion per query
+        rankings = []
+        for i, (query, query_mode) in enumerate(zip(queries, modes)):
+            if query_mode == "lexical":
+                rankings.append(self._lexical_search(
+                    query.query_text, query.namespace, query.top_k, query.filters, payloads
+                ))
+            elif query_mode == "hybrid":
+                candidates = query.top_k * config.hybrid_candidate_multiplier
+                rankings.append(reciprocal_rank_fusion(
+                    [
+                        vector_results[i],
+                        self._lexical_search(query.query_text, query.namespace, candidates, query.filters, payloads),
+                    ],
+                    k=config.rrf_k,
+                    top_k=query.top_k
+                ))
+            else:
+                rankings.append(vector_results[i])
+
+        # Step 3: Hydrate the union of all rankings once
+        union = list({chunk_id: score for ranking in rankings for chunk_id, score in ranking}.items())
+        if not union:
+            return [[] for _ in queries]
+        if payloads is None:
+            hits = self._hydrate(union)
+        else:
+            hits = self._build_hits_from_payloads(union, payloads)
+        hit_map = {hit.chunk_id: hit for hit in hits}
+
+        return [
+            [hit_map[chunk_id].model_copy(update={"score": score}) for chunk_id, score in ranking if chunk_id in hit_map]
+            for ranking in rankings
+        ]
+
+    def _vector_search_batch(
+        self,
+        queries: List[VectorQuery],
+        payloads: Optional[Dict[str, Dict]]
+    ) -> List[List[Tuple[str, float]]]:
+        """Batched vector search; in payload mode also collects point payloads into `payloads`"""
+        if not queries:
+            return []
+        if payloads is None:
+            return self.vidx.query_batch(queries)
+        batch_results = self.vidx.query_batch_with_payload(queries)
+        for results in batch_results:
+            payloads.update((chunk_id, payload) for chunk_id, _, payload in results)
+        return [[(chunk_id, score) for chunk_id, score, _ in results] for results in batch_results]
+
+    def _vector_search(
+        self,
+        namespace: Optional[str],
+        query_vector: np.ndarray,
+        top_k: int,
+        filters: Optional[Dict],
+        payloads: Optional[Dict[str, Dict]]
+    ) -> List[Tuple[str, float]]:
+        """Vector search; in payload mode also collects point payloads into `payloads`"""
+        if payloads is None:
+            return self.vidx.query(namespace, query_vector, top_k, filters)
+        results = self.vidx.query_with_payload(namespace, query_vector, top_k, filters)
+        payloads.update((chunk_id, payload) for chunk_id, _, payload in results)
+        return [(chunk_id, score) for chunk_id, score, _ in results]
+
+    def _lexical_search(
+        self,
+        query_text: str,
+        namespace: Optional[str],
+        top_k: int,
+        filters: Optional[Dict],
+        payloads: Optional[Dict[str, Dict]]
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25 search; domain filters are applied on the candidates' point payloads
+        (the lexical index only knows namespaces)
+        """
+        lexical_index = get_lexical_index()
+        conditions = normalize_filters(filters)
+        if not conditions:
+            return lexical_index.search(query_text, top_k, namespace)
 
-        # Step 3: Hydrate documents
-        doc_ids = list(set(chunk.document_id for chunk in chunks))
-        docs = {doc_id: self.doc_dao.find_by_id(doc_id) for doc_id in doc_ids}
+        candidates = lexical_index.search(query_text, top_k * get_rag_config().hybrid_candidate_multiplier, namespace)
+        known = payloads if payloads is not None else {}
+        fetched = self.vidx.fetch_payloads([chunk_id for chunk_id, _ in candidates if chunk_id not in known])
+        if payloads is not None:
+            payloads.update(fetched)
+        return [
+            (chunk_id, score) for chunk_id, score in candidates
+            if payload_matches(known.get(chunk_id) or fetched.get(chunk_id), conditions)
+        ][:top_k]
+
+    def _build_hits_from_payloads(
+        self,
+        chunk_scores: List[Tuple[str, float]],
+        payloads: Dict[str, Dict]
+    ) -> List[RetrievalHit]:
+        """
+        Build RetrievalHits from denormalized point payloads (zero SQL queries)
+        Chunks without a full payload (lexical-only hits, points ingested before
+        payload mode) are fetched from Qdrant by ID, then from SQL as a last resort.
+
+        Args:
+            chunk_scores: Ranked (chunk_id, score) pairs
+            payloads: chunk_id → payload collected during vector search
+
+        Returns:
+            RetrievalHit objects in the same order
+        """
+        missing = [chunk_id for chunk_id, _ in chunk_scores if "text" not in payloads.get(chunk_id, {})]
+        if missing:
+            payloads.update(self.vidx.fetch_payloads(missing))
+
+        hydrated = {}
+        unresolved = [(chunk_id, score) for chunk_id, score in chunk_scores
+                      if "text" not in payloads.get(chunk_id, {})]
+        if unresolved:
+            hydrated = {hit.chunk_id: hit for hit in self._hydrate(unresolved)}
+
+        hits = []
+        for chunk_id, score in chunk_scores:
+            payload = payloads.get(chunk_id, {})
+            if "text" in payload:
+                hits.append(RetrievalHit(
+                    chunk_id=chunk_id,
+                    score=score,
+                    chunk={
+                        "id": chunk_id,
+                        "document_id": payload.get("document_id"),
+                        "idx": payload.get("idx"),
+                        "text": payload["text"],
+                        "tokens": payload.get("tokens"),
+                        "token_counts": payload.get("token_counts") or {},
+                    },
+                    doc={
+                        "id": payload.get("document_id"),
+                        "title": payload.get("title"),
+                        "source_uri": payload.get("source_uri"),
+                        "category": payload.get("category"),
+                    }
+                ))
+            elif chunk_id in hydrated:
+                hits.append(hydrated[chunk_id])
+
+        return hits
+
+    def _hydrate(self, chunk_scores: List[Tuple[str, float]]) -> List[RetrievalHit]:
+        """
+        Load chunks and documents from the database for ranked chunk IDs
+
+        Args:
+            chunk_scores: Ranked (chunk_id, score) pairs
+
+        Returns:
+            RetrievalHit objects in the same order (missing chunks are skipped)
+        """
+        # Step 2: Hydrate chunks (hydration cache → database for misses)
+        chunk_ids = [chunk_id for chunk_id, _ in chunk_scores]
+        chunk_map = {chunk["id"]: chunk for chunk in self.chunk_dao.find_projections_by_ids(chunk_ids)}
+
+        # Step 3: Hydrate documents (hydration cache → one query for misses)
+        docs = self.doc_dao.find_projections_by_ids(list(set(c["document_id"] for c in chunk_map.values())))
 
         # Step 4: Build RetrievalHit objects
         hits = []
         for chunk_id, score in chunk_scores:
             chunk = chunk_map.get(chunk_id)
             if chunk:
-                doc = docs.get(chunk.document_id)
                 hit = RetrievalHit(
                     chunk_id=chunk_id,
                     score=score,
-                    chunk=chunk.to_dict(),
-                    doc=doc.to_dict() if doc else None
+                    chunk=chunk,
+                    doc=docs.get(chunk["document_id"])
                 )
                 hits.append(hit)
 
         return hits
 
-    def rerank(self, hits: List[RetrievalHit], query: str) -> List[RetrievalHit]:
+    def rerank(self, hits: List[RetrievalHit], query: str, top_n: Optional[int] = None) -> List[RetrievalHit]:
         """
-        Re-rank retrieved hits using cross-encoder or BM25
-        (Optional enhancement - currently just returns as-is)
+        Re-rank retrieved hits with the cross-encoder (config.enable_reranking)
+        All (query, chunk) pairs are scored in one batched forward pass
 
         Args:
             hits: Initial retrieval results
             query: User's query
+            top_n: Number of hits to keep after reranking (None = all)
 
         Returns:
-            Re-ranked hits
+            Re-ranked hits (original ranking, truncated, if reranking is disabled)
         """
-        # TODO: Implement cross-encoder re-ranking
-        # For now, just return original ranking
-        return hits
+        if not get_rag_config().enable_reranking:
+            return hits[:top_n] if top_n is not None else hits
+
+        from Chatbot.services.RerankerService import get_reranker
+        return get_reranker().rerank(query, hits, top_n)
 
     def filter_by_score_threshold(
         self,
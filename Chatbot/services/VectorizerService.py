@@ -2,10 +2,14 @@
 VectorizerService - Handles text-to-vector embedding
 Enhanced with Redis caching support
 """
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 import numpy as np
 import logging
+import time
 from Chatbot.config.rag_config import get_rag_config
+from Chatbot.services.EmbeddingBatcher import EmbeddingBatcher
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.utils.fingerprint import make_fingerprint, set_active_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -23,46 +27,96 @@ class VectorizerService:
 
         Args:
             embed_model: Model name for sentence-transformers (optional, uses config if None)
-            enable_cache: Enable Redis caching (optional, uses config if None)
+            enable_cache: Enable Redis tier of the embedding cache (optional, uses config if None)
         """
         config = get_rag_config()
         self.embed_model = embed_model or config.embedding_model
         self.embedding_dimension = config.embedding_dimension
+        self.backend = config.embedding_backend
         self.model = None
         self._cache = None
+        self._batcher = None
 
         logger.info(f"   Model: {self.embed_model}")
         logger.info(f"   Dimension: {self.embedding_dimension}")
+        logger.info(f"   Backend: {self.backend}")
 
-        # DISABLE CACHE FOR NOW - causing issues
-        self.enable_cache = False
-        logger.info("   Cache DISABLED (hardcoded for debugging)")
+        # Two-tier cache: in-process LRU always, Redis when enabled
+        self.enable_cache = config.enable_cache if enable_cache is None else enable_cache
+        self._init_cache()
 
         logger.info("   Calling _load_model()...")
         print("   Calling _load_model()...")
         self._load_model()
+
+        # Record which model produces this process's vectors (VectorIndexDAO uses it)
+        if self.model is not None:
+            set_active_fingerprint(self.get_fingerprint())
+
+        # Micro-batching queue: concurrent embed() calls share one encode
+        if config.enable_embed_batching and self.model is not None:
+            self._batcher = EmbeddingBatcher(
+                encode_fn=self._encode,
+                max_batch_size=config.embed_batch_max_size,
+                max_wait_ms=config.embed_batch_max_wait_ms,
+                timeout=config.embed_batch_timeout
+            )
+            logger.info(
+                f"   Micro-batching ON (max_batch={config.embed_batch_max_size}, "
+                f"max_wait={config.embed_batch_max_wait_ms}ms)"
+            )
+
         logger.info("✓ VectorizerService.__init__() completed")
         print("✓ VectorizerService.__init__() completed")
 
     def _init_cache(self):
-        """Initialize Redis cache"""
-        try:
-            from Chatbot.infrastructure.cache import RedisCache
-            self._cache = RedisCache()
-            if self._cache.is_available():
-                logger.info("✓ Redis cache enabled for embeddings")
-            else:
-                logger.warning("Redis cache initialization failed, proceeding without cache")
-                self._cache = None
-        except ImportError:
-            logger.warning("redis package not installed, caching disabled")
-            self._cache = None
-        except Exception as e:
-            logger.warning(f"Failed to initialize cache: {e}")
-            self._cache = None
+        """Initialize two-tier embedding cache (LRU + optional Redis)"""
+        config = get_rag_config()
+        redis_cache = None
+
+        if self.enable_cache:
+            try:
+                from Chatbot.cache.RedisCache import RedisCache
+                redis_cache = RedisCache(db=config.redis_db)
+                if redis_cache.is_available():
+                    logger.info("✓ Redis tier enabled for embeddings")
+                else:
+                    logger.warning("Redis unavailable, embedding cache runs in-process only")
+                    redis_cache = None
+            except ImportError:
+                logger.warning("redis package not installed, Redis tier disabled")
+                redis_cache = None
+            except Exception as e:
+                logger.warning(f"Failed to initialize Redis tier: {e}")
+                redis_cache = None
+
+        from Chatbot.cache.EmbeddingCache import EmbeddingCache
+        self._cache = EmbeddingCache(
+            model_name=self.embed_model,
+            max_entries=config.embedding_lru_size,
+            redis_cache=redis_cache,
+            ttl=config.embedding_cache_ttl
+        )
+        logger.info(f"   Embedding LRU: {config.embedding_lru_size} entries")
+
+    def get_cache_stats(self) -> dict:
+        """
+        Get hit ratios per cache tier
+
+        Returns:
+            Dict with LRU/Redis stats (empty if cache not initialized)
+        """
+        return self._cache.get_stats() if self._cache else {}
 
     def _load_model(self):
         """Load the embedding model (lazy loading)"""
+        if self.backend in ("onnx", "onnx-int8"):
+            self._load_onnx_model()
+            if self.model is not None:
+                return
+            logger.warning("ONNX backend unavailable, falling back to torch")
+            self.backend = "torch"
+
         try:
             import sys
             logger.info(f"🔄 Attempting to load embedding model: {self.embed_model}")
@@ -88,6 +142,39 @@ class VectorizerService:
             traceback.print_exc()
             self.model = None
 
+    def _load_onnx_model(self):
+        """Load ONNX Runtime backend (exports + quantizes on first run)"""
+        config = get_rag_config()
+        try:
+            from Chatbot.services.OnnxEmbeddingModel import OnnxEmbeddingModel
+            self.model = OnnxEmbeddingModel(
+                self.embed_model,
+                quantize=(self.backend == "onnx-int8"),
+                cache_dir=config.embedding_onnx_cache_dir,
+                num_threads=config.embedding_num_threads
+            )
+            print(f"✅ Loaded embedding model: {self.embed_model} (backend={self.backend})")
+        except ImportError as e:
+            logger.error(f"❌ ImportError: onnxruntime/transformers not installed - {e}")
+            print("WARNING: onnxruntime not installed. Install with: pip install onnxruntime")
+            self.model = None
+        except Exception as e:
+            logger.error(f"❌ Exception loading ONNX embedding model: {e}", exc_info=True)
+            self.model = None
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Run the model on a list of texts (single forward batch)
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            float32 matrix of shape (len(texts), dim)
+        """
+        embeddings = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        return np.asarray(embeddings, dtype='float32')
+
     def embed(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text with optional caching
@@ -98,15 +185,11 @@ class VectorizerService:
         Returns:
             Embedding vector as numpy array
         """
-        # Try cache first
-        if self._cache and self._cache.is_available():
-            cached_embedding = self._cache.get_cached_embedding(
-                text=text,
-                provider="huggingface",
-                model=self.embed_model
-            )
+        # Try cache first (LRU, then Redis)
+        if self._cache:
+            cached_embedding = self._cache.get(text)
             if cached_embedding is not None:
-                return np.array(cached_embedding, dtype='float32')
+                return cached_embedding
 
         # Model not loaded fallback
         if self.model is None:
@@ -114,47 +197,147 @@ class VectorizerService:
             return np.random.rand(self.embedding_dimension).astype('float32')
 
         try:
-            # Generate embedding
-            embedding = self.model.encode(text, convert_to_numpy=True)
-            embedding = embedding.astype('float32')
+            # Generate embedding (through the micro-batch queue when enabled)
+            if self._batcher is not None:
+                embedding = self._batcher.submit(text)
+            else:
+                embedding = self.model.encode(text, convert_to_numpy=True)
+                embedding = embedding.astype('float32')
 
             # Cache the result
-            if self._cache and self._cache.is_available():
-                self._cache.cache_embedding(
-                    text=text,
-                    embedding=embedding.tolist(),
-                    provider="huggingface",
-                    model=self.embed_model
-                )
+            if self._cache:
+                self._cache.put(text, embedding)
 
             return embedding
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             return np.random.rand(self.embedding_dimension).astype('float32')
 
-    def embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for multiple texts (more efficient)
+        Only cache misses reach the model (LRU → Redis MGET → encode),
+        and misses are encoded in length-sorted batches to minimize padding
 
         Args:
             texts: List of input text strings
 
         Returns:
-            List of embedding vectors
+            Contiguous float32 matrix of shape (len(texts), dim), rows in input order
         """
+        texts = list(texts)
         if not texts:
-            return []
+            return np.zeros((0, self.get_dimension()), dtype='float32')
+        return self._embed_window(texts)
 
+    def embed_stream(self, texts: Iterable[str], window: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Stream embeddings for an arbitrarily large iterator of texts
+        Memory is bounded by one window of texts + its output matrix
+
+        Args:
+            texts: Iterator/iterable of input texts (consumed lazily)
+            window: Texts buffered per yielded matrix (default: config.embed_stream_window)
+
+        Yields:
+            float32 matrix (n, dim) per window, rows in input order
+        """
+        window = window or get_rag_config().embed_stream_window
+        buffer: List[str] = []
+        for text in texts:
+            buffer.append(text)
+            if len(buffer) >= window:
+                yield self._embed_window(buffer)
+                buffer = []
+        if buffer:
+            yield self._embed_window(buffer)
+
+    def _embed_window(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed one window of texts into a preallocated matrix
+
+        Steps:
+        1. Fill cache hits
+        2. Sort misses by length into buckets of embed_batch_size
+        3. Encode each bucket (short texts are padded only to short lengths)
+        4. Scatter rows back to input positions
+
+        Args:
+            texts: Window of input texts
+
+        Returns:
+            float32 matrix (len(texts), dim)
+        """
+        dim = self.get_dimension()
         if self.model is None:
             # Fallback: return random vectors
-            return [np.random.rand(self.embedding_dimension).astype('float32') for _ in texts]
+            return np.random.rand(len(texts), dim).astype('float32')
+
+        out = np.empty((len(texts), dim), dtype='float32')
+        cached = self._cache.get_many(texts) if self._cache else [None] * len(texts)
+        missing = []
+        for i, vector in enumerate(cached):
+            if vector is None:
+                missing.append(i)
+            else:
+                out[i] = vector
+
+        if not missing:
+            return out
+
+        batch_size = get_rag_config().embed_batch_size
+        metrics = get_metrics()
+        encode_hist = metrics.histogram("rag_embedding_encode_seconds", "Wall time of one batched encode call")
+        chunks_counter = metrics.counter("rag_embedding_texts_encoded_total", "Texts run through the embedding model")
 
+        missing.sort(key=lambda i: len(texts[i]))
+        for start in range(0, len(missing), batch_size):
+            bucket = missing[start:start + batch_size]
+            t0 = time.perf_counter()
+            try:
+                out[bucket] = self._encode([texts[i] for i in bucket])
+            except Exception as e:
+                print(f"Error generating batch embeddings: {e}")
+                out[bucket] = np.random.rand(len(bucket), dim).astype('float32')
+                continue
+            encode_hist.observe(time.perf_counter() - t0)
+            chunks_counter.inc(len(bucket))
+
+            if self._cache:
+                self._cache.put_many([texts[i] for i in bucket], list(out[bucket]))
+
+        return out
+
+    def warm_up(self):
+        """
+        Run one throwaway encode (bypasses cache) so the first real query
+        doesn't pay graph/allocator initialization cost
+        """
+        if self.model is None:
+            return
         try:
-            embeddings = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
-            return [emb.astype('float32') for emb in embeddings]
+            self._encode(["Học viện Công nghệ Bưu chính Viễn thông"])
         except Exception as e:
-            print(f"Error generating batch embeddings: {e}")
-            return [np.random.rand(self.embedding_dimension).astype('float32') for _ in texts]
+            logger.warning(f"Embedding warm-up failed: {e}")
+
+    def get_fingerprint(self) -> dict:
+        """
+        Fingerprint (model name, dimension, normalization) of the loaded model
+
+        Returns:
+            Fingerprint dict from make_fingerprint
+        """
+        normalize = None
+        if self.model is not None:
+            meta = getattr(self.model, "meta", None)
+            if isinstance(meta, dict):
+                normalize = bool(meta.get("normalize"))
+            else:
+                try:
+                    normalize = any(module.__class__.__name__ == "Normalize" for module in self.model)
+                except TypeError:
+                    normalize = None
+        return make_fingerprint(self.embed_model, self.get_dimension(), normalize)
 
     def get_dimension(self) -> int:
         """
@@ -170,3 +353,18 @@ class VectorizerService:
             return self.model.get_sentence_embedding_dimension()
         except:
             return self.embedding_dimension
+
+
+def create_vectorizer_service():
+    """
+    Build the vectorizer for this server process
+
+    Returns:
+        EmbeddingWorkerClient when embedding_worker_mode == "remote"
+        (model lives in the shared worker pool), else an in-process VectorizerService
+    """
+    config = get_rag_config()
+    if config.embedding_worker_mode == "remote":
+        from Chatbot.services.EmbeddingWorkerClient import EmbeddingWorkerClient
+        return EmbeddingWorkerClient()
+    return VectorizerService()
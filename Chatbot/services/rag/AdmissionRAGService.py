@@ -2,7 +2,7 @@
 AdmissionRAGService - RAG service specialized for admission-related queries
 Handles: tuyển sinh, điểm chuẩn, xét tuyển, ngành học, chỉ tiêu
 """
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 
 from .BaseRAGService import BaseRAGService
@@ -128,7 +128,7 @@ class AdmissionRAGService(BaseRAGService):
             "qua hotline 024.3577.1148 hoặc email tuyensinh@ptit.edu.vn"
         )
 
-    def postprocess_answer(self, answer: str) -> str:
+    def answer_addenda(self, answer: str) -> Tuple[str, str]:
         """
         Postprocess admission answers
         Add disclaimer and contact info if needed
@@ -143,13 +143,13 @@ class AdmissionRAGService(BaseRAGService):
 
         if any(marker in answer.lower() for marker in uncertainty_markers):
             # Add contact disclaimer
-            answer += (
+            return "", (
                 "\n\n📞 Để được tư vấn chính xác nhất, vui lòng liên hệ:\n"
                 "- Hotline tuyển sinh: 024.3577.1148\n"
                 "- Email: tuyensinh@ptit.edu.vn"
             )
 
-        return answer
+        return "", ""
 
     def _get_no_results_message(self) -> str:
         """Custom no-results message for admission domain"""
@@ -3,12 +3,22 @@ BaseRAGService - Class cơ sở cho các domain service RAG
 Định nghĩa interface chung mà tất cả domain service phải implement
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
-import numpy as np
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Tuple
+import copy
+import logging
+import time
 from sqlalchemy.orm import Session
 
+from Chatbot.config.rag_config import get_rag_config
 from Chatbot.services.RetrieverService import RetrieverService
-from Chatbot.utils.token_counter import fit_within_budget
+from Chatbot.utils.answer_stream import aiter_answer_events, apply_postprocess, iter_answer_events
+from Chatbot.utils.async_stages import run_in_stage
+from Chatbot.utils.deadline import Deadline
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.utils.search_filters import widen_filters
+from Chatbot.utils.token_counter import fit_within_budget, stored_token_counts
+
+logger = logging.getLogger(__name__)
 
 
 class BaseRAGService(ABC):
@@ -29,19 +39,39 @@ class BaseRAGService(ABC):
                 return ["tuyển sinh", "điểm chuẩn"]
     """
 
-    def __init__(self, db: Session, vectorizer, generator):
+    def __init__(self, db: Optional[Session], vectorizer, generator, retriever: Optional[RetrieverService] = None):
         """
         Khởi tạo domain-specific RAG service
 
         Args:
-            db: SQLAlchemy database session
+            db: SQLAlchemy database session (None cho instance dùng chung, xem bind)
             vectorizer: VectorizerService singleton (đã load model)
             generator: GeneratorService singleton (đã load LLM)
+            retriever: RetrieverService dùng lại (optional, tạo mới nếu None)
         """
         self.db = db
         self.vectorizer = vectorizer
         self.generator = generator
-        self.retriever = RetrieverService(db)
+        self.retriever = retriever if retriever is not None else RetrieverService(db)
+
+    def bind(self, db: Session, generator=None) -> "BaseRAGService":
+        """
+        Bản sao nhẹ của service gắn với DB session của request
+        (instance dùng chung trong DomainServiceRegistry không giữ session nào)
+
+        Args:
+            db: SQLAlchemy session của request
+            generator: GeneratorService khác (optional, khi request chọn model khác)
+
+        Returns:
+            Service cùng class, dùng chung vectorizer/vector index
+        """
+        bound = copy.copy(self)
+        bound.db = db
+        bound.retriever = RetrieverService(db)  # Vector index DAO comes from the connection pool
+        if generator is not None:
+            bound.generator = generator
+        return bound
 
     # ===== Các method bắt buộc phải implement =====
 
@@ -105,12 +135,25 @@ class BaseRAGService(ABC):
         Returns:
             Filter dict hoặc None
 
+        Các key được hỗ trợ (có payload index, xem utils/search_filters.py):
+            category, academic_year, document_id, namespace, year, year_range
+
         Ví dụ:
             {"category": "admission", "year": "2024"}
-            {"department": "finance"}
+            {"category": "tuition", "academic_year": "2024-2025"}
         """
         return None
 
+    def get_filter_fallbacks(self) -> List[Optional[Dict]]:
+        """
+        Chuỗi filter từ hẹp → rộng, dùng khi search có filter trả về quá ít kết quả
+        Mặc định: filter đầy đủ → bỏ điều kiện thời gian → không filter
+
+        Returns:
+            List filter dicts (phần tử cuối thường là None)
+        """
+        return widen_filters(self.get_search_filters())
+
     def get_custom_prompt_context(self) -> Optional[str]:
         """
         Context bổ sung để inject vào LLM prompt
@@ -124,23 +167,56 @@ class BaseRAGService(ABC):
         """
         return None
 
-    def postprocess_answer(self, answer: str) -> str:
+    def postprocess_segment(self, segment: str) -> str:
         """
-        Hậu xử lý câu trả lời đã generate
-        Override để thêm formatting đặc thù theo domain
+        Format inline một đoạn câu trả lời (một dòng / một câu hoàn chỉnh)
+        Được áp dụng tăng dần khi stream, nên chỉ dùng cho transformations
+        không cần nhìn thấy toàn bộ câu trả lời
 
         Args:
-            answer: Câu trả lời thô từ LLM
+            segment: Đoạn text thô từ LLM (kết thúc ở xuống dòng hoặc dấu câu)
 
         Returns:
-            Câu trả lời đã xử lý
+            Đoạn text đã format
 
         Ví dụ:
-            - Thêm disclaimers
+            - Format số tiền: "15000000 đồng" → "15.000.000 đồng"
             - Format dates/numbers
+        """
+        return segment
+
+    def answer_addenda(self, answer: str) -> Tuple[str, str]:
+        """
+        Phần thêm vào đầu/cuối câu trả lời, quyết định khi đã có toàn bộ câu trả lời
+        Khi stream: suffix được gửi sau token cuối, prefix nằm trong event "done"
+
+        Args:
+            answer: Câu trả lời đã qua postprocess_segment
+
+        Returns:
+            (prefix, suffix) - chuỗi rỗng nếu không thêm gì
+
+        Ví dụ:
+            - Thêm disclaimers
             - Thêm thông tin liên hệ
+            - Cảnh báo quan trọng ở đầu câu trả lời
+        """
+        return "", ""
+
+    def postprocess_answer(self, answer: str) -> str:
         """
-        return answer
+        Hậu xử lý câu trả lời đã generate
+        Mặc định: postprocess_segment cho từng đoạn + answer_addenda, giống hệt
+        kết quả của answer_stream(). Domain services nên override 2 hook đó thay
+        vì method này để streaming cũng được xử lý.
+
+        Args:
+            answer: Câu trả lời thô từ LLM
+
+        Returns:
+            Câu trả lời đã xử lý
+        """
+        return apply_postprocess(answer, self)
 
     # ===== Main RAG Pipeline (thường không cần override) =====
 
@@ -169,25 +245,9 @@ class BaseRAGService(ABC):
             conversation_history: Lịch sử hội thoại trước đó
 
         Returns:
-            Dict với keys: answer, citations, domain, namespace
+            Dict với keys: answer, citations, domain, namespace, timings
         """
-        # Bước 1: Tiền xử lý câu hỏi
-        processed_question = self.preprocess_question(question)
-
-        # Bước 2: Chuyển câu hỏi thành vector
-        query_vector = self.vectorizer.embed(processed_question)
-
-        # Bước 3: Tìm kiếm TOÀN BỘ namespaces (vì data hiện tại phần lớn là general)
-        # Mặc dù tìm toàn bộ, mỗi domain vẫn có:
-        # - Preprocessing riêng (expand abbreviations, add context)
-        # - Custom prompt/system context riêng
-        # - Postprocessing riêng
-        hits = self.retriever.search(
-            namespace=None,  # None = tìm tất cả namespaces
-            query_vector=query_vector,
-            top_k=top_k,
-            filters=None  # Không filter để có nhiều kết quả hơn
-        )
+        processed_question, hits, timings = self._retrieve(question, top_k)
 
         # Xử lý trường hợp không tìm thấy kết quả
         if not hits:
@@ -199,8 +259,7 @@ class BaseRAGService(ABC):
             }
 
         # Bước 4: Cắt xén contexts cho vừa token budget
-        context_texts = [hit.chunk["text"] for hit in hits if hit.chunk]
-        contexts = fit_within_budget(context_texts, token_budget=token_budget)
+        contexts = self._build_contexts(hits, token_budget)
 
         # Bước 5: Generate câu trả lời với domain context tùy chọn
         custom_context = self.get_custom_prompt_context()
@@ -219,9 +278,236 @@ class BaseRAGService(ABC):
             "answer": final_answer,
             "citations": hits,
             "domain": self.get_domain_name(),
-            "namespace": self.get_namespace()
+            "namespace": self.get_namespace(),
+            "timings": timings or None
+        }
+
+    def answer_stream(
+        self,
+        question: str,
+        top_k: int = 5,
+        token_budget: int = 2000,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Streaming variant của answer(): cùng pipeline, câu trả lời trả về dần
+
+        Retrieval chạy khi lấy event đầu tiên ("citations"); các event sau chỉ
+        gọi LLM (không dùng DB session).
+
+        Args:
+            question: Câu hỏi của user
+            top_k: Số lượng chunks cần retrieve
+            token_budget: Giới hạn tokens cho context
+            conversation_history: Lịch sử hội thoại trước đó
+
+        Yields:
+            ("citations", {...}), ("delta", {"text": ...})*, ("done", {answer, prefix, domain, namespace, timings})
+        """
+        processed_question, hits, timings = self._retrieve(question, top_k)
+        deltas = self.generator.generate_stream(
+            question=processed_question,
+            contexts=self._build_contexts(hits, token_budget),
+            language="vi",
+            conversation_history=conversation_history,
+            system_context=self.get_custom_prompt_context()
+        ) if hits else iter(())
+
+        yield from iter_answer_events(
+            self,
+            hits,
+            deltas,
+            meta={"domain": self.get_domain_name(), "namespace": self.get_namespace(), "timings": timings or None},
+            no_results_message=self._get_no_results_message()
+        )
+
+    async def aanswer(
+        self,
+        question: str,
+        top_k: int = 5,
+        token_budget: int = 2000,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """
+        Async variant của answer(): cùng pipeline và kết quả, không block event loop
+        (embed/retrieval trên stage thread pool, LLM qua client async)
+
+        Returns:
+            Dict với keys: answer, citations, domain, namespace, timings
+        """
+        processed_question, hits, timings = await self._aretrieve(question, top_k)
+
+        if not hits:
+            return {
+                "answer": self._get_no_results_message(),
+                "citations": [],
+                "domain": self.get_domain_name(),
+                "namespace": self.get_namespace()
+            }
+
+        llm_start = time.perf_counter()
+        answer_text = await self.generator.agenerate(
+            question=processed_question,
+            contexts=self._build_contexts(hits, token_budget),
+            language="vi",
+            conversation_history=conversation_history,
+            system_context=self.get_custom_prompt_context(),
+            deadline=deadline
+        )
+        timings["llm_ms"] = round((time.perf_counter() - llm_start) * 1000, 2)
+
+        return {
+            "answer": self.postprocess_answer(answer_text),
+            "citations": hits,
+            "domain": self.get_domain_name(),
+            "namespace": self.get_namespace(),
+            "timings": timings or None
         }
 
+    async def aanswer_stream(
+        self,
+        question: str,
+        top_k: int = 5,
+        token_budget: int = 2000,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Async variant của answer_stream() (cùng events)
+
+        Yields:
+            ("citations", {...}), ("delta", {"text": ...})*, ("done", {...})
+        """
+        processed_question, hits, timings = await self._aretrieve(question, top_k)
+        deltas = self.generator.agenerate_stream(
+            question=processed_question,
+            contexts=self._build_contexts(hits, token_budget),
+            language="vi",
+            conversation_history=conversation_history,
+            system_context=self.get_custom_prompt_context(),
+            deadline=deadline
+        ) if hits else None
+
+        async for event in aiter_answer_events(
+            self,
+            hits,
+            deltas,
+            meta={"domain": self.get_domain_name(), "namespace": self.get_namespace(), "timings": timings or None},
+            no_results_message=self._get_no_results_message()
+        ):
+            yield event
+
+    def _retrieve(self, question: str, top_k: int) -> Tuple[str, List, Dict]:
+        """
+        Bước 1-3 của pipeline: preprocess, vectorize, search (+ rerank)
+
+        Returns:
+            (processed question, hits, timings)
+        """
+        # Bước 1: Tiền xử lý câu hỏi
+        processed_question = self.preprocess_question(question)
+
+        # Bước 2: Chuyển câu hỏi thành vector
+        query_vector = self.vectorizer.embed(processed_question)
+
+        hits, timings = self._search_hits(processed_question, query_vector, top_k)
+        return processed_question, hits, timings
+
+    async def _aretrieve(self, question: str, top_k: int) -> Tuple[str, List, Dict]:
+        """
+        Async _retrieve: embedding và search (Qdrant + SQL hydration) chạy trên
+        stage thread pool, event loop không bị block
+
+        Returns:
+            (processed question, hits, timings)
+        """
+        processed_question = self.preprocess_question(question)
+        embed_start = time.perf_counter()
+        query_vector = await run_in_stage("embed", self.vectorizer.embed, processed_question)
+        embed_ms = round((time.perf_counter() - embed_start) * 1000, 2)  # Includes the wait for a stage slot
+        hits, timings = await run_in_stage("retrieval", self._search_hits, processed_question, query_vector, top_k)
+        return processed_question, hits, {"embed_ms": embed_ms, **timings}
+
+    def _search_hits(self, processed_question: str, query_vector, top_k: int) -> Tuple[List, Dict]:
+        """
+        Bước 3: search với fallbacks (+ rerank)
+
+        Returns:
+            (hits, timings)
+        """
+        # Bước 3: Tìm kiếm với domain filters (category, năm học, ...) trên TOÀN BỘ namespaces
+        # Nếu filter quá hẹp (ít hơn top_k kết quả) thì nới dần filter (get_filter_fallbacks)
+        # Có reranking: lấy rerank_candidates chunks (rẻ), cross-encoder chọn lại top N
+        config = get_rag_config()
+        rerank = config.enable_reranking
+        timings = {}
+        retrieval_start = time.perf_counter()
+        hits = self._search_with_fallbacks(
+            query_vector=query_vector,
+            query_text=processed_question,
+            top_k=max(top_k, config.rerank_candidates) if rerank else top_k,
+            min_hits=top_k
+        )
+        timings["retrieval_ms"] = round((time.perf_counter() - retrieval_start) * 1000, 2)
+
+        if rerank and hits:
+            rerank_start = time.perf_counter()
+            hits = self.retriever.rerank(hits, processed_question, top_n=min(top_k, config.rerank_top_n))
+            timings["rerank_ms"] = round((time.perf_counter() - rerank_start) * 1000, 2)
+
+        return hits, timings
+
+    def _build_contexts(self, hits: List, token_budget: int) -> List[str]:
+        """Chunk texts of the hits, cut to the token budget (stored token counts of the generating model's tokenizer)"""
+        chunks = [hit.chunk for hit in hits if hit.chunk]
+        tokenizer = self.generator.tokenizer
+        return fit_within_budget(
+            [chunk["text"] for chunk in chunks],
+            token_budget=token_budget,
+            tokenizer=tokenizer,
+            token_counts=stored_token_counts(chunks, tokenizer)
+        )
+
+    def _search_with_fallbacks(self, query_vector, query_text: str, top_k: int, min_hits: int) -> List:
+        """
+        Search with the narrowest domain filter first; widen only when it returns
+        fewer than min_hits. Hits of narrower levels keep their place at the top.
+
+        Args:
+            query_vector: Query embedding
+            query_text: Processed question (BM25)
+            top_k: Number of hits to retrieve
+            min_hits: Hits needed before widening stops
+
+        Returns:
+            List of RetrievalHit
+        """
+        fallbacks = self.get_filter_fallbacks() or [None]
+        hits = []
+        seen = set()
+        for level, filters in enumerate(fallbacks):
+            if level > 0:
+                get_metrics().counter(
+                    "rag_filter_widened_total", "Domain searches re-run with a wider filter"
+                ).inc()
+                logger.info(f"[{self.get_domain_name()}] {len(hits)} hits < {min_hits}, widening filter to {filters}")
+
+            for hit in self.retriever.search(
+                namespace=None,  # None = tìm tất cả namespaces (domain được chọn qua filters)
+                query_vector=query_vector,
+                top_k=top_k,
+                filters=filters,
+                query_text=query_text  # Cho BM25 (retrieval_mode lexical/hybrid)
+            ):
+                if hit.chunk_id not in seen and len(hits) < top_k:
+                    seen.add(hit.chunk_id)
+                    hits.append(hit)
+
+            if len(hits) >= min_hits:
+                break
+        return hits
+
     def _get_no_results_message(self) -> str:
         """
         Message mặc định khi không tìm thấy documents liên quan
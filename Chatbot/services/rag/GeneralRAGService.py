@@ -2,7 +2,7 @@
 GeneralRAGService - Fallback RAG service for general queries
 Handles: all other queries that don't match specific domains
 """
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
 from .BaseRAGService import BaseRAGService
 
@@ -82,20 +82,20 @@ class GeneralRAGService(BaseRAGService):
             "hãy khuyến nghị người dùng liên hệ phòng ban liên quan để được tư vấn chính xác."
         )
 
-    def postprocess_answer(self, answer: str) -> str:
+    def answer_addenda(self, answer: str) -> Tuple[str, str]:
         """
         Minimal postprocessing for general answers
         """
         # Add general contact info if answer seems incomplete
         if len(answer) < 100 or "không tìm thấy" in answer.lower():
-            answer += (
+            return "", (
                 "\n\n📞 Để biết thêm thông tin, bạn có thể:\n"
                 "- Website: https://ptit.edu.vn\n"
                 "- Hotline: 024.3577.1148\n"
                 "- Email: info@ptit.edu.vn"
             )
 
-        return answer
+        return "", ""
 
     def _get_no_results_message(self) -> str:
         """Custom no-results message for general domain"""
@@ -0,0 +1,372 @@
+"""
+MultiDomainRAGService - Trả lời câu hỏi thuộc nhiều domain cùng lúc
+Ví dụ: "học phí ngành An toàn thông tin tuyển sinh năm nay" → Học phí + Tuyển sinh
+
+Retrieval của các domain chạy chung: 1 lần embed_batch, 1 search_batch tới
+vector store (mỗi domain một query với filter riêng), 1 lượt hydrate.
+Hits được fuse (RRF) + dedupe dưới một token budget, rồi gọi LLM đúng 1 lần
+với instructions của tất cả domain → latency gần bằng câu hỏi một domain.
+"""
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import logging
+import time
+
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.dao.VectorIndexDAO import VectorQuery
+from Chatbot.services.RetrieverService import RetrieverService
+from Chatbot.utils.answer_stream import aiter_answer_events, apply_postprocess, iter_answer_events
+from Chatbot.utils.async_stages import run_in_stage
+from Chatbot.utils.deadline import Deadline
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.utils.rank_fusion import reciprocal_rank_fusion
+from Chatbot.utils.token_counter import fit_within_budget, stored_token_counts
+
+from .BaseRAGService import BaseRAGService
+
+logger = logging.getLogger(__name__)
+
+
+class MultiDomainRAGService:
+    """
+    Composite của nhiều domain services (kết quả của DomainRouterService.route_multi)
+
+    Mỗi domain giữ preprocessing, filters (kèm fallback nới filter),
+    prompt context và postprocessing riêng; chỉ retrieval và LLM call được gộp.
+    Trả về cùng dict format với BaseRAGService.answer.
+    """
+
+    def __init__(self, services: List[BaseRAGService], db, vectorizer, generator):
+        """
+        Args:
+            services: Domain services, domain khớp nhất đứng đầu
+            db: SQLAlchemy database session
+            vectorizer: VectorizerService singleton
+            generator: GeneratorService singleton
+        """
+        self.services = services
+        self.vectorizer = vectorizer
+        self.generator = generator
+        self.retriever = services[0].retriever if services else RetrieverService(db)
+
+    def get_domain_name(self) -> str:
+        return " + ".join(service.get_domain_name() for service in self.services)
+
+    def get_namespace(self) -> str:
+        return ",".join(dict.fromkeys(service.get_namespace() for service in self.services))
+
+    def preprocess_question(self, question: str) -> str:
+        """Preprocessing của domain chính (dùng làm key cho semantic answer cache)"""
+        return self.services[0].preprocess_question(question)
+
+    def postprocess_segment(self, segment: str) -> str:
+        """Format inline của từng domain, lần lượt"""
+        for service in self.services:
+            segment = service.postprocess_segment(segment)
+        return segment
+
+    def answer_addenda(self, answer: str) -> Tuple[str, str]:
+        """Prefix/suffix của từng domain (domain sau bọc ngoài domain trước)"""
+        prefix, suffix = "", ""
+        for service in self.services:
+            service_prefix, service_suffix = service.answer_addenda(answer)
+            prefix = service_prefix + prefix
+            suffix += service_suffix
+        return prefix, suffix
+
+    def postprocess_answer(self, answer: str) -> str:
+        return apply_postprocess(answer, self)
+
+    def answer(
+        self,
+        question: str,
+        top_k: int = 5,
+        token_budget: int = 2000,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict:
+        """
+        Multi-domain RAG pipeline
+
+        Args:
+            question: Câu hỏi của user
+            top_k: Số chunks dùng làm context (tổng, sau khi fuse)
+            token_budget: Giới hạn tokens cho context
+            conversation_history: Lịch sử hội thoại trước đó
+
+        Returns:
+            Dict với keys: answer, citations, domain, namespace, timings
+        """
+        hits, timings = self._retrieve(question, top_k)
+
+        if not hits:
+            return {
+                "answer": self.services[0]._get_no_results_message(),
+                "citations": [],
+                "domain": self.get_domain_name(),
+                "namespace": self.get_namespace(),
+                "timings": timings
+            }
+
+        # Bước 5: Một LLM call với instructions gộp của các domain
+        answer_text = self.generator.generate(
+            question=question,
+            contexts=self._build_contexts(hits, token_budget),
+            language="vi",
+            conversation_history=conversation_history,
+            system_context=self._combined_prompt_context()
+        )
+
+        # Bước 6: Postprocess lần lượt theo từng domain
+        answer_text = self.postprocess_answer(answer_text)
+
+        return {
+            "answer": answer_text,
+            "citations": hits,
+            "domain": self.get_domain_name(),
+            "namespace": self.get_namespace(),
+            "timings": timings
+        }
+
+    def answer_stream(
+        self,
+        question: str,
+        top_k: int = 5,
+        token_budget: int = 2000,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Streaming variant của answer() (cùng event format với BaseRAGService.answer_stream)
+
+        Yields:
+            ("citations", {...}), ("delta", {"text": ...})*, ("done", {...})
+        """
+        hits, timings = self._retrieve(question, top_k)
+        deltas = self.generator.generate_stream(
+            question=question,
+            contexts=self._build_contexts(hits, token_budget),
+            language="vi",
+            conversation_history=conversation_history,
+            system_context=self._combined_prompt_context()
+        ) if hits else iter(())
+
+        yield from iter_answer_events(
+            self,
+            hits,
+            deltas,
+            meta={"domain": self.get_domain_name(), "namespace": self.get_namespace(), "timings": timings},
+            no_results_message=self.services[0]._get_no_results_message()
+        )
+
+    async def aanswer(
+        self,
+        question: str,
+        top_k: int = 5,
+        token_budget: int = 2000,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """
+        Async variant của answer() (không block event loop)
+
+        Returns:
+            Dict với keys: answer, citations, domain, namespace, timings
+        """
+        hits, timings = await self._aretrieve(question, top_k)
+
+        if not hits:
+            return {
+                "answer": self.services[0]._get_no_results_message(),
+                "citations": [],
+                "domain": self.get_domain_name(),
+                "namespace": self.get_namespace(),
+                "timings": timings
+            }
+
+        llm_start = time.perf_counter()
+        answer_text = await self.generator.agenerate(
+            question=question,
+            contexts=self._build_contexts(hits, token_budget),
+            language="vi",
+            conversation_history=conversation_history,
+            system_context=self._combined_prompt_context(),
+            deadline=deadline
+        )
+        timings["llm_ms"] = round((time.perf_counter() - llm_start) * 1000, 2)
+
+        return {
+            "answer": self.postprocess_answer(answer_text),
+            "citations": hits,
+            "domain": self.get_domain_name(),
+            "namespace": self.get_namespace(),
+            "timings": timings
+        }
+
+    async def aanswer_stream(
+        self,
+        question: str,
+        top_k: int = 5,
+        token_budget: int = 2000,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Async variant của answer_stream() (cùng events)
+
+        Yields:
+            ("citations", {...}), ("delta", {"text": ...})*, ("done", {...})
+        """
+        hits, timings = await self._aretrieve(question, top_k)
+        deltas = self.generator.agenerate_stream(
+            question=question,
+            contexts=self._build_contexts(hits, token_budget),
+            language="vi",
+            conversation_history=conversation_history,
+            system_context=self._combined_prompt_context(),
+            deadline=deadline
+        ) if hits else None
+
+        async for event in aiter_answer_events(
+            self,
+            hits,
+            deltas,
+            meta={"domain": self.get_domain_name(), "namespace": self.get_namespace(), "timings": timings},
+            no_results_message=self.services[0]._get_no_results_message()
+        ):
+            yield event
+
+    def _retrieve(self, question: str, top_k: int) -> Tuple[List, Dict]:
+        """
+        Bước 1-3: embed, batched retrieval, fuse (+ rerank)
+
+        Returns:
+            (hits, timings)
+        """
+        # Bước 1: Preprocess theo từng domain, embed các câu hỏi khác nhau trong 1 batch
+        questions = [service.preprocess_question(question) for service in self.services]
+        unique_questions = list(dict.fromkeys(questions))
+        vectors = self.vectorizer.embed_batch(unique_questions)
+        return self._search_hits(question, questions, unique_questions, vectors, top_k)
+
+    async def _aretrieve(self, question: str, top_k: int) -> Tuple[List, Dict]:
+        """Async _retrieve: embed_batch và search_batch chạy trên stage thread pool"""
+        questions = [service.preprocess_question(question) for service in self.services]
+        unique_questions = list(dict.fromkeys(questions))
+        embed_start = time.perf_counter()
+        vectors = await run_in_stage("embed", self.vectorizer.embed_batch, unique_questions)
+        embed_ms = round((time.perf_counter() - embed_start) * 1000, 2)  # Includes the wait for a stage slot
+        hits, timings = await run_in_stage(
+            "retrieval", self._search_hits, question, questions, unique_questions, vectors, top_k
+        )
+        return hits, {"embed_ms": embed_ms, **timings}
+
+    def _search_hits(self, question: str, questions: List[str], unique_questions: List[str], vectors, top_k: int) -> Tuple[List, Dict]:
+        """
+        Bước 2-3: batched retrieval, fuse (+ rerank)
+
+        Returns:
+            (hits, timings)
+        """
+        config = get_rag_config()
+        rerank = config.enable_reranking
+        timings = {}
+        vector_of = {text: vectors[i] for i, text in enumerate(unique_questions)}
+
+        # Bước 2: Retrieve tất cả domains cùng lúc (mỗi vòng nới filter = 1 search_batch)
+        retrieval_start = time.perf_counter()
+        per_domain_k = max(top_k, config.rerank_candidates) if rerank else top_k
+        domain_hits = self._retrieve_all(questions, vector_of, per_domain_k, min_hits=top_k)
+        timings["retrieval_ms"] = round((time.perf_counter() - retrieval_start) * 1000, 2)
+
+        # Bước 3: Fuse (RRF, mỗi domain đóng góp công bằng) + dedupe theo chunk_id
+        hit_map = {}
+        for hits in domain_hits:
+            for hit in hits:
+                hit_map.setdefault(hit.chunk_id, hit)
+        fused = reciprocal_rank_fusion(
+            [[(hit.chunk_id, hit.score) for hit in hits] for hits in domain_hits],
+            k=config.rrf_k,
+            top_k=per_domain_k
+        )
+        hits = [hit_map[chunk_id].model_copy(update={"score": score}) for chunk_id, score in fused]
+
+        if rerank and hits:
+            rerank_start = time.perf_counter()
+            hits = self.retriever.rerank(hits, question, top_n=min(top_k, config.rerank_top_n))
+            timings["rerank_ms"] = round((time.perf_counter() - rerank_start) * 1000, 2)
+        else:
+            hits = hits[:top_k]
+
+        return hits, timings
+
+    def _build_contexts(self, hits: List, token_budget: int) -> List[str]:
+        """Bước 4: Một token budget chung cho context của mọi domain (token counts lưu lúc ingest, tokenizer của model sinh câu trả lời)"""
+        chunks = [hit.chunk for hit in hits if hit.chunk]
+        tokenizer = self.generator.tokenizer
+        return fit_within_budget(
+            [chunk["text"] for chunk in chunks],
+            token_budget=token_budget,
+            tokenizer=tokenizer,
+            token_counts=stored_token_counts(chunks, tokenizer)
+        )
+
+    def _retrieve_all(self, questions: List[str], vector_of: Dict, top_k: int, min_hits: int) -> List[List]:
+        """
+        Run every domain's search in one batch; domains with fewer than
+        min_hits hits move to their next (wider) filter in the following round
+
+        Returns:
+            One list of RetrievalHit per service, aligned with self.services
+        """
+        fallbacks = [service.get_filter_fallbacks() or [None] for service in self.services]
+        levels = [0] * len(self.services)
+        domain_hits: List[List] = [[] for _ in self.services]
+        seen = [set() for _ in self.services]
+        pending = list(range(len(self.services)))
+
+        while pending:
+            queries = [
+                VectorQuery(
+                    namespace=None,  # Domain được chọn qua filters (giống BaseRAGService)
+                    query_vector=vector_of[questions[i]],
+                    top_k=top_k,
+                    filters=fallbacks[i][levels[i]],
+                    query_text=questions[i]
+                )
+                for i in pending
+            ]
+            for i, results in zip(pending, self.retriever.search_batch(queries)):
+                for hit in results:
+                    if hit.chunk_id not in seen[i] and len(domain_hits[i]) < top_k:
+                        seen[i].add(hit.chunk_id)
+                        domain_hits[i].append(hit)
+
+            still_short = []
+            for i in pending:
+                if len(domain_hits[i]) < min_hits and levels[i] + 1 < len(fallbacks[i]):
+                    levels[i] += 1
+                    still_short.append(i)
+                    get_metrics().counter(
+                        "rag_filter_widened_total", "Domain searches re-run with a wider filter"
+                    ).inc()
+                    logger.info(
+                        f"[{self.services[i].get_domain_name()}] {len(domain_hits[i])} hits < {min_hits}, "
+                        f"widening filter to {fallbacks[i][levels[i]]}"
+                    )
+            pending = still_short
+
+        return domain_hits
+
+    def _combined_prompt_context(self) -> Optional[str]:
+        """Domain instructions gộp lại cho một LLM call"""
+        parts = [
+            f"[{service.get_domain_name()}] {context}"
+            for service in self.services
+            for context in [service.get_custom_prompt_context()]
+            if context
+        ]
+        if not parts:
+            return None
+        return (
+            f"Câu hỏi liên quan đến nhiều lĩnh vực: {self.get_domain_name()}. "
+            "Hãy trả lời đầy đủ từng khía cạnh, dựa trên tài liệu của lĩnh vực tương ứng.\n\n"
+            + "\n\n".join(parts)
+        )
@@ -2,7 +2,7 @@
 RegulationRAGService - RAG service specialized for academic regulations
 Handles: quy chế đào tạo, điều kiện tốt nghiệp, chuyên ngành, học lại, điểm
 """
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
 from .BaseRAGService import BaseRAGService
 
@@ -119,14 +119,16 @@ class RegulationRAGService(BaseRAGService):
             "qua email: daotao@ptit.edu.vn hoặc đến trực tiếp văn phòng phòng Đào tạo."
         )
 
-    def postprocess_answer(self, answer: str) -> str:
+    def answer_addenda(self, answer: str) -> Tuple[str, str]:
         """
         Postprocess regulation answers
-        Format citations and add disclaimer
+        Add disclaimer and highlight important warnings
         """
+        prefix, suffix = "", ""
+
         # Add regulatory disclaimer
         if "quy chế" in answer.lower() or "quy định" in answer.lower():
-            answer += (
+            suffix = (
                 "\n\n📋 Lưu ý: Thông tin trên dựa trên quy chế đào tạo hiện hành. "
                 "Quy chế có thể được cập nhật theo quyết định của Hội đồng Trường. "
                 "Vui lòng kiểm tra phiên bản mới nhất tại phòng Đào tạo hoặc website chính thức."
@@ -141,9 +143,9 @@ class RegulationRAGService(BaseRAGService):
         ]
 
         if any(keyword in answer.lower() for keyword in warning_keywords):
-            answer = "⚠️ QUAN TRỌNG: " + answer
+            prefix = "⚠️ QUAN TRỌNG: "
 
-        return answer
+        return prefix, suffix
 
     def _get_no_results_message(self) -> str:
         """Custom no-results message for regulation domain"""
@@ -2,7 +2,7 @@
 TuitionRAGService - RAG service specialized for tuition and financial queries
 Handles: học phí, chi phí, lệ phí, học bổng, miễn giảm
 """
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 
 from .BaseRAGService import BaseRAGService
@@ -139,12 +139,10 @@ class TuitionRAGService(BaseRAGService):
             "qua email: taichinh@ptit.edu.vn hoặc trực tiếp tại văn phòng phòng Tài chính."
         )
 
-    def postprocess_answer(self, answer: str) -> str:
+    def postprocess_segment(self, segment: str) -> str:
         """
-        Postprocess tuition answers
-        Format currency values and add disclaimer
+        Format currency values (add thousands separator)
         """
-        # Format currency (add thousands separator)
         import re
 
         # Find currency patterns (numbers followed by đồng/VNĐ)
@@ -156,16 +154,19 @@ class TuitionRAGService(BaseRAGService):
             except ValueError:
                 return match.group(0)
 
-        answer = re.sub(r'(\d+(?:[.,]\d+)*)\s*(?:đồng|VNĐ)', format_currency, answer)
+        return re.sub(r'(\d+(?:[.,]\d+)*)\s*(?:đồng|VNĐ)', format_currency, segment)
 
-        # Add disclaimer about policy changes
+    def answer_addenda(self, answer: str) -> Tuple[str, str]:
+        """
+        Add disclaimer about policy changes
+        """
         if "học phí" in answer.lower() or "chi phí" in answer.lower():
-            answer += (
+            return "", (
                 "\n\n⚠️ Lưu ý: Học phí có thể thay đổi theo quy định của nhà trường và cơ quan quản lý. "
                 "Vui lòng kiểm tra thông tin mới nhất tại phòng Tài chính."
             )
 
-        return answer
+        return "", ""
 
     def _get_no_results_message(self) -> str:
         """Custom no-results message for tuition domain"""
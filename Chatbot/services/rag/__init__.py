@@ -8,11 +8,13 @@ from .AdmissionRAGService import AdmissionRAGService
 from .TuitionRAGService import TuitionRAGService
 from .RegulationRAGService import RegulationRAGService
 from .GeneralRAGService import GeneralRAGService
+from .MultiDomainRAGService import MultiDomainRAGService
 
 __all__ = [
     "BaseRAGService",
     "AdmissionRAGService",
     "TuitionRAGService",
     "RegulationRAGService",
-    "GeneralRAGService"
+    "GeneralRAGService",
+    "MultiDomainRAGService"
 ]
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Seed / maintain the local vector index (vector_store_type = "local" or VECTOR_FAILOVER)
+
+Copy toàn bộ vectors + payloads từ collection Qdrant đang phục vụ sang
+local store (data/vector_store/<collection>/), để failover có dữ liệu ngay
+hoặc để chuyển một deployment nhỏ sang backend local. Không cần embed lại.
+
+Usage:
+  python -m Chatbot.sync_local_vectors                 # copy Qdrant → local (upsert)
+  python -m Chatbot.sync_local_vectors --rebuild       # xóa local store rồi copy lại
+  python -m Chatbot.sync_local_vectors --compact       # chỉ dọn tombstones của local store
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import logging
+
+import numpy as np
+
+# Fix Windows console encoding
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from Chatbot.config.rag_config import get_rag_config
+from Chatbot.dao.VectorIndexDAO import VectorIndexDAO
+from Chatbot.dao.LocalVectorIndexDAO import LocalVectorIndexDAO
+
+logger = logging.getLogger(__name__)
+
+
+def copy_from_qdrant(qdrant: VectorIndexDAO, local: LocalVectorIndexDAO, batch_size: int) -> int:
+    """Scroll every point (vector + payload) from Qdrant into the local store"""
+    total = 0
+    offset = None
+    start = time.perf_counter()
+    while True:
+        points, offset = qdrant._client.scroll(
+            collection_name=qdrant.collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        by_namespace = {}
+        for point in points:
+            payload = dict(point.payload or {})
+            chunk_id = payload.pop("chunk_id", None)
+            if not chunk_id:
+                continue
+            namespace = payload.pop("namespace", None)
+            by_namespace.setdefault(namespace, []).append((chunk_id, np.asarray(point.vector, dtype=np.float32), payload))
+
+        for namespace, rows in by_namespace.items():
+            local.upsert(namespace, [(cid, vec) for cid, vec, _ in rows], [payload for _, _, payload in rows])
+        total += len(points)
+        print(f"   {total} points copied ({total / (time.perf_counter() - start):.0f} points/s)")
+
+        if offset is None:
+            return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy the Qdrant collection into the local vector index")
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--rebuild", action="store_true", help="Delete the local store before copying")
+    parser.add_argument("--compact", action="store_true", help="Only drop tombstoned rows from the local store")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    qdrant = VectorIndexDAO()
+    # Local store must match the collection being copied (same model fingerprint)
+    if args.rebuild:
+        target = os.path.join(
+            get_rag_config().vector_store_path,
+            VectorIndexDAO.physical_name(qdrant.alias_name, qdrant.fingerprint)
+        )
+        shutil.rmtree(target, ignore_errors=True)
+        print(f"🗑️  Removed {target}")
+    local = LocalVectorIndexDAO(fingerprint=qdrant.fingerprint)
+    if local._store is None:
+        print("❌ Local vector store could not be opened")
+        sys.exit(1)
+
+    if args.compact:
+        kept = local._store.compact()
+        print(f"✅ Compacted {local.host}: {kept} rows kept")
+        return
+
+    if qdrant._client is None:
+        print("❌ Qdrant not available - nothing to copy")
+        sys.exit(1)
+
+    print(f"Source: Qdrant {qdrant.collection_name}")
+    print(f"Target: {local.host}")
+    total = copy_from_qdrant(qdrant, local, args.batch_size)
+    print(f"✅ Copied {total} points, local store: {local.get_stats()['points_count']} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from .chunker import chunk_text
+from .chunker import chunk_text, iter_chunks
 from .token_counter import count_tokens, estimate_tokens
 
-__all__ = ["chunk_text", "count_tokens", "estimate_tokens"]
+__all__ = ["chunk_text", "iter_chunks", "count_tokens", "estimate_tokens"]
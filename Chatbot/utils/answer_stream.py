@@ -0,0 +1,205 @@
+"""
+Streaming answer helpers
+Domain postprocessing áp dụng tăng dần trên stream token của LLM:
+
+- postprocess_segment(segment): format inline (ví dụ tiền tệ "1000000 đồng"),
+  áp dụng cho từng đoạn đã hoàn chỉnh (kết thúc bằng xuống dòng hoặc dấu câu
+  + khoảng trắng) nên không bao giờ cắt ngang một pattern trong câu
+- answer_addenda(answer): (prefix, suffix) quyết định khi đã có toàn bộ câu
+  trả lời (disclaimer, thông tin liên hệ). Suffix được stream ở cuối; prefix
+  không thể chèn ngược nên nằm trong event "done" (answer đầy đủ)
+
+postprocess_answer() mặc định = cùng 2 hook đó trên câu trả lời đầy đủ, nên
+/answer và /answer/stream cho ra cùng một nội dung.
+"""
+import json
+import re
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# A segment ends after a newline, or after sentence punctuation followed by whitespace
+_BOUNDARY = re.compile(r"\n|[.!?:;](?=\s)")
+
+
+def split_segments(text: str) -> List[str]:
+    """
+    Split text into postprocessing segments (same boundaries as the stream)
+
+    Args:
+        text: Answer text
+
+    Returns:
+        Segments whose concatenation is text
+    """
+    segments = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        segments.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        segments.append(text[start:])
+    return segments
+
+
+def apply_postprocess(answer: str, postprocessor) -> str:
+    """
+    Postprocess a complete answer with the segment + addenda hooks
+
+    Args:
+        answer: Raw LLM answer
+        postprocessor: Object with postprocess_segment() and answer_addenda()
+
+    Returns:
+        Postprocessed answer
+    """
+    body = "".join(postprocessor.postprocess_segment(segment) for segment in split_segments(answer))
+    prefix, suffix = postprocessor.answer_addenda(body)
+    return prefix + body + suffix
+
+
+class AnswerStreamFormatter:
+    """
+    Incremental postprocessing of LLM deltas
+
+    feed() buffers deltas up to the last segment boundary and returns the
+    formatted complete segments; finish() flushes the tail and the suffix.
+    """
+
+    def __init__(self, postprocessor, max_pending_chars: int = 300):
+        """
+        Args:
+            postprocessor: Object with postprocess_segment() and answer_addenda()
+            max_pending_chars: Flush at the last whitespace when no boundary
+                arrives for this many characters (keeps tokens flowing)
+        """
+        self.postprocessor = postprocessor
+        self.max_pending_chars = max_pending_chars
+        self.prefix = ""
+        self._pending = ""
+        self._body: List[str] = []
+        self._answer: Optional[str] = None
+
+    def feed(self, delta: str) -> str:
+        """
+        Add an LLM delta
+
+        Returns:
+            Formatted text ready to send ("" while a segment is incomplete)
+        """
+        self._pending += delta
+        cut = 0
+        for match in _BOUNDARY.finditer(self._pending):
+            cut = match.end()
+        if cut == 0 and len(self._pending) > self.max_pending_chars:
+            cut = max(self._pending.rfind(" "), self._pending.rfind("\t")) + 1
+        if cut == 0:
+            return ""
+
+        ready, self._pending = self._pending[:cut], self._pending[cut:]
+        return self._format(ready)
+
+    def finish(self) -> str:
+        """
+        End of the LLM stream
+
+        Returns:
+            Formatted tail + suffix (prefix is available as self.prefix)
+        """
+        tail = self._format(self._pending)
+        self._pending = ""
+        body = "".join(self._body)
+        self.prefix, suffix = self.postprocessor.answer_addenda(body)
+        self._answer = self.prefix + body + suffix
+        return tail + suffix
+
+    @property
+    def answer(self) -> Optional[str]:
+        """Full postprocessed answer (after finish())"""
+        return self._answer
+
+    def _format(self, text: str) -> str:
+        formatted = "".join(self.postprocessor.postprocess_segment(segment) for segment in split_segments(text))
+        self._body.append(formatted)
+        return formatted
+
+
+def iter_answer_events(
+    postprocessor,
+    hits: List,
+    deltas: Iterable[str],
+    meta: Dict,
+    no_results_message: str
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Answer stream events: citations → delta* → done
+
+    Args:
+        postprocessor: Domain service (postprocess_segment / answer_addenda)
+        hits: Retrieved RetrievalHits (citations)
+        deltas: Lazy iterator of LLM text deltas (not consumed when hits is empty)
+        meta: domain, namespace, timings for the final event
+        no_results_message: Answer sent when there are no hits
+
+    Yields:
+        (event name, JSON-serializable data)
+    """
+    yield "citations", {"citations": [hit.model_dump(mode="json") for hit in hits]}
+
+    if not hits:
+        yield "delta", {"text": no_results_message}
+        yield "done", {"answer": no_results_message, "prefix": "", **meta}
+        return
+
+    formatter = AnswerStreamFormatter(postprocessor)
+    for delta in deltas:
+        text = formatter.feed(delta)
+        if text:
+            yield "delta", {"text": text}
+    text = formatter.finish()
+    if text:
+        yield "delta", {"text": text}
+    yield "done", {"answer": formatter.answer, "prefix": formatter.prefix, **meta}
+
+
+async def aiter_answer_events(
+    postprocessor,
+    hits: List,
+    deltas: AsyncIterable[str],
+    meta: Dict,
+    no_results_message: str
+) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Async variant of iter_answer_events (deltas from an async LLM stream)
+
+    Yields:
+        (event name, JSON-serializable data)
+    """
+    yield "citations", {"citations": [hit.model_dump(mode="json") for hit in hits]}
+
+    if not hits:
+        yield "delta", {"text": no_results_message}
+        yield "done", {"answer": no_results_message, "prefix": "", **meta}
+        return
+
+    formatter = AnswerStreamFormatter(postprocessor)
+    async for delta in deltas:
+        text = formatter.feed(delta)
+        if text:
+            yield "delta", {"text": text}
+    text = formatter.finish()
+    if text:
+        yield "delta", {"text": text}
+    yield "done", {"answer": formatter.answer, "prefix": formatter.prefix, **meta}
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """
+    Server-Sent Events frame
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        "event: ...\\ndata: ...\\n\\n"
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,104 @@
+"""
+Async pipeline stages - chạy các bước blocking ngoài event loop
+Embedding (torch/ONNX), Qdrant + SQLAlchemy hydration (sync clients) chạy trên
+một thread pool dùng chung; mỗi stage có giới hạn concurrency riêng
+(RAGConfig.async_*_concurrency) để một stage chậm không chiếm hết pool.
+LLM calls dùng client async thật (ModelClient.acomplete/astream), stage "llm"
+chỉ giới hạn số request đồng thời tới provider.
+
+Cách dùng:
+    vector = await run_in_stage("embed", vectorizer.embed, question)
+    async with stage_slot("llm"):
+        answer = await client.acomplete(...)
+"""
+import asyncio
+import contextlib
+import functools
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+
+from Chatbot.utils.metrics import get_metrics
+
+T = TypeVar("T")
+
+STAGES = ("embed", "retrieval", "llm")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Semaphores belong to an event loop: one set per running loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """
+    Thread pool shared by the blocking stages (sized by config.async_executor_workers)
+
+    Returns:
+        ThreadPoolExecutor instance
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from Chatbot.config.rag_config import get_rag_config
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_rag_config().async_executor_workers,
+                    thread_name_prefix="rag-stage"
+                )
+    return _executor
+
+
+def _stage_limit(stage: str) -> int:
+    from Chatbot.config.rag_config import get_rag_config
+    config = get_rag_config()
+    return {
+        "embed": config.async_embed_concurrency,
+        "retrieval": config.async_retrieval_concurrency,
+        "llm": config.async_llm_concurrency,
+    }[stage]
+
+
+def _semaphore(stage: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphores = _semaphores.setdefault(loop, {})
+    if stage not in semaphores:
+        semaphores[stage] = asyncio.Semaphore(_stage_limit(stage))
+    return semaphores[stage]
+
+
+@contextlib.asynccontextmanager
+async def stage_slot(stage: str):
+    """
+    Hold one concurrency slot of a stage (waits when the stage is saturated)
+
+    Args:
+        stage: "embed", "retrieval" or "llm"
+    """
+    wait_hist = get_metrics().histogram(
+        f"rag_{stage}_stage_wait_seconds", f"Time waiting for a free {stage} stage slot"
+    )
+    start = time.perf_counter()
+    async with _semaphore(stage):
+        wait_hist.observe(time.perf_counter() - start)
+        yield
+
+
+async def run_in_stage(stage: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking function on the stage thread pool, within the stage's limit
+
+    Args:
+        stage: "embed", "retrieval" or "llm"
+        fn: Blocking callable
+        *args, **kwargs: Arguments for fn
+
+    Returns:
+        fn's result (exceptions propagate)
+    """
+    async with stage_slot(stage):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_stage_executor(), functools.partial(fn, *args, **kwargs))
@@ -1,7 +1,7 @@
 """
 Text chunking utilities for splitting documents into smaller pieces
 """
-from typing import List
+from typing import Iterator, List
 import re
 
 
@@ -23,16 +23,35 @@ def chunk_text(
     Returns:
         List of text chunks
     """
-    if not text or not text.strip():
-        return []
+    return list(iter_chunks(text, chunk_size, chunk_overlap, separator))
 
-    # First, try to split by separator (paragraphs)
-    paragraphs = text.split(separator)
 
-    chunks = []
+def iter_chunks(
+    text: str,
+    chunk_size: int = 512,
+    chunk_overlap: int = 50,
+    separator: str = "\n\n"
+) -> Iterator[str]:
+    """
+    Lazily split text into chunks with overlap (same output as chunk_text)
+    Lets ingest embed/store chunks window by window instead of all at once
+
+    Args:
+        text: Input text to split
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Number of overlapping characters between chunks
+        separator: Primary separator to split on (paragraphs by default)
+
+    Yields:
+        Text chunks in document order
+    """
+    if not text or not text.strip():
+        return
+
     current_chunk = ""
 
-    for para in paragraphs:
+    # First, try to split by separator (paragraphs)
+    for para in _iter_split(text, separator):
         para = para.strip()
         if not para:
             continue
@@ -40,7 +59,7 @@ def chunk_text(
         # If adding this paragraph exceeds chunk_size
         if len(current_chunk) + len(para) + len(separator) > chunk_size:
             if current_chunk:
-                chunks.append(current_chunk.strip())
+                yield current_chunk.strip()
                 # Add overlap from the end of current chunk
                 overlap_text = current_chunk[-chunk_overlap:] if chunk_overlap > 0 else ""
                 current_chunk = overlap_text + separator + para
@@ -51,12 +70,12 @@ def chunk_text(
                 for sent in sentences:
                     if len(temp_chunk) + len(sent) > chunk_size:
                         if temp_chunk:
-                            chunks.append(temp_chunk.strip())
+                            yield temp_chunk.strip()
                             overlap_text = temp_chunk[-chunk_overlap:] if chunk_overlap > 0 else ""
                             temp_chunk = overlap_text + " " + sent
                         else:
                             # Even single sentence is too large, hard split
-                            chunks.append(sent[:chunk_size])
+                            yield sent[:chunk_size]
                             temp_chunk = sent[chunk_size - chunk_overlap:] if len(sent) > chunk_size else ""
                     else:
                         temp_chunk += " " + sent if temp_chunk else sent
@@ -68,9 +87,19 @@ def chunk_text(
 
     # Add the last chunk
     if current_chunk:
-        chunks.append(current_chunk.strip())
-
-    return chunks
+        yield current_chunk.strip()
+
+
+def _iter_split(text: str, separator: str) -> Iterator[str]:
+    """Lazy equivalent of text.split(separator)"""
+    start = 0
+    while True:
+        end = text.find(separator, start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + len(separator)
 
 
 def split_into_sentences(text: str) -> List[str]:
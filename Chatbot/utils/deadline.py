@@ -0,0 +1,69 @@
+"""
+Request deadlines
+Caller (BE) gửi thời gian còn lại (AnswerRequest.deadline_ms); deadline được
+truyền xuống tới lời gọi LLM, nên một provider chậm không vượt quá timeout
+của caller: hết budget thì dừng chờ và chuyển sang model fallback.
+
+Cách dùng:
+    deadline = Deadline(25.0)
+    answer = await asyncio.wait_for(call(), deadline.budget(reserve=5.0))
+"""
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when no time is left in a request deadline"""
+
+
+class Deadline:
+    """Absolute point in time (monotonic clock) by which a request must finish"""
+
+    def __init__(self, timeout: float):
+        """
+        Args:
+            timeout: Seconds from now
+        """
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    @classmethod
+    def from_ms(cls, timeout_ms: Optional[float], default: float) -> "Deadline":
+        """
+        Deadline from a caller-supplied budget in milliseconds
+
+        Args:
+            timeout_ms: Remaining time sent by the caller (None = default)
+            default: Seconds when the caller sends none
+
+        Returns:
+            Deadline instance
+        """
+        return cls(timeout_ms / 1000.0 if timeout_ms else default)
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired)"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def budget(self, reserve: float = 0.0, cap: Optional[float] = None) -> float:
+        """
+        Seconds available for one step
+
+        Args:
+            reserve: Seconds kept for later steps (e.g. the fallback model)
+            cap: Upper bound (e.g. the per-call LLM timeout)
+
+        Returns:
+            Positive number of seconds
+
+        Raises:
+            DeadlineExceeded: No time left after the reserve
+        """
+        seconds = self.remaining() - reserve
+        if seconds <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.timeout:.1f}s exceeded")
+        return min(seconds, cap) if cap else seconds
@@ -0,0 +1,53 @@
+"""
+Embedding model fingerprint utilities
+A fingerprint (model name, dimension, normalization) identifies which model
+produced a vector, so collections/points from different models never mix
+"""
+import hashlib
+from typing import Dict, Optional
+
+
+def make_fingerprint(model: str, dimension: int, normalize: Optional[bool]) -> Dict:
+    """
+    Build an embedding fingerprint
+
+    Args:
+        model: Embedding model name
+        dimension: Vector dimension
+        normalize: Whether vectors are L2-normalized (None = unknown)
+
+    Returns:
+        Dict with model, dimension, normalize and a short stable id
+    """
+    raw = f"{model}|{dimension}|{normalize}"
+    return {
+        "model": model,
+        "dimension": int(dimension),
+        "normalize": normalize,
+        "id": hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12],
+    }
+
+
+# Fingerprint of the model loaded in this process (set by the vectorizer)
+_active_fingerprint: Optional[Dict] = None
+
+
+def set_active_fingerprint(fingerprint: Dict):
+    """Register the fingerprint of the live embedding model"""
+    global _active_fingerprint
+    _active_fingerprint = fingerprint
+
+
+def get_active_fingerprint() -> Dict:
+    """
+    Fingerprint of the live embedding model
+    Falls back to config values before a model has been loaded
+
+    Returns:
+        Fingerprint dict
+    """
+    if _active_fingerprint is not None:
+        return _active_fingerprint
+    from Chatbot.config.rag_config import get_rag_config
+    config = get_rag_config()
+    return make_fingerprint(config.embedding_model, config.embedding_dimension, None)
@@ -0,0 +1,229 @@
+"""
+In-process metrics registry for the RAG system
+Lightweight histograms and counters, exported via /api/rag/metrics
+(JSON snapshot or Prometheus text exposition format)
+"""
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence
+
+
+# Default buckets cover sub-millisecond to multi-second latencies (seconds)
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+# Buckets for batch sizes / item counts
+DEFAULT_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed bucket boundaries
+    Thread-safe, constant memory regardless of observation count
+    """
+
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets: List[float] = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """
+        Record one observation
+
+        Args:
+            value: Observed value (seconds for latencies, items for sizes)
+        """
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile from bucket counts (upper bound of the bucket)
+
+        A quantile in the overflow (+Inf) bucket is reported as the largest
+        finite bound, i.e. "at least this much": JSON has no infinity, and
+        the +Inf bucket itself only appears in the Prometheus output.
+
+        Args:
+            q: Quantile in [0, 1] (e.g. 0.99 for p99)
+
+        Returns:
+            Estimated value or None if there are no observations
+        """
+        with self._lock:
+            if self._count == 0:
+                return None
+            target = q * self._count
+            running = 0
+            for i, c in enumerate(self._counts):
+                running += c
+                if running >= target:
+                    return self.buckets[min(i, len(self.buckets) - 1)]
+        return None
+
+    def snapshot(self) -> Dict:
+        """Return a JSON-serializable view of the histogram"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative = []
+        running = 0
+        for bound, c in zip(self.buckets + [float("inf")], counts):
+            running += c
+            cumulative.append({"le": "+Inf" if bound == float("inf") else bound, "count": running})
+
+        return {
+            "type": "histogram",
+            "description": self.description,
+            "count": count,
+            "sum": total,
+            "avg": (total / count) if count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": cumulative,
+        }
+
+
+class Counter:
+    """Monotonically increasing counter (thread-safe)"""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        """Increment counter by amount"""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict:
+        return {"type": "counter", "description": self.description, "value": self._value}
+
+
+class Gauge:
+    """Point-in-time value that can go up and down (thread-safe)"""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        """Set gauge to value"""
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict:
+        return {"type": "gauge", "description": self.description, "value": self._value}
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of named metrics
+    Metrics are created on first use and reused afterwards
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = factory()
+                    self._metrics[name] = metric
+        return metric
+
+    def histogram(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, description, buckets))
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description))
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, description))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Get JSON snapshot of all metrics
+
+        Returns:
+            Dict mapping metric name to its snapshot
+        """
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in Prometheus text exposition format
+
+        Returns:
+            Text payload for a /metrics scrape
+        """
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            snap = metric.snapshot()
+            if snap.get("description"):
+                lines.append(f"# HELP {name} {snap['description']}")
+            lines.append(f"# TYPE {name} {snap['type']}")
+            if snap["type"] == "histogram":
+                for bucket in snap["buckets"]:
+                    lines.append(f'{name}_bucket{{le="{bucket["le"]}"}} {bucket["count"]}')
+                lines.append(f"{name}_sum {snap['sum']}")
+                lines.append(f"{name}_count {snap['count']}")
+            else:
+                lines.append(f"{name} {snap['value']}")
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get metrics registry singleton
+
+    Returns:
+        MetricsRegistry instance
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
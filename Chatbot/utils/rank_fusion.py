@@ -0,0 +1,43 @@
+"""
+Rank fusion utilities
+Merge ranked result lists from different retrievers (vector, BM25, ...)
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[List[Tuple[str, float]]],
+    k: int = 60,
+    top_k: Optional[int] = None
+) -> List[Tuple[str, float]]:
+    """
+    Reciprocal Rank Fusion: score(d) = Σ 1 / (k + rank_i(d))
+    Only ranks are used, so BM25 and cosine scores need no calibration.
+
+    Scores are scaled to 0-1 (1.0 = ranked first by every retriever) to stay
+    comparable with similarity scores in RetrievalHit.
+
+    Args:
+        rankings: Ranked lists of (id, score), best first
+        k: RRF constant (higher = flatter weighting of top ranks)
+        top_k: Number of results to return (None = all)
+
+    Returns:
+        List of (id, fused_score) tuples, sorted by fused score descending
+    """
+    fused: Dict[str, float] = {}
+    lists = [ranking for ranking in rankings if ranking]
+    for ranking in lists:
+        for rank, (item_id, _) in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+
+    if not fused:
+        return []
+
+    best_possible = len(lists) / (k + 1)
+    results = sorted(
+        ((item_id, score / best_possible) for item_id, score in fused.items()),
+        key=lambda pair: pair[1],
+        reverse=True
+    )
+    return results[:top_k] if top_k is not None else results
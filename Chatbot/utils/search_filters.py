@@ -0,0 +1,165 @@
+"""
+Search filters - translate domain filter dicts into vector store conditions
+
+Domain services describe their scope with plain dicts (get_search_filters):
+    {"category": "tuition", "academic_year": "2024-2025"}
+    {"category": "admission", "year_range": [2023, 2024, 2025]}
+
+normalize_filters() turns such a dict into {payload field: allowed values};
+to_qdrant_filter() builds the Qdrant Filter, payload_matches() evaluates the
+same conditions in Python (local vector store, lexical candidates).
+Keys without an indexed payload field are ignored.
+"""
+import json
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Payload fields that can be filtered on (and get a Qdrant payload index)
+FILTER_FIELDS = {
+    "namespace": "keyword",
+    "category": "keyword",
+    "academic_year": "keyword",
+    "document_id": "keyword",
+    "year": "integer",
+}
+
+# Filter dict keys that map onto another payload field
+_KEY_ALIASES = {"year_range": "year"}
+
+# Keys dropped first when a filtered search is too narrow (time scope before domain scope)
+TEMPORAL_KEYS = ("academic_year", "year", "year_range")
+
+_warned_keys = set()
+
+
+def _coerce(field: str, value):
+    """Payload value in the type stored/indexed for the field"""
+    if FILTER_FIELDS[field] == "integer":
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return str(value)
+
+
+def normalize_filters(filters: Optional[Dict]) -> Dict[str, List]:
+    """
+    Map a domain filter dict onto indexed payload fields
+
+    Args:
+        filters: Filter dict from get_search_filters() (or None)
+
+    Returns:
+        Dict payload field → allowed values (empty = no filtering)
+    """
+    conditions: Dict[str, List] = {}
+    for key, value in (filters or {}).items():
+        field = _KEY_ALIASES.get(key, key)
+        if field not in FILTER_FIELDS:
+            if key not in _warned_keys:
+                _warned_keys.add(key)
+                logger.warning(f"Search filter '{key}' has no payload index - ignored")
+            continue
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        values = [v for v in (_coerce(field, v) for v in values) if v is not None]
+        if values:
+            conditions[field] = list(dict.fromkeys(values))
+    return conditions
+
+
+def to_qdrant_filter(namespace: Optional[str], filters: Optional[Dict]):
+    """
+    Build the Qdrant Filter for a search
+
+    Args:
+        namespace: Namespace to restrict to (None = all)
+        filters: Domain filter dict (or None)
+
+    Returns:
+        qdrant_client.models.Filter, or None when nothing is filtered
+    """
+    from qdrant_client.models import Filter, FieldCondition, MatchAny, MatchValue
+
+    conditions = normalize_filters(filters)
+    if namespace:
+        conditions["namespace"] = [namespace]
+    if not conditions:
+        return None
+
+    must = []
+    for field, values in conditions.items():
+        match = MatchValue(value=values[0]) if len(values) == 1 else MatchAny(any=values)
+        must.append(FieldCondition(key=field, match=match))
+    return Filter(must=must)
+
+
+def payload_matches(payload: Optional[Dict], conditions: Dict[str, List]) -> bool:
+    """
+    Check a point payload against normalized conditions (Python-side filtering)
+
+    Args:
+        payload: Point payload (missing fields never match)
+        conditions: Output of normalize_filters()
+
+    Returns:
+        True if every condition is satisfied
+    """
+    payload = payload or {}
+    for field, values in conditions.items():
+        value = payload.get(field)
+        if value is None or _coerce(field, value) not in values:
+            return False
+    return True
+
+
+def document_filter_fields(document) -> Dict:
+    """
+    Filterable payload fields of a document (category + metadata year / academic_year)
+
+    Args:
+        document: Document model (or None)
+
+    Returns:
+        Dict with category, year, academic_year (None when unknown)
+    """
+    fields = {"category": None, "year": None, "academic_year": None}
+    if document is None:
+        return fields
+
+    fields["category"] = document.category
+    try:
+        metadata = json.loads(document.metadata_json) if document.metadata_json else {}
+    except (TypeError, ValueError):
+        metadata = {}
+    if isinstance(metadata, dict):
+        if metadata.get("year") is not None:
+            fields["year"] = _coerce("year", metadata["year"])
+        if metadata.get("academic_year"):
+            fields["academic_year"] = str(metadata["academic_year"])
+    return fields
+
+
+def widen_filters(filters: Optional[Dict]) -> List[Optional[Dict]]:
+    """
+    Default fallback chain for a domain filter, narrowest first:
+    full filter → without time scope → no filter
+
+    Args:
+        filters: Domain filter dict (or None)
+
+    Returns:
+        List of filter dicts to try in order (always ends with None)
+    """
+    if not filters:
+        return [None]
+
+    chain: List[Optional[Dict]] = [dict(filters)]
+    without_time = {k: v for k, v in filters.items() if k not in TEMPORAL_KEYS}
+    if without_time and without_time != filters:
+        chain.append(without_time)
+    chain.append(None)
+    return chain
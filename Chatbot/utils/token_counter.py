@@ -1,7 +1,16 @@
 """
 Token counting utilities for text
+Context packing dùng tokenizer thật của LLM (utils/tokenizers) và token
+counts đã lưu theo chunk lúc ingest (chunk_token_counts), chỉ đếm lại
+những chunk chưa có count cho tokenizer đó.
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from Chatbot.utils.metrics import get_metrics
+from Chatbot.utils.tokenizers import Tokenizer, get_tokenizer, get_tokenizer_for_model
+
+# Marker appended to a context cut at the budget
+TRUNCATION_MARKER = "..."
 
 
 def count_tokens(text: str, method: str = "estimate") -> int:
@@ -10,28 +19,24 @@ def count_tokens(text: str, method: str = "estimate") -> int:
 
     Args:
         text: Input text
-        method: "estimate" (fast approximation) or "tiktoken" (accurate but requires library)
+        method: "estimate" (fast approximation), "tiktoken" (cl100k_base, local
+                tokenizer when tiktoken is unavailable) or "model" (config.llm_model's tokenizer)
 
     Returns:
-        Estimated token count
+        Token count
     """
-    if method == "estimate":
-        return estimate_tokens(text)
-    elif method == "tiktoken":
-        try:
-            import tiktoken
-            encoding = tiktoken.get_encoding("cl100k_base")  # GPT-4 encoding
-            return len(encoding.encode(text))
-        except ImportError:
-            # Fallback to estimation if tiktoken not installed
-            return estimate_tokens(text)
+    if method == "tiktoken":
+        return get_tokenizer("cl100k_base").count(text)
+    elif method == "model":
+        return get_tokenizer_for_model().count(text)
     else:
         return estimate_tokens(text)
 
 
 def estimate_tokens(text: str) -> int:
     """
-    Fast token estimation without external libraries
+    Fast token estimation without external libraries (rough - use a Tokenizer
+    for anything sent to the LLM)
     Rough rule: 1 token ≈ 4 characters (for English)
     For Vietnamese: 1 token ≈ 3-4 characters
 
@@ -53,22 +58,31 @@ def estimate_tokens(text: str) -> int:
     return estimated_tokens
 
 
-def fit_within_budget(texts: List[str], token_budget: int) -> List[str]:
+def fit_within_budget(
+    texts: List[str],
+    token_budget: int,
+    tokenizer: Optional[Tokenizer] = None,
+    token_counts: Optional[List[Optional[int]]] = None
+) -> List[str]:
     """
-    Select texts that fit within a token budget
+    Select texts that fit within a token budget (in order)
+    The first text that doesn't fit is cut to the remaining budget, marker included.
 
     Args:
         texts: List of text strings
         token_budget: Maximum total tokens allowed
+        tokenizer: Tokenizer of the target LLM (None = config.llm_model's)
+        token_counts: Stored token counts aligned with texts (None entries are counted)
 
     Returns:
         Subset of texts that fit within budget
     """
+    tokenizer = tokenizer or get_tokenizer_for_model()
     result = []
     total_tokens = 0
 
-    for text in texts:
-        text_tokens = estimate_tokens(text)
+    for i, text in enumerate(texts):
+        text_tokens = token_counts[i] if token_counts and token_counts[i] is not None else tokenizer.count(text)
         if total_tokens + text_tokens <= token_budget:
             result.append(text)
             total_tokens += text_tokens
@@ -76,22 +90,42 @@ def fit_within_budget(texts: List[str], token_budget: int) -> List[str]:
             # If we can fit a partial text, truncate it
             remaining = token_budget - total_tokens
             if remaining > 50:  # Only if we have meaningful space left
-                # Approximate character count for remaining tokens
-                chars_remaining = int(remaining / 1.3 * 5)  # rough conversion
-                result.append(text[:chars_remaining] + "...")
+                head = tokenizer.truncate(text, remaining - tokenizer.count(TRUNCATION_MARKER))
+                result.append(head + TRUNCATION_MARKER)
             break
 
     return result
 
 
-def count_tokens_batch(texts: List[str]) -> List[int]:
+def stored_token_counts(chunks: List[Dict], tokenizer: Tokenizer) -> List[Optional[int]]:
+    """
+    Token counts stored at ingest for a tokenizer (Chunk.to_dict()["token_counts"])
+
+    Args:
+        chunks: Chunk dicts (hydrated or from full point payloads)
+        tokenizer: Tokenizer of the target LLM
+
+    Returns:
+        Counts aligned with chunks (None where the chunk has no count for it)
+    """
+    counts = [(chunk.get("token_counts") or {}).get(tokenizer.name) for chunk in chunks]
+    missing = sum(count is None for count in counts)
+    if missing:
+        get_metrics().counter(
+            "rag_token_count_misses_total", "Chunks tokenized at query time (no stored count)"
+        ).inc(missing)
+    return counts
+
+
+def count_tokens_batch(texts: List[str], tokenizer: Optional[Tokenizer] = None) -> List[int]:
     """
     Count tokens for a batch of texts
 
     Args:
         texts: List of texts
+        tokenizer: Tokenizer (None = config.llm_model's)
 
     Returns:
         List of token counts
     """
-    return [estimate_tokens(text) for text in texts]
+    return (tokenizer or get_tokenizer_for_model()).count_batch(texts)
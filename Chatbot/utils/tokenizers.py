@@ -0,0 +1,210 @@
+"""
+Tokenizers theo họ LLM - đếm token chính xác cho context packing
+- OpenAI: tiktoken (o200k_base cho gpt-4o / gpt-4.1 / o-series, cl100k_base
+  cho gpt-4 / gpt-3.5); Anthropic không công bố tokenizer offline nên dùng
+  cl100k_base làm proxy gần nhất
+- "local": chỉ là fallback lúc runtime khi không import được tiktoken hoặc
+  không tải được file BPE (máy offline). Tách giống BPE (chữ, số, dấu câu) và
+  tính chi phí theo số byte UTF-8, nên tiếng Việt có dấu tốn nhiều token hơn
+  tiếng Anh như tokenizer thật
+
+Token counts lưu theo tên tokenizer thực sự dùng (Tokenizer.name): khi phải
+fallback, counts được lưu dưới "local" chứ không giả làm cl100k_base.
+
+Cách dùng:
+    tokenizer = get_tokenizer_for_model("gpt-4o")
+    counts = tokenizer.count_batch(texts)
+    head = tokenizer.truncate(text, 120)
+"""
+import logging
+import math
+import re
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LOCAL_TOKENIZER = "local"
+
+# Pre-tokenizer close to cl100k's split: contractions, words, 1-3 digit groups, punctuation runs, spaces
+_PIECE = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+")
+
+
+class Tokenizer:
+    """Token counting interface (one instance per tokenizer name)"""
+
+    name: str = ""
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        raise NotImplementedError
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts (ingest: one call per window)"""
+        return [self.count(text) for text in texts]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Longest prefix of text with at most max_tokens tokens
+
+        Args:
+            text: Input text
+            max_tokens: Token limit
+
+        Returns:
+            Prefix of text (text itself when it already fits)
+        """
+        raise NotImplementedError
+
+
+class TiktokenTokenizer(Tokenizer):
+    """OpenAI BPE encodings via tiktoken"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.name = encoding.name
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self.encoding.encode_ordinary(text))
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(list(texts))]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        tokens = self.encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        # A cut inside a multi-byte character decodes to U+FFFD: drop it
+        return self.encoding.decode(tokens[:max_tokens]).rstrip("�")
+
+
+class LocalTokenizer(Tokenizer):
+    """
+    Offline stand-in: BPE-like pieces, cost by UTF-8 length
+    ASCII words ≈ 1 token per 5 chars, non-ASCII (Vietnamese syllables with
+    diacritics) ≈ 1 token per 3 bytes, punctuation runs ≈ 1 per 3 chars.
+    Slightly pessimistic against cl100k/o200k so packed contexts don't overflow.
+    """
+
+    name = LOCAL_TOKENIZER
+
+    @staticmethod
+    def _cost(piece: str) -> int:
+        body = piece.lstrip(" ")
+        if not body or body.isspace():
+            return 1
+        if body[0].isdigit():
+            return 1
+        if body.isascii():
+            return math.ceil(len(body) / (5 if body[0].isalpha() else 3))
+        return math.ceil(len(body.encode("utf-8")) / 3)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return sum(self._cost(match.group()) for match in _PIECE.finditer(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        total = 0
+        for match in _PIECE.finditer(text):
+            total += self._cost(match.group())
+            if total > max_tokens:
+                return text[:match.start()]
+        return text
+
+
+_tokenizers: Dict[str, Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(name: str) -> Tokenizer:
+    """
+    Tokenizer by encoding name (cached per process)
+
+    Falls back to the local stand-in when tiktoken cannot be imported or the
+    BPE file cannot be loaded (offline).
+
+    Args:
+        name: tiktoken encoding name ("cl100k_base", "o200k_base") or "local"
+
+    Returns:
+        Tokenizer (check .name for the tokenizer actually used)
+    """
+    tokenizer = _tokenizers.get(name)
+    if tokenizer is not None:
+        return tokenizer
+
+    with _tokenizers_lock:
+        if name not in _tokenizers:
+            _tokenizers[name] = _load_tokenizer(name)
+        return _tokenizers[name]
+
+
+def _load_tokenizer(name: str) -> Tokenizer:
+    if name == LOCAL_TOKENIZER:
+        return LocalTokenizer()
+    try:
+        import tiktoken
+        return TiktokenTokenizer(tiktoken.get_encoding(name))
+    except ImportError:
+        logger.warning(f"tiktoken is not installed (see requirements.txt) - using the local tokenizer instead of {name}")
+    except Exception as e:
+        logger.warning(f"Failed to load tokenizer {name} ({e}) - using the local tokenizer")
+    return LocalTokenizer()
+
+
+def tokenizer_name_for_model(model_name: Optional[str]) -> str:
+    """
+    Encoding used by an LLM family
+
+    Args:
+        model_name: Model identifier (None = config.llm_model)
+
+    Returns:
+        tiktoken encoding name
+    """
+    if model_name is None:
+        from Chatbot.config.rag_config import get_rag_config
+        model_name = get_rag_config().llm_model
+
+    model = model_name.lower().rsplit("/", 1)[-1]
+    if model.startswith(("gpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "chatgpt-4o", "o1", "o3", "o4")):
+        return "o200k_base"
+    # gpt-4, gpt-3.5, Claude (proxy) and local models
+    return "cl100k_base"
+
+
+def get_tokenizer_for_model(model_name: Optional[str] = None) -> Tokenizer:
+    """
+    Tokenizer of an LLM family
+
+    Args:
+        model_name: Model identifier (None = config.llm_model)
+
+    Returns:
+        Tokenizer instance
+    """
+    return get_tokenizer(tokenizer_name_for_model(model_name))
+
+
+def get_ingest_tokenizers() -> List[Tokenizer]:
+    """
+    Tokenizers whose counts are stored per chunk at ingest:
+    the default model's first, then config.token_count_models
+
+    Returns:
+        Distinct tokenizers (by name)
+    """
+    from Chatbot.config.rag_config import get_rag_config
+    config = get_rag_config()
+
+    models = [config.llm_model] + [m.strip() for m in config.token_count_models.split(",") if m.strip()]
+    tokenizers = {}
+    for model in models:
+        tokenizer = get_tokenizer_for_model(model)
+        tokenizers.setdefault(tokenizer.name, tokenizer)
+    return list(tokenizers.values())
@@ -0,0 +1,63 @@
+"""
+Vietnamese lexical tokenization for keyword (BM25) search
+
+Tiếng Việt viết theo âm tiết cách nhau bởi khoảng trắng, nên mỗi âm tiết là
+một token. Token được bỏ dấu (diacritic-insensitive) để "hoc phi" khớp với
+"học phí"; các mã như "D480201", "2024-2025", "15.000.000" được giữ nguyên.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+# Letters/digits runs, allowing internal . , - / so codes and amounts stay whole
+_TOKEN_RE = re.compile(r"\w+(?:[.,\-/]\w+)*", re.UNICODE)
+
+_SEPARATORS_RE = re.compile(r"[.,\-/]")
+_PART_SPLIT_RE = re.compile(r"[\-/]")
+
+# đ/Đ are not decomposed by NFD
+_EXTRA_FOLDS = str.maketrans({"đ": "d", "Đ": "d"})
+
+
+@lru_cache(maxsize=65536)
+def fold_diacritics(token: str) -> str:
+    """
+    Remove Vietnamese diacritics and lowercase ("Học phí" → "hoc phi")
+
+    Args:
+        token: Input text
+
+    Returns:
+        ASCII-folded lowercase text
+    """
+    decomposed = unicodedata.normalize("NFD", token.translate(_EXTRA_FOLDS).lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize_vi(text: str) -> List[str]:
+    """
+    Split Vietnamese text into diacritic-folded syllable tokens
+
+    Compound tokens are also indexed by their parts so partial codes match:
+    amounts without separators ("15.000.000" → + "15000000") and
+    -/ separated parts ("123/QĐ-BGDĐT" → + "123", "qd", "bgddt").
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens (in order, duplicates kept for term frequency)
+    """
+    tokens = []
+    for raw in _TOKEN_RE.findall(unicodedata.normalize("NFC", text)):
+        token = fold_diacritics(raw)
+        tokens.append(token)
+        if not token.isalnum():
+            compact = _SEPARATORS_RE.sub("", token)
+            if compact.isdigit():
+                tokens.append(compact)
+            parts = _PART_SPLIT_RE.split(token)
+            if len(parts) > 1:
+                tokens.extend(part for part in parts if part)
+    return tokens